@@ -3,7 +3,8 @@ Device Finder - Backend application for device detection and management.
 This application provides API endpoints to scan for WiFi networks, Bluetooth devices, and cameras.
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import subprocess
 import platform
@@ -13,26 +14,49 @@ import json
 import os
 import sys
 import socket
-import random
+import ssl
+import uuid
+import threading
+import copy
+import errno
+import functools
+import itertools
+import select
+import selectors
+import struct
+import codecs
+import collections
+import contextlib
+import gzip
+import mimetypes
+import importlib
+import importlib.util
+import asyncio
+import atexit
+import queue
+import concurrent.futures
+import logging
+import logging.handlers
+from dataclasses import asdict, dataclass
 
 # Configure proper error handling for missing modules
-NMAP_AVAILABLE = False
 SNMP_AVAILABLE = False
 
-# Try to import ipaddress (standard library in Python 3.x)
+# Try to import orjson (faster JSON serialization of API responses)
 try:
-    import ipaddress
-    IPADDRESS_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    IPADDRESS_AVAILABLE = False
-    print("Module 'ipaddress' is not available. Using string-based IP validation.")
+    ORJSON_AVAILABLE = False
+    print("Module 'orjson' is not installed. Using the standard JSON serializer.")
 
-# Try to import nmap with proper error handling
+# Try to import brotli (precompression of static assets)
 try:
-    import nmap
-    NMAP_AVAILABLE = True
+    import brotli
+    BROTLI_AVAILABLE = True
 except ImportError:
-    print("Module 'python-nmap' is not installed. Advanced device scanning will be limited.")
+    BROTLI_AVAILABLE = False
+    print("Module 'brotli' is not installed. Static assets will only be precompressed with gzip.")
 
 # Try to import pysnmp with proper error handling
 try:
@@ -41,155 +65,1169 @@ try:
 except ImportError:
     print("Module 'pysnmp' is not installed. SNMP device querying will be unavailable.")
 
+# pysnmp asyncio API (queries that can run alongside other probes)
+try:
+    import pysnmp.hlapi.asyncio as snmp_asyncio
+    SNMP_ASYNC_AVAILABLE = True
+except ImportError:
+    SNMP_ASYNC_AVAILABLE = False
+
 # Configuration
-DEBUG = True
+DEBUG = os.environ.get('DEVICE_FINDER_DEBUG', '0').lower() in ('1', 'true', 'yes')  # Serwer deweloperski Flask z auto-przeładowaniem
+LOG_LEVEL = os.environ.get('DEVICE_FINDER_LOG_LEVEL', 'INFO').upper()  # Poziom logowania modułu (DEBUG pokazuje też oczekiwane błędy sond)
+SERVER_THREADS = int(os.environ.get('DEVICE_FINDER_THREADS', '8'))  # Wątki obsługujące żądania w waitress
 PORT = 5000
 HOST = '0.0.0.0'
+_SYSTEM = platform.system()  # Ustalany raz przy imporcie
+_IS_WINDOWS = _SYSTEM == "Windows"
+_PING_COUNT_FLAG = '-n' if _IS_WINDOWS else '-c'
+APP_DIR = os.path.dirname(os.path.abspath(__file__))  # Katalog źródłowy aplikacji (index.html, static/)
+GATT_CACHE_FILE = os.path.join(APP_DIR, 'gatt_cache.json')  # Zapisana mapa usług GATT urządzeń Bluetooth
+USE_NATIVE_WLAN_API = os.environ.get('DEVICE_FINDER_NATIVE_WLAN', '1') != '0'  # Skanowanie Wi-Fi na Windows przez wlanapi.dll zamiast netsh
+BLUETOOTH_SCAN_TIMEOUT = 2.5  # Czas aktywnego skanowania Bluetooth (sekundy)
+GATT_CACHE_TTL = 24 * 3600  # Czas ważności zapamiętanej mapy usług GATT (sekundy)
+SERVICE_CACHE_TTL = 60  # Czas przechowywania wyniku identyfikacji usługi na porcie (sekundy)
+ANALYSIS_CACHE_TTL = 24 * 3600  # Czas ważności analizy urządzenia o niezmienionej sygnaturze usług (sekundy)
+BLUETOOTH_ANALYSIS_TIMEOUT = 60  # Maksymalny czas analizy możliwości urządzenia Bluetooth (sekundy)
+# Ikony typów urządzeń zwracane w polu "type"
+WIFI_TYPE = "📡"
+BT_TYPE = "🔷"
+CAM_TYPE = "📹"
+SCAN_PORTS = [21, 22, 23, 24, 25, 80, 443, 1883, 3389, 8080, 8443]  # Porty sprawdzane przez scan_ports
+FALLBACK_SCAN_PORTS = [21, 22, 23, 25, 53, 80, 110, 139, 143, 161, 443, 445,
+                       515, 554, 631, 1880, 3389, 5000, 8080, 8443, 9100]  # Szersza lista, gdy SCAN_PORTS są zamknięte
+CAPABILITY_CACHE_TTL = 30  # Czas przechowywania wyników analizy możliwości urządzenia (sekundy)
+USE_NMAP_SCAN = os.environ.get('DEVICE_FINDER_NMAP_SCAN', '0').lower() in ('1', 'true', 'yes')  # Skanowanie portów urządzenia przez nmap zamiast połączeń asyncio
+# Szybkie skanowanie nmap: agresywne tempo, jedna powtórka, równoległe sondy i lekka detekcja wersji
+NMAP_FAST_ARGUMENTS = "-sV --version-light -T4 --max-retries 1 --host-timeout 10s --min-parallelism 50"
+PORT_CHECK_TIMEOUT = 1  # Limit czasu połączenia przy równoległym sprawdzaniu portów (sekundy)
+PORT_STATE_CACHE_TTL = 10  # Czas przechowywania stanu portu sprawdzonego przez check_port_open lub skanowanie (sekundy)
+PROBE_TIMEOUT = 2  # Domyślny limit czasu połączenia i odczytu w sondach usług (sekundy)
+RTT_TIMEOUT_MIN = 0.05  # Dolna granica limitu czasu połączenia wyliczonego z RTT hosta (sekundy)
+DEVICE_PROBE_TIMEOUT = 15  # Limit czasu równoległych testów urządzenia sieciowego (sekundy)
+BANNER_TIMEOUT = 2  # Czas oczekiwania na połączenie i banner usługi TCP (sekundy)
+DNS_CACHE_TTL = 300  # Czas przechowywania rozwiązanych nazw hostów (sekundy)
+REACHABILITY_PORTS = (80, 443, 22, 554)  # Porty sprawdzane przed pingiem ICMP
+REACHABILITY_TIMEOUT = 0.3  # Czas oczekiwania na odpowiedź TCP przy sprawdzaniu osiągalności (sekundy)
+CAMERA_SIGNATURE_PORTS = [80, 443, 554, 8000, 8080, 8554]  # Porty wyznaczające sygnaturę usług kamery IP
+API_PROBE_TIMEOUT = 2  # Łączny limit czasu równoległego sprawdzania ścieżek API (sekundy)
+ONVIF_PROBE_TIMEOUT = 0.5  # Czas oczekiwania na odpowiedź WS-Discovery (sekundy)
+ONVIF_CACHE_TTL = 300  # Czas przechowywania wyniku sondowania ONVIF dla adresu (sekundy)
+SUBPROCESS_TIMEOUT = 5  # Maksymalny czas działania narzędzi systemowych (netsh, powershell, bluetoothctl...)
+CAMERA_IDLE_TIMEOUT = 60  # Czas bezczynności, po którym kamera z puli jest zamykana (sekundy)
+STATIC_MAX_AGE = 86400  # Czas przechowywania plików statycznych w pamięci przeglądarki (sekundy)
+
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider serializing API responses with orjson."""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+
+
+# Logger modułu (stała nazwa także przy uruchomieniu jako skrypt); handler instaluje _setup_logging()
+log = logging.getLogger("device_finder")
+
+# Błędy sieciowe sond (port zamknięty, brak odpowiedzi) są oczekiwane podczas skanowania
+_EXPECTED_PROBE_ERRORS = (OSError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+
+def _log_failure(message, *args):
+    """Loguje błąd sondy: oczekiwane błędy sieciowe na poziomie DEBUG, pozostałe (awarie) jako WARNING."""
+    error = args[-1]
+    level = logging.DEBUG if isinstance(error, _EXPECTED_PROBE_ERRORS) else logging.WARNING
+    log.log(level, message, *args)
 
 # Initialize Flask app
-app = Flask(__name__, static_folder='static')
+app = Flask(__name__, static_folder=os.path.join(APP_DIR, 'static'))
 CORS(app)  # Enable CORS for all endpoints
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
 
-# Try to import optional modules
-try:
-    import wifi
-    WIFI_MODULE_AVAILABLE = True
-except ImportError:
-    WIFI_MODULE_AVAILABLE = False
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+else:
+    app.json.compact = True  # Bez wcięć także w trybie debug
+
+# Optional modules are only located here; nmap, cv2, wifi and bleak are imported on first use
+# so workers that never scan a given device type do not pay for loading them
+NMAP_AVAILABLE = importlib.util.find_spec("nmap") is not None
+if not NMAP_AVAILABLE:
+    print("Module 'python-nmap' is not installed. Advanced device scanning will be limited.")
+
+WIFI_MODULE_AVAILABLE = importlib.util.find_spec("wifi") is not None
+if not WIFI_MODULE_AVAILABLE:
     print("Module 'wifi' is not installed. Some features may be unavailable.")
 
-try:
-    import asyncio
-    from bleak import BleakScanner
-    BLUETOOTH_MODULE_AVAILABLE = True
-except ImportError:
-    BLUETOOTH_MODULE_AVAILABLE = False
+BLUETOOTH_MODULE_AVAILABLE = importlib.util.find_spec("bleak") is not None
+if not BLUETOOTH_MODULE_AVAILABLE:
     print("Module 'bleak' is not installed. Some features may be unavailable.")
 
-try:
-    import cv2
-    CAMERA_MODULE_AVAILABLE = True
-except ImportError:
-    CAMERA_MODULE_AVAILABLE = False
+CAMERA_MODULE_AVAILABLE = importlib.util.find_spec("cv2") is not None
+if not CAMERA_MODULE_AVAILABLE:
     print("Module 'opencv-python' is not installed. Some features may be unavailable.")
 
+_lazy_modules = {}
+_lazy_modules_lock = threading.Lock()
+
+
+def _lazy_module(name):
+    """Importuje moduł przy pierwszym użyciu i zapamiętuje go na kolejne wywołania."""
+    module = _lazy_modules.get(name)
+    if module is None:
+        with _lazy_modules_lock:
+            module = _lazy_modules.get(name)
+            if module is None:
+                module = importlib.import_module(name)
+                _lazy_modules[name] = module
+    return module
+
+# Natywne API Wi-Fi systemu Windows (wlanapi.dll przez ctypes)
+import wlan_api
+from wlan_api import WLAN_API_AVAILABLE
+
+
+# Wyrażenia regularne do parsowania wyjścia netsh (kompilowane raz przy imporcie)
+_SSID_BLOCK_RE = re.compile(r"\nSSID \d+ : ")
+_AUTH_RE = re.compile(r"Authentication\s+: (.*)")
+_SIGNAL_RE = re.compile(r"Signal\s+: (\d+%)")
+
+# Sparowane urządzenia Bluetooth: zapytanie PowerShell zwracające tablicę JSON
+# (@() wymusza tablicę także dla jednego wyniku w Windows PowerShell 5.1)
+_PAIRED_DEVICES_PS = (
+    "ConvertTo-Json -Compress -InputObject @(Get-PnpDevice -Class Bluetooth -PresentOnly "
+    "| Where-Object Status -eq 'OK' | Select-Object FriendlyName,InstanceId)"
+)
+# Adres urządzenia w InstanceId, np. BTHENUM\{...}_..._A4C138ABCDEF_C00000000 lub BTHLE\DEV_A4C138ABCDEF\...
+_PNP_BT_ADDRESS_RE = re.compile(r"(?:DEV_|&|_)([0-9A-F]{12})(?:_|\\|$)", re.IGNORECASE)
+_BLUETOOTHCTL_DEVICE_RE = re.compile(r"^Device ((?:[0-9A-F]{2}:){5}[0-9A-F]{2}) (.*)$", re.IGNORECASE | re.MULTILINE)
+_BSSID_SIGNAL_RE = re.compile(r"BSSID \d+\s+: (\S+)\s*\n\s*Signal\s+: (\d+%)")
+
+# Profile Bluetooth odpowiadające 16-bitowym UUID standardowych usług SIG
+_GATT_PROFILE_MAP = {
+    0x1101: ("SPP",),            # Serial Port
+    0x1105: ("OPP",),            # Object Push
+    0x1108: ("HSP",),            # Headset
+    0x110A: ("A2DP",),           # Audio Source
+    0x110B: ("A2DP",),           # Audio Sink
+    0x110C: ("AVRCP",),          # A/V Remote Control Target
+    0x110D: ("A2DP",),           # Advanced Audio Distribution
+    0x110E: ("AVRCP",),          # A/V Remote Control
+    0x1112: ("HSP",),            # Headset Audio Gateway
+    0x1115: ("PAN",),            # PANU
+    0x1116: ("PAN",),            # NAP
+    0x111E: ("HFP",),            # Hands-Free
+    0x111F: ("HFP",),            # Hands-Free Audio Gateway
+    0x112F: ("PBAP",),           # Phonebook Access
+    0x1132: ("MAP",),            # Message Access
+    0x1801: ("GATT",),           # Generic Attribute
+    0x180D: ("HRS",),            # Heart Rate Service
+    0x180F: ("BAS",),            # Battery Service
+    0x1812: ("HID", "HOGP"),     # Human Interface Device (HID over GATT)
+}
+
+# Standardowe UUID Bluetooth SIG: 0000xxxx-0000-1000-8000-00805f9b34fb
+_SIG_UUID_SUFFIX = "-0000-1000-8000-00805f9b34fb"
+BATTERY_SHORT_UUIDS = frozenset({0x2A19})  # Battery Level
+# Niezmienne charakterystyki, których wartość warto odczytać i zapamiętać
+CACHEABLE_SHORT_UUIDS = frozenset({
+    0x2A19,  # Battery Level
+    0x2A23,  # System ID
+    0x2A24,  # Model Number
+    0x2A25,  # Serial Number
+    0x2A26,  # Firmware Revision
+    0x2A27,  # Hardware Revision
+    0x2A28,  # Software Revision
+    0x2A29,  # Manufacturer Name
+    0x2A50,  # PnP ID
+})
+
+
+def _short_uuid(uuid_str):
+    """Zwraca 16-bitowy kod UUID Bluetooth SIG jako liczbę lub None dla UUID niestandardowych."""
+    if uuid_str[:4] != "0000" or not uuid_str.lower().endswith(_SIG_UUID_SUFFIX):
+        return None
+    return int(uuid_str[4:8], 16)
+
+
+# Słowa kluczowe w nazwie zapisywalnej charakterystyki -> rodzaj dodatkowej operacji
+_CHAR_KEYWORD_KINDS = {
+    "power": "power_control",
+    "audio": "volume_control",
+    "volume": "volume_control",
+    "light": "light_control",
+    "led": "light_control",
+}
+_CHAR_KEYWORD_RE = re.compile("|".join(_CHAR_KEYWORD_KINDS))
+_CHAR_KIND_OPERATIONS = {
+    "power_control": ("Sterowanie zasilaniem", "Włącz/wyłącz urządzenie"),
+    "volume_control": ("Sterowanie głośnością", "Zmień poziom głośności"),
+    "light_control": ("Sterowanie światłem", "Włącz/wyłącz/zmień kolor światła"),
+}
+
+# Typowe identyfikatory usług w bannerach (sprawdzane w tej kolejności)
+_BANNER_SERVICE_IDENTIFIERS = {
+    "ssh": ["ssh", "openssh", "sshd"],
+    "ftp": ["ftp", "fileserver", "vsftpd", "proftpd"],
+    "telnet": ["telnet", "login"],
+    "smtp": ["smtp", "mail server", "postfix", "sendmail", "mail service"],
+    "pop3": ["pop", "pop3", "mail"],
+    "imap": ["imap", "mail", "dovecot"],
+    "http": ["http", "web", "apache", "nginx", "iis", "webserver"],
+    "https": ["https", "secure", "ssl", "tls"],
+    "dns": ["dns", "domain", "named", "bind"],
+    "dhcp": ["dhcp", "bootpc", "bootps"],
+    "rdp": ["rdp", "terminal services", "remote desktop"],
+    "vnc": ["vnc", "remote desktop", "rfb"],
+    "printer": ["printer", "ipp", "cups", "jetdirect"],
+    "upnp": ["upnp", "universal plug and play"],
+    "snmp": ["snmp", "network management"],
+    "ntp": ["ntp", "time server", "time service"],
+    "ldap": ["ldap", "directory", "openldap", "active directory"],
+    "database": ["sql", "mysql", "postgresql", "oracle", "database", "db server"],
+    "mqtt": ["mqtt", "mosquitto"],
+    "rtsp": ["rtsp", "streaming", "video server"],
+    "sip": ["sip", "voip", "voice", "telephony"],
+    "irc": ["irc", "chat server", "internet relay chat"]
+}
+
+# Typowe usługi na portach, gdy banner nic nie zdradza
+_BANNER_PORT_SERVICES = {
+    21: "ftp",
+    22: "ssh",
+    23: "telnet",
+    25: "smtp",
+    53: "dns",
+    67: "dhcp",
+    68: "dhcp",
+    80: "http",
+    110: "pop3",
+    123: "ntp",
+    143: "imap",
+    161: "snmp",
+    389: "ldap",
+    443: "https",
+    465: "smtp-ssl",
+    514: "syslog",
+    554: "rtsp",
+    587: "smtp-submission",
+    631: "ipp",
+    993: "imaps",
+    995: "pop3s",
+    1883: "mqtt",
+    3306: "mysql",
+    3389: "rdp",
+    5432: "postgresql",
+    5060: "sip",
+    5900: "vnc",
+    8080: "http-alt",
+    8443: "https-alt",
+    9100: "printer"
+}
+
+# Standardowe rozdzielczości kamer internetowych
+_STANDARD_RESOLUTIONS = [
+    (640, 480),    # VGA
+    (800, 600),    # SVGA
+    (1024, 768),   # XGA
+    (1280, 720),   # HD
+    (1280, 800),   # WXGA
+    (1280, 1024),  # SXGA
+    (1600, 1200),  # UXGA
+    (1920, 1080),  # FHD
+    (2560, 1440),  # QHD
+    (3840, 2160)   # 4K UHD
+]
+
+# Słowa kluczowe strony WWW wskazujące rodzaj urządzenia (nazwa grupy -> kategoria)
+_DEVICE_KEYWORD_RE = re.compile(
+    r"(?P<admin>login|admin|dashboard|panel|configuration|setup|settings|system|management)"
+    r"|(?P<router>router|gateway|wireless|network|wan|lan|dhcp)"
+    r"|(?P<printer>printer|ink|toner|cartridge|print|scan|copy)"
+    r"|(?P<camera>camera|video|stream|surveillance|motion|capture)"
+    r"|(?P<nas>nas|storage|disk|share|backup|raid)",
+    re.IGNORECASE
+)
+
+# Jedyna operacja prostych usług: protokół -> (nazwa, opis, stały port lub None = port usługi)
+_SERVICE_OPERATIONS = {
+    "ssh": ("Połączenie SSH", "Nawiąż sesję SSH z urządzeniem", 22),
+    "telnet": ("Połączenie Telnet", "Nawiąż sesję Telnet z urządzeniem", 23),
+    "smtp": ("Wyślij email", "Wyślij wiadomość email przez serwer SMTP", None),
+    "pop3": ("Odbierz email", "Pobierz wiadomości email przez POP3", None),
+    "imap": ("Zarządzaj emailami", "Zarządzaj wiadomościami email przez IMAP", None),
+    "dns": ("Zapytanie DNS", "Wykonaj zapytanie DNS", 53),
+    "rdp": ("Pulpit zdalny", "Połącz się z pulpitem zdalnym", 3389),
+    "vnc": ("VNC", "Połącz się przez VNC", 5900),
+    "raw": ("Drukowanie RAW", "Bezpośrednie wysyłanie danych do drukarki", 9100),
+}
+
+# Usługi rozpoznawane w trybie szybkim po samym numerze portu: port -> (usługa, operacja, pewność).
+# Porty wieloznaczne (HTTP, kamery, panele WWW) zawsze są sprawdzane sondą.
+_PORT_HINTS = {
+    22: ("SSH", "ssh", 0.8),
+    23: ("Telnet", "telnet", 0.8),
+    25: ("SMTP", "smtp", 0.7),
+    53: ("DNS", "dns", 0.8),
+    110: ("POP3", "pop3", 0.8),
+    143: ("IMAP", "imap", 0.8),
+    3389: ("RDP", "rdp", 0.9),
+    5900: ("VNC", "vnc", 0.8),
+    1883: ("MQTT", None, 0.7),
+    8883: ("MQTT", None, 0.8),
+    9100: ("Printer (Raw)", "raw", 0.8),
+}
+PORT_HINT_MIN_CONFIDENCE = 0.8  # Minimalna pewność wskazówki portu, by pominąć sondę w trybie szybkim
+
+# Punktacja typów urządzeń w _determine_device_type - liczniki są listą indeksowaną jak _DEVICE_TYPES
+# (przy remisie wygrywa typ wcześniejszy), reguły wskazują typ jego indeksem.
+_DEVICE_TYPES = ("router", "printer", "camera", "nas", "computer", "server", "iot", "media")
+_DEVICE_TYPE_INDEX = {device: index for index, device in enumerate(_DEVICE_TYPES)}
+# Usługa -> (typ urządzenia, punkty, słowa kluczowe w szczegółach usługi lub None - zawsze)
+_HTTP_DEVICE_RULES = (("router", 3, ("router", "gateway")), ("camera", 3, ("camera",)),
+                      ("media", 3, ("media",)), ("server", 1, None))
+_SERVICE_RULES = {service: tuple((_DEVICE_TYPE_INDEX[device], score, keywords) for device, score, keywords in rules)
+                  for service, rules in {
+    "HTTP": _HTTP_DEVICE_RULES,
+    "HTTPS": _HTTP_DEVICE_RULES,
+    "IPP": (("printer", 5, None),),
+    "Printer (Raw)": (("printer", 5, None),),
+    "LPD": (("printer", 4, None),),
+    "RTSP": (("camera", 5, None),),
+    "SMB/CIFS": (("nas", 3, None),),
+    "NFS": (("nas", 3, None),),
+    "FTP": (("nas", 3, ("storage", "nas")), ("server", 1, None)),
+    "SSH": (("computer", 3, None), ("server", 1, None)),
+    "RDP": (("computer", 3, None),),
+    "VNC": (("computer", 3, None),),
+    "SMTP": (("server", 1, None),),
+    "IMAP": (("server", 1, None),),
+    "POP3": (("server", 1, None),),
+    "DNS": (("server", 1, None),),
+    "MQTT": (("iot", 5, None),),
+    "DLNA": (("media", 5, None),),
+}.items()}
+# (usługa, typ urządzenia rozpoznany z treści strony) -> (typ urządzenia, punkty)
+_DEVICE_TYPE_RULES = {("HTTP", "router"): (_DEVICE_TYPE_INDEX["router"], 5),
+                      ("HTTPS", "router"): (_DEVICE_TYPE_INDEX["router"], 5)}
+# Port -> (typ urządzenia, punkty)
+_PORT_RULES = {port: (_DEVICE_TYPE_INDEX[device], score) for ports, device, score in (
+    ((515, 631, 9100), "printer", 2),
+    ((554, 8554, 10554), "camera", 2),
+    ((3389, 5900), "computer", 2),
+    ((80, 443, 8080, 8443), "router", 1),
+    ((21, 22, 25, 53, 110, 143, 993, 995), "server", 1),
+    ((1883, 8883), "iot", 2),
+) for port in ports}
+
+_DEVICE_KEYWORD_MAX_LENGTH = len("configuration")  # Najdłuższe słowo kluczowe
+
+# Typowe ścieżki API interfejsów WWW urządzeń
+_API_ENDPOINTS = ("/api/", "/rest/", "/v1/", "/v2/", "/api/v1/", "/api/v2/", "/rest/v1/", "/json/", "/xml/")
+
+# Nagłówki HTTP zachowywane w szczegółach usługi (reszta nie jest nigdzie czytana)
+_WANTED_HEADERS = frozenset({"server", "www-authenticate", "x-powered-by", "content-type"})
+
+# Zapis szesnastkowy kolejnych wartości bajtu ("0x0".."0xff", jak hex())
+_HEX_BYTES = tuple(hex(value) for value in range(256))
+
+# Pakiet MQTT v3.1.1 CONNECT: nagłówek (typ 1), pozostała długość 12, nazwa protokołu "MQTT",
+# wersja 4, flaga Clean Session, Keep Alive 60 s, pusty Client ID
+_MQTT_CONNECT = b"\x10\x0c\x00\x04MQTT\x04\x02\x00\x3c\x00\x00"
+
+# Popularne ścieżki strumieni RTSP kamer
+_RTSP_STREAM_PATHS = ("live", "stream", "ch1", "cam1", "media", "video")
+
+# Operacje interfejsu WWW zależne od schematu: (nazwa, opis, operacja)
+_WEB_SCHEME_OPERATIONS = {
+    "http": {
+        "open": ("Interfejs WWW", "Otwórz interfejs użytkownika", "open_web"),
+        "api": ("API", "Dostęp do API urządzenia", "api_access"),
+        "login": ("Logowanie", "Zaloguj się do interfejsu urządzenia", "login"),
+    },
+    "https": {
+        "open": ("Bezpieczny interfejs WWW", "Otwórz zabezpieczony interfejs użytkownika", "open_secure_web"),
+        "api": ("Bezpieczne API", "Dostęp do bezpiecznego API urządzenia", "api_access_secure"),
+        "login": ("Bezpieczne logowanie", "Zaloguj się do zabezpieczonego interfejsu", "secure_login"),
+    },
+}
+
+# Kategoria słów kluczowych strony -> (typ urządzenia, nazwa, opis, operacja); ostatni pasujący typ wygrywa
+_WEB_CATEGORY_OPERATIONS = {
+    "admin": (None, "Panel administracyjny", "Uzyskaj dostęp do panelu administracyjnego", "admin_panel"),
+    "router": ("router", "Konfiguracja sieci", "Konfiguruj ustawienia sieci", "network_config"),
+    "printer": ("printer", "Status drukarki", "Sprawdź stan drukarki i poziom tuszu", "printer_status"),
+    "camera": ("camera", "Podgląd kamery", "Oglądaj obraz z kamery", "view_camera"),
+    "nas": ("nas", "Zarządzanie plikami", "Zarządzaj plikami na serwerze NAS", "file_management"),
+}
+
+# Zapytanie WS-Discovery o urządzenia ONVIF (NetworkVideoTransmitter)
+_WS_DISCOVERY_PROBE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope" '
+    'xmlns:w="http://schemas.xmlsoap.org/ws/2004/08/addressing" '
+    'xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery" '
+    'xmlns:dn="http://www.onvif.org/ver10/network/wsdl">'
+    '<e:Header><w:MessageID>uuid:{message_id}</w:MessageID>'
+    '<w:To e:mustUnderstand="true">urn:schemas-xmlsoap-org:ws:2005:04:discovery</w:To>'
+    '<w:Action e:mustUnderstand="true">http://schemas.xmlsoap.org/ws/2005/04/discovery/Probe</w:Action>'
+    '</e:Header><e:Body><d:Probe><d:Types>dn:NetworkVideoTransmitter</d:Types></d:Probe></e:Body>'
+    '</e:Envelope>'
+)
+
+# Czas odpowiedzi z wyjścia polecenia ping
+_PING_RE = re.compile(r'time[=<]\s*([\d.]+)\s*ms', re.IGNORECASE)
+# Wersje oprogramowania w bannerach usług
+_SSH_VERSION_RE = re.compile(r'SSH-\d+\.\d+-(\S+)')
+_FTP_VERSION_RE = re.compile(r'FTP server \(([^)]+)\)')
+_VNC_VERSION_RE = re.compile(r'RFB (\d+\.\d+)')
+
+
+def _keyword_table(entries):
+    """
+    Kompiluje tabelę (słowo kluczowe, nazwa) do jednego wyrażenia regularnego przeszukującego tekst
+    jednym przebiegiem. Wcześniejsze wpisy mają pierwszeństwo, tak jak przy sprawdzaniu po kolei.
+    """
+    keywords = [keyword.lower() for keyword, _ in entries]
+    # Dopasowanie dłuższego słowa oznacza też wystąpienie każdego zawartego w nim krótszego
+    priority = {keyword: min(index for index, other in enumerate(keywords) if other in keyword) for keyword in keywords}
+    pattern = re.compile("(?=(%s))" % "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)))
+    return pattern, priority, [name for _, name in entries]
+
+
+# Implementacje rozpoznawane w bannerach, kolejność ma znaczenie
+_SSH_IMPLEMENTATIONS = _keyword_table([(name, name) for name in (
+    "OpenSSH", "Dropbear", "PuTTY", "WinSCP", "TTSSH", "libssh", "paramiko", "crypto", "RomSShell")])
+_FTP_IMPLEMENTATIONS = _keyword_table([(name, name) for name in (
+    "FileZilla", "vsftpd", "ProFTPD", "Pure-FTPd", "IIS FTP", "WU-FTPD", "NcFTPd", "CerberusFTP")])
+_SMTP_IMPLEMENTATIONS = _keyword_table([(name, name) for name in ("Postfix", "Sendmail", "Exchange", "Exim", "qmail")])
+_TELNET_SYSTEMS = _keyword_table([("linux", "Linux"), ("windows", "Windows"), ("cisco", "Cisco IOS"),
+                                  ("dd-wrt", "DD-WRT"), ("openwrt", "OpenWRT")])
+_BANNER_SERVICE_TABLE = _keyword_table([(identifier, service) for service, identifiers in _BANNER_SERVICE_IDENTIFIERS.items()
+                                        for identifier in identifiers])
+
+
+def _pipelined_exchange(sock, commands, limit=16384):
+    """
+    Wysyła wszystkie polecenia naraz (ostatnie kończy sesję) i czyta odpowiedzi do zamknięcia
+    połączenia, przekroczenia limitu czasu lub limit bajtów - bez czekania na każdą odpowiedź osobno.
+    """
+    sock.sendall(commands)
+    buffer = bytearray()
+    try:
+        while len(buffer) < limit:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            buffer += chunk
+    except OSError:
+        # Serwer nie zamknął połączenia po poleceniu końcowym - wystarczy to, co przyszło
+        pass
+    return buffer.decode('utf-8', errors='ignore')
+
+
+def _read_reply(sock, is_final, limit=16384):
+    """Czyta odpowiedź aż do pełnej linii końcowej (is_final), zamknięcia połączenia lub limitu bajtów."""
+    buffer = bytearray()
+    try:
+        while len(buffer) < limit:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            buffer += chunk
+            # Ostatni element po podziale to niepełna linia (lub pusty napis)
+            if any(is_final(line) for line in buffer.decode('utf-8', errors='ignore').split("\r\n")[:-1]):
+                break
+    except OSError:
+        pass
+    return _take_reply(buffer.decode('utf-8', errors='ignore'), is_final)
+
+
+def _take_reply(text, is_final):
+    """Początkowe linie odpowiedzi aż do linii końcowej (is_final) włącznie."""
+    lines = []
+    for line in text.split("\r\n"):
+        lines.append(line)
+        if is_final(line):
+            break
+    return "\r\n".join(lines)
+
+
+def _match_implementation(text_lower, table):
+    """Najwyżej w tabeli położona nazwa, której słowo kluczowe występuje w tekście (już małymi literami)."""
+    pattern, priority, names = table
+    best = None
+    for match in pattern.finditer(text_lower):
+        rank = priority[match.group(1)]
+        if best is None or rank < best:
+            best = rank
+            if best == 0:
+                break
+    return names[best] if best is not None else None
+
+# Nazwy usług dla popularnych portów
+_SERVICES = {
+    21: "FTP",
+    22: "SSH",
+    23: "Telnet",
+    25: "SMTP",
+    80: "HTTP",
+    110: "POP3",
+    143: "IMAP",
+    443: "HTTPS",
+    993: "IMAPS",
+    995: "POP3S",
+    1883: "MQTT",
+    3389: "RDP",
+    8080: "HTTP-Alt",
+    8443: "HTTPS-Alt"
+}
+
+# Stała pętla zdarzeń asyncio działająca w wątku tła - współdzielona przez wszystkie
+# skanowania bleak zamiast tworzenia nowej pętli (i połączenia D-Bus/WinRT) przy każdym żądaniu
+_event_loop = asyncio.new_event_loop()
+threading.Thread(target=_event_loop.run_forever, name="asyncio-loop", daemon=True).start()
+
+# Nakładające się skanowania Bluetooth są wykonywane po kolei
+_bluetooth_scan_lock = asyncio.Lock()
+
+# Pamięć podręczna wyników skanowania: klucz -> (znacznik czasu, wynik)
+_scan_cache = {}
+_scan_cache_lock = threading.Lock()
+
+
+# Pula otwartych kamer: indeks -> {"capture", "lock", "last_used"}. Otwarcie kamery
+# i pierwsza klatka są najdroższe, więc kamery pozostają otwarte do czasu bezczynności
+_camera_pool = {}
+_camera_pool_lock = threading.Lock()
+_camera_janitor_started = False
+
+
+def _close_idle_cameras():
+    """Wątek tła zamykający kamery nieużywane dłużej niż CAMERA_IDLE_TIMEOUT."""
+    while True:
+        time.sleep(CAMERA_IDLE_TIMEOUT / 4)
+        with _camera_pool_lock:
+            entries = list(_camera_pool.values())
+        
+        for entry in entries:
+            if entry["capture"] is None or time.monotonic() - entry["last_used"] < CAMERA_IDLE_TIMEOUT:
+                continue
+            # Kamera używana w tej chwili zostanie sprawdzona w kolejnym przebiegu
+            if entry["lock"].acquire(blocking=False):
+                try:
+                    entry["capture"].release()
+                    entry["capture"] = None
+                finally:
+                    entry["lock"].release()
+
+
+def camera_backend():
+    """Zwraca backend OpenCV właściwy dla systemu (pomija wolne autowykrywanie MSMF/GStreamer)."""
+    cv2 = _lazy_module("cv2")
+    if _IS_WINDOWS:
+        return cv2.CAP_DSHOW
+    elif _SYSTEM == "Linux":
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+
+@contextlib.contextmanager
+def pooled_camera(index, backend):
+    """Udostępnia (na wyłączność) otwarty obiekt VideoCapture dla kamery o danym indeksie."""
+    global _camera_janitor_started
+    
+    with _camera_pool_lock:
+        entry = _camera_pool.get(index)
+        if entry is None:
+            entry = _camera_pool[index] = {"capture": None, "lock": threading.Lock(), "last_used": 0.0}
+        if not _camera_janitor_started:
+            threading.Thread(target=_close_idle_cameras, name="camera-janitor", daemon=True).start()
+            _camera_janitor_started = True
+    
+    with entry["lock"]:
+        cap = entry["capture"]
+        if cap is None or not cap.isOpened():
+            cap = entry["capture"] = _lazy_module("cv2").VideoCapture(index, backend)
+        try:
+            yield cap
+        finally:
+            entry["last_used"] = time.monotonic()
+            # Nie trzymaj w puli kamer, których nie udało się otworzyć
+            if not cap.isOpened():
+                cap.release()
+                entry["capture"] = None
+
+
+@dataclass(slots=True)
+class Device:
+    """Wykryte urządzenie zwracane przez skanery (serializowane bezpośrednio przez dostawcę JSON)."""
+    name: str
+    address: str | None
+    type: str
+    id: str
+    signal: str | None = None    # Wi-Fi
+    security: str | None = None  # Wi-Fi
+    rssi: int | None = None      # Bluetooth
+    paired: bool | None = None   # Bluetooth
+    index: int | None = None     # Kamera
+
+
+@dataclass(slots=True)
+class GattOp:
+    """Operacja na charakterystyce GATT wykryta podczas analizy urządzenia Bluetooth."""
+    name: str
+    description: str
+    service: str
+    characteristic: str
+    operation: str
+    available: bool = True
+
+
+@functools.lru_cache(maxsize=256)
+def _classify(address):
+    """Rozpoznaje format adresu urządzenia: "bt" (MAC), "ip", "cam" (kamera lokalna) lub "unknown"."""
+    if not address:
+        return "unknown"
+    if address[:4] == "CAM:":
+        return "cam"
+    if '.' in address and address.count('.') == 3:
+        return "ip"
+    if ':' in address and address.count(':') >= 5:
+        return "bt"
+    return "unknown"
+
+
+def is_ip_address(address):
+    """Sprawdza, czy tekst jest adresem IPv4 (lub IPv6) - walidację wykonuje inet_pton w C."""
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, address)
+            return True
+        except (OSError, ValueError):
+            continue
+    return False
+
+
+def _score_device_keywords(response, limit=8192, chunk_size=1024):
+    """
+    Czyta treść strony porcjami (najwyżej limit bajtów) i liczy różne słowa kluczowe
+    każdej kategorii _DEVICE_KEYWORD_RE. Przerywa, gdy rozpoznano już panel administracyjny
+    i rodzaj urządzenia - zwykle wystarcza początek strony (np. <title>).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    matched_keywords = {}
+    scores = collections.Counter()
+    tail = ""
+    remaining = limit
+    while remaining > 0:
+        chunk = response.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        # Końcówka poprzedniej porcji pozwala znaleźć słowa rozcięte granicą porcji
+        text = tail + decoder.decode(chunk)
+        for match in _DEVICE_KEYWORD_RE.finditer(text):
+            matched_keywords[match.group().lower()] = match.lastgroup
+        tail = text[-_DEVICE_KEYWORD_MAX_LENGTH:]
+        
+        scores = collections.Counter(matched_keywords.values())
+        if scores["admin"] >= 2 and any(scores[kind] >= 2 for kind in ("router", "printer", "camera", "nas")):
+            break
+    return scores
+
+
+def _service_operation(protocol, port):
+    """Tworzy operację prostej usługi z szablonu _SERVICE_OPERATIONS (nowy słownik - wynik bywa modyfikowany)."""
+    name, description, fixed_port = _SERVICE_OPERATIONS[protocol]
+    return {
+        "name": name,
+        "description": description,
+        "available": True,
+        "protocol": protocol,
+        "port": fixed_port or port
+    }
+
+
+# Wspólny kontekst TLS bez weryfikacji certyfikatów (urządzenia mają zwykle certyfikaty
+# samopodpisane) - tworzony raz, bo wczytanie systemowych certyfikatów CA jest kosztowne
+_UNVERIFIED_SSL_CONTEXT = ssl._create_unverified_context()
+
+_dns_cache = {}
+_dns_cache_lock = threading.Lock()
+
+
+def resolve_host(address):
+    """
+    Zamienia nazwę hosta na adres IPv4 i zapamiętuje wynik na DNS_CACHE_TTL sekund,
+    aby kolejne sondy tego samego hosta nie odpytywały DNS. Adresy IP zwraca bez zmian.
+    """
+    if is_ip_address(address):
+        return address
+    now = time.monotonic()
+    with _dns_cache_lock:
+        entry = _dns_cache.get(address)
+    if entry is not None and now - entry[1] < DNS_CACHE_TTL:
+        return entry[0]
+    try:
+        resolved = socket.getaddrinfo(address, None, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+    except (OSError, UnicodeError):
+        # Nie udało się rozwiązać nazwy - niech połączenie zgłosi błąd samo
+        return address
+    with _dns_cache_lock:
+        _dns_cache[address] = (resolved, now)
+    return resolved
+
+
+async def grab_banner(address, port, terminator=b"\n", timeout=BANNER_TIMEOUT):
+    """
+    Łączy się z usługą TCP i odczytuje jej banner - do terminatora lub, gdy terminator=None,
+    pierwszą porcję danych. Zwraca b"", jeśli usługa nic nie wysłała w czasie timeout.
+    Zgłasza OSError lub asyncio.TimeoutError, gdy połączenie się nie powiodło.
+    """
+    host = await asyncio.to_thread(resolve_host, address)
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        if terminator is None:
+            return await asyncio.wait_for(reader.read(1024), timeout)
+        return await asyncio.wait_for(reader.readuntil(terminator), timeout)
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        return await reader.read(1024)
+    except asyncio.TimeoutError:
+        return b""
+    finally:
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+
+
+def grab_banner_sync(address, port, terminator=b"\n", timeout=BANNER_TIMEOUT):
+    """Wersja grab_banner dla kodu synchronicznego - wykonywana we wspólnej pętli zdarzeń."""
+    return asyncio.run_coroutine_threadsafe(grab_banner(address, port, terminator, timeout), _event_loop).result()
+
+
+# SO_LINGER {włączone, 0 s}: close() wysyła RST (na Windows struktura linger ma pola u_short)
+_LINGER_RESET = struct.pack("HH" if _IS_WINDOWS else "ii", 1, 0)
+# Wyniki connect_ex oznaczające połączenie nieblokujące w toku
+_CONNECT_PENDING = frozenset({errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY})
+
+
+# Numery sekwencyjne kolejnych pakietów ICMP Echo
+_icmp_sequence = itertools.count(1)
+
+
+def _icmp_checksum(data):
+    """Suma kontrolna internetu (RFC 1071) dla pakietu ICMP."""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f">{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+# Identyfikatory zapytań UDP (DNS transaction ID / SNMP request-id) do dopasowania odpowiedzi
+_udp_request_ids = itertools.count(1)
+_DNS_QUERY_NAME = b"\x03www\x06google\x03com\x00"  # Zapytanie typu A o www.google.com
+_SYS_DESCR_OID = bytes([0x2B, 6, 1, 2, 1, 1, 1, 0])  # 1.3.6.1.2.1.1.1.0 (sysDescr.0) w kodowaniu BER
+
+
+def _dns_query(transaction_id):
+    """Zapytanie DNS (rekurencyjne, typ A) z podanym identyfikatorem transakcji."""
+    return struct.pack(">6H", transaction_id, 0x0100, 1, 0, 0, 0) + _DNS_QUERY_NAME + b"\x00\x01\x00\x01"
+
+
+def _dns_reply_id(packet):
+    return struct.unpack_from(">H", packet)[0]
+
+
+def _ber(tag, payload):
+    """Element BER: znacznik, długość (forma krótka lub długa) i zawartość."""
+    length = len(payload)
+    if length < 0x80:
+        return bytes((tag, length)) + payload
+    encoded = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes((tag, 0x80 | len(encoded))) + encoded + payload
+
+
+def _ber_integer(value):
+    return _ber(0x02, value.to_bytes(value.bit_length() // 8 + 1, "big", signed=True))
+
+
+def _ber_read(data, offset):
+    """Odczytuje nagłówek elementu BER; zwraca (znacznik, początek, koniec) jego zawartości."""
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset:offset + size], "big")
+        offset += size
+    return tag, offset, offset + length
+
+
+def _snmp_get_request(request_id, community=b"public"):
+    """Zapytanie SNMP v1 GET o sysDescr.0 z podanym request-id."""
+    varbind = _ber(0x30, _ber(0x06, _SYS_DESCR_OID) + b"\x05\x00")
+    pdu = _ber(0xA0, _ber_integer(request_id) + _ber_integer(0) + _ber_integer(0) + _ber(0x30, varbind))
+    return _ber(0x30, _ber_integer(0) + _ber(0x04, community) + pdu)
+
+
+def _snmp_reply_id(packet):
+    """Request-id z odpowiedzi SNMP (wiadomość -> wersja -> community -> PDU -> request-id)."""
+    _, offset, _ = _ber_read(packet, 0)
+    _, _, offset = _ber_read(packet, offset)
+    _, _, offset = _ber_read(packet, offset)
+    _, offset, _ = _ber_read(packet, offset)
+    _, start, end = _ber_read(packet, offset)
+    return int.from_bytes(packet[start:end], "big", signed=True)
+
+
+def _udp_batch_probe(targets, build_packet, reply_id, port, timeout=2):
+    """
+    Wysyła zapytania UDP do wszystkich celów z jednego gniazda, nie czekając na odpowiedzi,
+    a potem odbiera je do upływu limitu czasu. Odpowiedź jest przypisywana do celu po adresie
+    nadawcy i identyfikatorze zapytania. Zwraca słownik adres -> pakiet odpowiedzi.
+    """
+    pending = {}
+    responses = {}
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        for address in targets:
+            request_id = next(_udp_request_ids) & 0x7FFF
+            ip = resolve_host(address)
+            try:
+                sock.sendto(build_packet(request_id), (ip, port))
+            except OSError:
+                continue
+            pending[(ip, request_id)] = address
+        
+        deadline = time.monotonic() + timeout
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                break
+            try:
+                packet, sender = sock.recvfrom(4096)
+                key = (sender[0], reply_id(packet))
+            except (OSError, IndexError, struct.error):
+                # ICMP port unreachable (Windows) lub uszkodzony pakiet
+                continue
+            address = pending.pop(key, None)
+            if address is not None:
+                responses[address] = packet
+    return responses
+
+
+def run_command(command, timeout=SUBPROCESS_TIMEOUT):
+    """
+    Uruchamia narzędzie systemowe z limitem czasu - po jego przekroczeniu proces jest zabijany
+    i zgłaszany jest subprocess.TimeoutExpired. Na Windows nie tworzy okna konsoli.
+    """
+    creationflags = subprocess.CREATE_NO_WINDOW if _IS_WINDOWS else 0
+    return subprocess.run(command, capture_output=True, text=True, encoding="utf-8", errors="ignore",
+                          timeout=timeout, creationflags=creationflags)
+
+
+def ttl_cache(seconds):
+    """Dekorator zapamiętujący wynik skanowania na określony czas (w sekundach)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, force=False, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            
+            # force=True pomija zapamiętany wynik i wykonuje skanowanie ponownie
+            if not force:
+                with _scan_cache_lock:
+                    cached = _scan_cache.get(key)
+                    if cached and time.monotonic() - cached[0] < seconds:
+                        return cached[1]
+            
+            result = func(self, *args, **kwargs)
+            
+            # Wyniki z błędem nie są zapamiętywane
+            with _scan_cache_lock:
+                if "error" in result:
+                    _scan_cache.pop(key, None)
+                else:
+                    _scan_cache[key] = (time.monotonic(), result)
+            
+            return result
+        return wrapper
+    return decorator
+
 
 class DeviceScanner:
     """Class for scanning various types of devices."""
     
     def __init__(self):
-        self.system = platform.system()
+        # Ostatnio zwrócony stan Bluetooth (adres -> nazwa) i jego wersja - do odpowiedzi różnicowych
+        self._last_bt = {}
+        self._bt_version = 0
+        self._bt_state_lock = threading.Lock()
         
+    @ttl_cache(seconds=8)
     def scan_wifi_networks(self):
         """Skanuje dostępne sieci Wi-Fi."""
-        if not WIFI_MODULE_AVAILABLE:
+        if not WIFI_MODULE_AVAILABLE and not WLAN_API_AVAILABLE:
             return {"error": "Moduł 'wifi' nie jest dostępny. Nie można skanować sieci Wi-Fi."}
             
         try:
             print("Skanowanie sieci Wi-Fi...")
             networks = []
             
-            if self.system == "Windows":
-                # Użyj komendy netsh na Windows
-                output = subprocess.check_output(["netsh", "wlan", "show", "networks"], encoding="utf-8", errors="ignore")
-                network_names = re.findall(r"SSID \d+ : (.*)", output)
-                signal_strength = re.findall(r"Signal\s+: (\d+%)", output)
-                security = re.findall(r"Authentication\s+: (.*)", output)
-                
-                # Pobierz również adresy MAC (BSSID) jeśli są dostępne
-                # Spróbuj użyć komendy "netsh wlan show networks mode=bssid"
+            if _IS_WINDOWS:
+                # Najpierw natywne API Wi-Fi; netsh tylko gdy usługa WLAN jest niedostępna
+                # lub natywne API wyłączono przez DEVICE_FINDER_NATIVE_WLAN=0
                 try:
-                    detailed_output = subprocess.check_output(["netsh", "wlan", "show", "networks", "mode=bssid"], 
-                                                            encoding="utf-8", errors="ignore")
-                    bssids = re.findall(r"BSSID \d+\s+: (.*)", detailed_output)
-                except:
-                    bssids = []  # Jeśli nie udało się pobrać adresów MAC
+                    if not USE_NATIVE_WLAN_API:
+                        raise OSError("native Wifi API disabled by configuration")
+                    for access_point in wlan_api.scan_networks():
+                        networks.append(Device(
+                            name=access_point["ssid"],
+                            signal=f"{access_point['signal']}%",
+                            security=access_point["security"],
+                            address=access_point["bssid"],  # Adres MAC punktu dostępowego
+                            type=WIFI_TYPE,
+                            id=f"wifi_{len(networks)}"
+                        ))
+                    return {"status": "success", "devices": networks}
+                except OSError as e:
+                    print(f"Native Wifi API unavailable, falling back to netsh: {e}")
+                    networks = []
                 
-                for i in range(len(network_names)):
-                    # Przypisz adres MAC jeśli jest dostępny dla tego indeksu
-                    mac_address = bssids[i] if i < len(bssids) else f"MAC-{i:02d}:{network_names[i][:6].upper()}"
+                # Użyj komendy netsh na Windows - tryb bssid zawiera SSID, sygnał,
+                # uwierzytelnianie i adresy MAC, więc wystarcza jedno wywołanie
+                result = run_command(["netsh", "wlan", "show", "networks", "mode=bssid"])
+                if result.returncode != 0:
+                    return {"error": f"Polecenie netsh zakończyło się błędem: {result.stdout.strip() or result.returncode}"}
+                output = result.stdout
+                
+                # Pierwszy element to nagłówek przed pierwszą siecią
+                for block in _SSID_BLOCK_RE.split(output)[1:]:
+                    network_name = block.split("\n", 1)[0].strip()
+                    auth_match = _AUTH_RE.search(block)
+                    security = auth_match.group(1).strip() if auth_match else "N/A"
                     
-                    networks.append({
-                        "name": network_names[i],
-                        "signal": signal_strength[i] if i < len(signal_strength) else "N/A",
-                        "security": security[i] if i < len(security) else "N/A",
-                        "address": mac_address,  # Dodajemy adres MAC do każdej sieci
-                        "type": "📡",  # Ikona sieci Wi-Fi
-                        "id": f"wifi_{i}"
-                    })
+                    # Jeden wpis na każdy punkt dostępowy (BSSID) danej sieci
+                    access_points = _BSSID_SIGNAL_RE.findall(block)
+                    if not access_points:
+                        signal_match = _SIGNAL_RE.search(block)
+                        access_points = [(f"MAC-{len(networks):02d}:{network_name[:6].upper()}",
+                                          signal_match.group(1) if signal_match else "N/A")]
+                    
+                    for mac_address, signal in access_points:
+                        networks.append(Device(
+                            name=network_name,
+                            signal=signal,
+                            security=security,
+                            address=mac_address,  # Adres MAC punktu dostępowego
+                            type=WIFI_TYPE,
+                            id=f"wifi_{len(networks)}"
+                        ))
             else:
                 # Użyj modułu wifi na Linux/macOS
+                wifi = _lazy_module("wifi")
                 for i, cell in enumerate(wifi.Cell.all('wlan0')):
-                    networks.append({
-                        "name": cell.ssid,
-                        "signal": f"{cell.signal}%",
-                        "security": cell.encryption_type,
-                        "address": cell.address,  # Dla modułu wifi, adres MAC jest już dostępny jako cell.address
-                        "type": "📡",  # Ikona sieci Wi-Fi
-                        "id": f"wifi_{i}"
-                    })
+                    networks.append(Device(
+                        name=cell.ssid,
+                        signal=f"{cell.signal}%",
+                        security=cell.encryption_type,
+                        address=cell.address,  # Dla modułu wifi, adres MAC jest już dostępny jako cell.address
+                        type=WIFI_TYPE,
+                        id=f"wifi_{i}"
+                    ))
                     
             return {"status": "success", "devices": networks}
             
+        except subprocess.TimeoutExpired:
+            return {"error": "Przekroczono limit czasu skanowania sieci Wi-Fi."}
         except Exception as e:
             return {"error": f"Wystąpił błąd podczas skanowania sieci Wi-Fi: {str(e)}"}
     
-    async def _scan_bluetooth_devices_async(self):
-        """Asynchronously scan for available Bluetooth devices using bleak."""
-        devices = []
+    async def _scan_bluetooth_devices_async(self, timeout=BLUETOOTH_SCAN_TIMEOUT, on_device=None, num=None):
+        """
+        Asynchronously scan for available Bluetooth devices using an active bleak scan session.
+        If on_device is given, it is called with each newly detected device.
+        If num is given, the scan stops as soon as that many devices were found.
+        """
+        found = {}
+        enough_devices = asyncio.Event()
         print("Scanning Bluetooth devices...")
         
+        def detection_callback(device, advertisement_data):
+            # Devices are collected (and deduplicated by address) as advertisements arrive
+            if device.address in found:
+                found[device.address].rssi = advertisement_data.rssi
+                if device.name and found[device.address].name == "Unknown name":
+                    found[device.address].name = device.name
+                return
+            
+            found[device.address] = Device(
+                name=device.name if device.name else "Unknown name",
+                address=device.address,
+                rssi=advertisement_data.rssi,
+                type=BT_TYPE,
+                id=f"bt_{len(found)}"
+            )
+            
+            if on_device:
+                on_device(found[device.address])
+            
+            if num and len(found) >= num:
+                enough_devices.set()
+        
         try:
-            # Check if Bluetooth adapter is enabled
-            ble_devices = await BleakScanner.discover()
-            
-            for i, device in enumerate(ble_devices):
-                devices.append({
-                    "name": device.name if device.name else "Unknown name",
-                    "address": device.address,
-                    "type": "🔷",  # Bluetooth icon
-                    "id": f"bt_{i}"
-                })
+            async with _bluetooth_scan_lock:
+                scanner = _lazy_module("bleak").BleakScanner(detection_callback=detection_callback, scanning_mode="active")
+                await scanner.start()
+                try:
+                    await asyncio.wait_for(enough_devices.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass  # Minął pełny czas skanowania
+                await scanner.stop()
         except Exception as e:
             print(f"Error while scanning Bluetooth: {e}")
             
-        return devices
+        return list(found.values())
+    
+    @ttl_cache(seconds=8)
+    def scan_bluetooth_devices(self, timeout=BLUETOOTH_SCAN_TIMEOUT, num=None):
+        """Scan for available Bluetooth devices, stopping early once num devices are found."""
+        try:
+            # Run the scan on the persistent event loop; waiting for an overlapping
+            # scan to release the lock may take one extra scan window.
+            # Devices are already deduplicated by address during the scan.
+            future = asyncio.run_coroutine_threadsafe(self._scan_bluetooth_devices_async(timeout, num=num), _event_loop)
+            return {"status": "success", "devices": future.result(timeout=2 * timeout + 2)}
+            
+        except Exception as e:
+            return {"error": f"An error occurred while scanning Bluetooth devices: {str(e)}"}
     
-    def scan_bluetooth_devices(self):
-        """Scan for available Bluetooth devices and show paired devices."""
+    def scan_bluetooth_changes(self, since=None, timeout=BLUETOOTH_SCAN_TIMEOUT, num=None):
+        """
+        Scan for Bluetooth devices and report only what changed since version `since`.
+        Devices whose address and name are unchanged are listed by address under "unchanged".
+        If `since` is missing or stale, the full device list is returned instead.
+        """
+        result = self.scan_bluetooth_devices(timeout, num)
+        if "error" in result:
+            return result
         
-                
+        devices = result["devices"]
+        current = {device.address: device.name for device in devices if device.address}
+        
+        with self._bt_state_lock:
+            previous, previous_version = self._last_bt, self._bt_version
+            if current != previous:
+                self._last_bt = current
+                self._bt_version += 1
+            version = self._bt_version
+        
+        if since is None or since != previous_version:
+            return {"status": "success", "devices": devices, "version": version}
+        
+        changed = [device for device in devices
+                   if not device.address or previous.get(device.address) != device.name]
+        unchanged = [address for address, name in current.items() if previous.get(address) == name]
+        
+        return {"status": "success", "devices": changed, "unchanged": unchanged, "version": version}
+    
+    @ttl_cache(seconds=30)
+    def get_paired_bluetooth_devices(self):
+        """Return Bluetooth devices paired with this computer, as reported by the OS."""
         try:
-
-            # Call the asynchronous function synchronously
-            if hasattr(asyncio, 'run'):  # Python 3.7+
-                discovered_devices = asyncio.run(self._scan_bluetooth_devices_async())
-            else:
-                # For older Python versions
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                discovered_devices = loop.run_until_complete(self._scan_bluetooth_devices_async())
-                loop.close()
+            paired = []
             
-            # Combine results, showing paired devices first
-            all_devices =  discovered_devices
+            if _IS_WINDOWS:
+                # Filtrowanie i serializacja po stronie PowerShell - w Pythonie tylko json.loads
+                result = run_command(["powershell", "-NoProfile", "-NonInteractive", "-Command", _PAIRED_DEVICES_PS],
+                                     timeout=15)
+                entries = json.loads(result.stdout) if result.stdout.strip() else []
+                
+                for entry in entries:
+                    address_match = _PNP_BT_ADDRESS_RE.search(entry.get("InstanceId") or "")
+                    if not address_match:
+                        continue  # Moduły radiowe i enumeratory nie mają adresu urządzenia
+                    raw_address = address_match.group(1)
+                    paired.append((entry.get("FriendlyName"),
+                                   ":".join(raw_address[i:i + 2] for i in range(0, 12, 2))))
+                    
+            elif _SYSTEM == "Darwin":
+                result = run_command(["system_profiler", "SPBluetoothDataType", "-json"], timeout=15)
+                data = json.loads(result.stdout)
+                
+                for controller in data.get("SPBluetoothDataType", []):
+                    for key in ("device_connected", "device_not_connected", "device_title"):
+                        for device in controller.get(key, []):
+                            for name, properties in device.items():
+                                paired.append((name, properties.get("device_address")))
+                                
+            else:
+                result = run_command(["bluetoothctl", "devices", "Paired"])
+                paired = [(name, address) for address, name in _BLUETOOTHCTL_DEVICE_RE.findall(result.stdout)]
             
-            # Remove duplicates (devices with the same address)
-            unique_devices = []
-            addresses_seen = set()
+            devices = [Device(
+                name=name or "Unknown name",
+                address=address.upper() if address else None,
+                type=BT_TYPE,
+                id=f"bt_paired_{i}",
+                paired=True
+            ) for i, (name, address) in enumerate(paired)]
             
-            for device in all_devices:
-                if 'address' in device and device['address'] not in addresses_seen:
-                    addresses_seen.add(device['address'])
-                    unique_devices.append(device)
-                elif 'address' not in device:
-                    unique_devices.append(device)
+            return {"status": "success", "devices": devices}
             
-            return {"status": "success", "devices": unique_devices}
+        except subprocess.TimeoutExpired:
+            return {"error": "Reading paired Bluetooth devices timed out."}
+        except Exception as e:
+            return {"error": f"An error occurred while reading paired Bluetooth devices: {str(e)}"}
+    
+    def _probe_camera(self, i):
+        """Sprawdza kamerę o podanym indeksie i zwraca jej opis lub None."""
+        cv2 = _lazy_module("cv2")
+        with pooled_camera(i, camera_backend()) as cap:
+            if not cap.isOpened():
+                return None
+            
+            # Próba uzyskania informacji o urządzeniu
+            # W przypadku kamer nie ma bezpośrednio adresu MAC, więc generujemy unikalny identyfikator
+            
+            # Pobierz rozdzielczość kamery jako część identyfikatora - otwarta kamera
+            # z niezerową rozdzielczością wystarcza, bez czekania na pierwszą klatkę
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if width <= 0:
+                return None
+            
+            # Stwórz identyfikator podobny do MAC
+            camera_id = f"CAM:{i:02d}:{width:04d}:{height:04d}"
+            
+            return Device(
+                name=f"Kamera {i}",
+                index=i,
+                address=camera_id,  # Dodajemy identyfikator kamery
+                type=CAM_TYPE,
+                id=f"cam_{i}"
+            )
+    
+    def stream_bluetooth_devices(self, on_device, timeout=BLUETOOTH_SCAN_TIMEOUT):
+        """Scan for Bluetooth devices, reporting each new device through on_device as it is detected."""
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                self._scan_bluetooth_devices_async(timeout, on_device), _event_loop
+            )
+            return {"status": "success", "devices": future.result(timeout=2 * timeout + 2)}
             
         except Exception as e:
             return {"error": f"An error occurred while scanning Bluetooth devices: {str(e)}"}
     
+    @ttl_cache(seconds=60)
     def list_available_cameras(self):
         """Wyświetla listę dostępnych kamer."""
         if not CAMERA_MODULE_AVAILABLE:
@@ -198,31 +1236,11 @@ class DeviceScanner:
         try:
             print("Sprawdzanie dostępnych kamer...")
             
-            available_cameras = []
-            # Sprawdź pierwsze 5 indeksów (0-4)
-            for i in range(5):
-                cap = cv2.VideoCapture(i)
-                if cap.isOpened():
-                    ret, frame = cap.read()
-                    if ret:
-                        # Próba uzyskania informacji o urządzeniu
-                        # W przypadku kamer nie ma bezpośrednio adresu MAC, więc generujemy unikalny identyfikator
-                        
-                        # Pobierz rozdzielczość kamery jako część identyfikatora
-                        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                        
-                        # Stwórz identyfikator podobny do MAC
-                        camera_id = f"CAM:{i:02d}:{width:04d}:{height:04d}"
-                        
-                        available_cameras.append({
-                            "name": f"Kamera {i}",
-                            "index": i,
-                            "address": camera_id,  # Dodajemy identyfikator kamery
-                            "type": "📹",  # Ikona kamery
-                            "id": f"cam_{i}"
-                        })
-                    cap.release()
+            # Sprawdź pierwsze 5 indeksów (0-4) równolegle - otwarcie kamery blokuje się w sterowniku
+            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                results = list(executor.map(self._probe_camera, range(5)))
+            
+            available_cameras = [camera for camera in results if camera is not None]
                     
             return {"status": "success", "devices": available_cameras}
             
@@ -234,7 +1252,6 @@ class DeviceCapabilityScanner:
     """Class for querying device capabilities using various protocols."""
     
     def __init__(self):
-        self.system = platform.system()
         self.protocols = {
             "wifi": self.query_wifi_device,
             "bluetooth": self.query_bluetooth_device,
@@ -242,14 +1259,81 @@ class DeviceCapabilityScanner:
             "manual": self.query_manual_device,
             "auto": self.auto_detect_device
         }
+        
+        # UUID usług GATT znalezionych podczas ostatniej analizy urządzenia Bluetooth (adres -> lista)
+        self._bt_services_by_addr = {}
+        # Wyniki sondowania ONVIF WS-Discovery (adres -> (bool, znacznik czasu))
+        self._onvif_cache = {}
+        # Mapa usług GATT urządzeń Bluetooth (adres -> usługi, operacje, znacznik czasu)
+        self._gatt_cache = self._load_gatt_cache()
+        self._gatt_cache_lock = threading.Lock()
+        self._gatt_cache_write_lock = threading.Lock()
+        # Wyniki pełnej analizy urządzeń sieciowych i kamer ((adres, sygnatura usług) -> wynik)
+        self._analysis_cache = {}
+        self._analysis_cache_lock = threading.Lock()
+        # Wyniki identyfikacji usług ((adres, port) -> (znacznik czasu, service_info))
+        self._service_cache = {}
+        self._service_cache_lock = threading.Lock()
+        # Parametry lokalnych kamer (indeks -> rozdzielczość, fps, kontrolki), ważne przez cały czas działania
+        self._webcam_probe_cache = {}
+        # Wygładzone RTT połączeń TCP (adres -> (średnia, wariancja) w sekundach) do limitów czasu sond
+        self._rtt = {}
+        self._rtt_lock = threading.Lock()
+        # Stan portów ((adres, port, protokół) -> (otwarty, znacznik czasu)), także z wyników skanowania
+        self._port_state_cache = {}
+        self._port_state_lock = threading.Lock()
+        self._port_state_pruned = time.monotonic()
+        
+        # Wspólna pula wątków do równoległych zapytań HTTP o ścieżki API (czekają na sieć)
+        self._port_executor = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="port-check")
+        # Osobna pula dla niezależnych sond urządzeń sieciowych i kamer IP - same sondy
+        # mogą korzystać z puli zapytań HTTP
+        self._probe_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="device-probe")
+        # Port -> metoda identyfikująca usługę; nieznane porty obsługuje _identify_unknown_service
+        self._service_identifiers = {
+            80: self._identify_http_service,
+            8080: self._identify_http_service,
+            443: self._identify_https_service,
+            8443: self._identify_https_service,
+            22: self._identify_ssh_service,
+            21: self._identify_ftp_service,
+            445: self._identify_smb_service,
+            139: self._identify_smb_service,
+            23: self._identify_telnet_service,
+            25: self._identify_smtp_service,
+            587: self._identify_smtp_service,
+            465: self._identify_smtp_service,
+            110: self._identify_pop3_service,
+            995: self._identify_pop3_service,
+            143: self._identify_imap_service,
+            993: self._identify_imap_service,
+            53: self._identify_dns_service,
+            554: self._identify_rtsp_service,
+            8554: self._identify_rtsp_service,
+            3389: self._identify_rdp_service,
+            5900: self._identify_vnc_service,
+            1883: self._identify_mqtt_service,
+            8883: self._identify_mqtt_service,
+            161: self._identify_snmp_service,
+            631: self._identify_ipp_service,
+            9100: self._identify_raw_printer_service,
+            9000: self._identify_web_admin_service,
+            9090: self._identify_web_admin_service,
+        }
     
-    def query_device_capabilities(self, address, device_type, method, device_id):
+    def query_device_capabilities(self, address, device_type, method, device_id, force=False, fast=False):
         """
         Główna metoda do wykrywania wszystkich możliwych operacji urządzenia.
         Wykonuje kompleksowe testy bezpośrednio na urządzeniu.
+        Wynik dla danego adresu i metody jest zapamiętywany; force=True wymusza ponowną analizę.
+        fast=True pomija sondy usług na jednoznacznych portach (urządzenia sieciowe).
         """
         print(f"Kompleksowe wykrywanie operacji urządzenia: {address} (Typ: {device_type}, Metoda: {method}, ID: {device_id})")
-        
+        return self._analyze_device(address, method, force=force, fast=fast)
+    
+    @ttl_cache(seconds=CAPABILITY_CACHE_TTL)
+    def _analyze_device(self, address, method, fast=False):
+        """Analizuje urządzenie metodą właściwą dla jego typu lub formatu adresu."""
         capabilities = []
         device_info = {}
         
@@ -258,20 +1342,21 @@ class DeviceCapabilityScanner:
             if method == "bluetooth":
                 capabilities, device_info = self._analyze_bluetooth_device(address)
             elif method in ["wifi", "manual"]:
-                capabilities, device_info = self._analyze_network_device(address)
+                capabilities, device_info = self._analyze_network_device(address, fast)
             elif method == "camera":
                 capabilities, device_info = self._analyze_camera_device(address)
             else:
                 # Automatyczne wykrycie metody na podstawie formatu adresu
-                if address and address.count(':') >= 5:  # Wygląda jak adres MAC
+                address_kind = _classify(address)
+                if address_kind == "bt":  # Wygląda jak adres MAC
                     capabilities, device_info = self._analyze_bluetooth_device(address)
-                elif address and address.count('.') == 3:  # Wygląda jak adres IP
-                    capabilities, device_info = self._analyze_network_device(address)
-                elif address and address.startswith('CAM:'):  # Wygląda jak ID kamery
+                elif address_kind == "ip":  # Wygląda jak adres IP
+                    capabilities, device_info = self._analyze_network_device(address, fast)
+                elif address_kind == "cam":  # Wygląda jak ID kamery
                     capabilities, device_info = self._analyze_camera_device(address)
         
         except Exception as e:
-            print(f"Błąd podczas analizy urządzenia: {str(e)}")
+            log.warning("Błąd podczas analizy urządzenia: %s", e)
             return {
                 "status": "error",
                 "error": str(e),
@@ -291,22 +1376,20 @@ class DeviceCapabilityScanner:
         
         try:
             # Check if address is a valid IP
-            is_valid_ip = False
-            if IPADDRESS_AVAILABLE:
-                try:
-                    ipaddress.ip_address(address)
-                    is_valid_ip = True
-                except ValueError:
-                    is_valid_ip = False
-            else:
-                # Simple validation if ipaddress module is not available
-                ip_pattern = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$')
-                match = ip_pattern.match(address)
-                is_valid_ip = match is not None and all(0 <= int(n) <= 255 for n in match.groups())
+            is_valid_ip = is_ip_address(address)
             
             if is_valid_ip:
-                # Ping the device to check connectivity
-                ping_result = self.ping_device(address)
+                # Ping, port scan and SNMP query run concurrently on the shared event loop
+                async def probe_device():
+                    return await asyncio.gather(
+                        asyncio.to_thread(self.ping_device, address),
+                        self.scan_ports_async(address),
+                        self.query_snmp_async(address)
+                    )
+                
+                future = asyncio.run_coroutine_threadsafe(probe_device(), _event_loop)
+                ping_result, port_scan, snmp_data = future.result(timeout=DEVICE_PROBE_TIMEOUT)
+                
                 raw_data["ping"] = ping_result
                 
                 if ping_result.get("success", False):
@@ -316,44 +1399,26 @@ class DeviceCapabilityScanner:
                         "available": True
                     })
                 
-                # Try to detect open ports if nmap is available
-                if NMAP_AVAILABLE:
-                    port_scan = self.scan_ports(address)
-                    raw_data["port_scan"] = port_scan
-                    
-                    # Add capabilities based on open ports
-                    for port, service in port_scan.get("open_ports", {}).items():
-                        capabilities.append({
-                            "name": f"Connect to {service}",
-                            "description": f"Device has {service} service on port {port}",
-                            "available": True,
-                            "port": port
-                        })
-                else:
-                    # If nmap is not available, check common ports manually
-                    common_ports = [80, 443, 22, 8080]
-                    for port in common_ports:
-                        if self.check_port_open(address, port):
-                            service = self.get_service_name(port)
-                            capabilities.append({
-                                "name": f"Connect to {service}",
-                                "description": f"Device has {service} service on port {port}",
-                                "available": True,
-                                "port": port
-                            })
+                raw_data["port_scan"] = port_scan
                 
-                # Try SNMP query if available
-                if SNMP_AVAILABLE:
-                    snmp_data = self.query_snmp(address)
-                    if snmp_data.get("success", False):
-                        raw_data["snmp"] = snmp_data
-                        
-                        # Add SNMP capabilities
-                        capabilities.append({
-                            "name": "Monitor via SNMP",
-                            "description": "Device supports SNMP monitoring",
-                            "available": True
-                        })
+                # Add capabilities based on open ports
+                for port, service in port_scan.get("open_ports", {}).items():
+                    capabilities.append({
+                        "name": f"Connect to {service}",
+                        "description": f"Device has {service} service on port {port}",
+                        "available": True,
+                        "port": port
+                    })
+                
+                if snmp_data.get("success", False):
+                    raw_data["snmp"] = snmp_data
+                    
+                    # Add SNMP capabilities
+                    capabilities.append({
+                        "name": "Monitor via SNMP",
+                        "description": "Device supports SNMP monitoring",
+                        "available": True
+                    })
         
         except Exception as e:
             print(f"Error querying Wi-Fi device: {str(e)}")
@@ -458,18 +1523,7 @@ class DeviceCapabilityScanner:
         
         try:
             # Check if we have a valid IP address
-            is_valid_ip = False
-            if IPADDRESS_AVAILABLE:
-                try:
-                    ipaddress.ip_address(address)
-                    is_valid_ip = True
-                except ValueError:
-                    is_valid_ip = False
-            else:
-                # Simple validation if ipaddress module is not available
-                ip_pattern = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$')
-                match = ip_pattern.match(address)
-                is_valid_ip = match is not None and all(0 <= int(n) <= 255 for n in match.groups())
+            is_valid_ip = is_ip_address(address)
             
             if is_valid_ip:
                 # Try to ping the device
@@ -484,15 +1538,14 @@ class DeviceCapabilityScanner:
                     
                     # Check for common open ports manually
                     common_ports = [80, 443, 22, 21, 8080]
-                    for port in common_ports:
-                        if self.check_port_open(address, port):
-                            service = self.get_service_name(port)
-                            capabilities.append({
-                                "name": f"Connect to {service}",
-                                "description": f"Device has {service} service on port {port}",
-                                "available": True,
-                                "port": port
-                            })
+                    for port in self.find_open_ports(address, common_ports):
+                        service = self.get_service_name(port)
+                        capabilities.append({
+                            "name": f"Connect to {service}",
+                            "description": f"Device has {service} service on port {port}",
+                            "available": True,
+                            "port": port
+                        })
             
         except Exception as e:
             print(f"Error querying manual device: {str(e)}")
@@ -506,35 +1559,45 @@ class DeviceCapabilityScanner:
     def auto_detect_device(self, address, device_type, device_id):
         """Automatically detect device type and query capabilities."""
         # Try to determine the best method based on the address format and device type
-        if address and address.count(':') >= 5:  # Looks like a MAC address
+        address_kind = _classify(address)
+        if address_kind == "bt":  # Looks like a MAC address
             return self.query_bluetooth_device(address, device_type, device_id)
-        elif address and address.count('.') == 3:  # Looks like an IP address
-            if device_type == '📹':
+        elif address_kind == "ip":  # Looks like an IP address
+            if device_type == CAM_TYPE:
                 return self.query_camera_device(address, device_type, device_id)
             else:
                 return self.query_wifi_device(address, device_type, device_id)
-        elif address and address.startswith('CAM:'):  # Looks like a camera ID
+        elif address_kind == "cam":  # Looks like a camera ID
             return self.query_camera_device(address, device_type, device_id)
         else:
             # Default to manual device query
             return self.query_manual_device(address, device_type, device_id)
     
     # Helper methods
-    def ping_device(self, address):
+    def ping_device(self, address, timeout=1.0):
         """Ping a device to check if it's online."""
         try:
-            param = '-n' if self.system == 'Windows' else '-c'
-            command = ['ping', param, '1', address]
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=2)
+            # ICMP Echo bezpośrednio z gniazda, bez uruchamiania procesu ping
+            icmp_result = self._icmp_ping(address, timeout)
+            if icmp_result is not None:
+                success, response_time = icmp_result
+                return {
+                    "success": success,
+                    "responseTime": response_time
+                }
+            
+            # Brak uprawnień do gniazd ICMP - użyj systemowego polecenia ping
+            command = ['ping', _PING_COUNT_FLAG, '1', address]
+            result = run_command(command, timeout=2)
             
             success = result.returncode == 0
             response_time = None
             
             if success:
                 # Try to extract response time
-                time_match = re.search(r'time=(\d+)ms', result.stdout)
+                time_match = _PING_RE.search(result.stdout)
                 if time_match:
-                    response_time = int(time_match.group(1))
+                    response_time = float(time_match.group(1))
             
             return {
                 "success": success,
@@ -547,25 +1610,131 @@ class DeviceCapabilityScanner:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def scan_ports(self, address):
-        """Scan common ports on the device using nmap."""
-        if not NMAP_AVAILABLE:
-            return {"success": False, "error": "nmap module not available"}
+    def _icmp_ping(self, address, timeout=1.0):
+        """
+        Send one ICMP Echo Request and wait for the reply.
+        Returns (success, rtt_ms), or None when no ICMP socket can be opened
+        (raw sockets need root/admin; datagram ICMP sockets are Linux/macOS only).
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            raw = True
+        except OSError:
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+                raw = False
+            except OSError:
+                return None
         
         try:
-            nm = nmap.PortScanner()
-            nm.scan(address, '21-25,80,443,8080,8443,1883,3389')
-            
-            open_ports = {}
-            
-            if address in nm.all_hosts():
-                for proto in nm[address].all_protocols():
-                    for port in sorted(nm[address][proto].keys()):
-                        if nm[address][proto][port]['state'] == 'open':
-                            service = nm[address][proto][port]['name']
-                            open_ports[port] = service
-            
-            return {
+            identifier = os.getpid() & 0xFFFF
+            sequence = next(_icmp_sequence) & 0xFFFF
+            payload = b"device-finder"
+            header = struct.pack(">BBHHH", 8, 0, 0, identifier, sequence)
+            checksum = _icmp_checksum(header + payload)
+            packet = struct.pack(">BBHHH", 8, 0, checksum, identifier, sequence) + payload
+            
+            # Odpowiedź przychodzi z adresu IP, więc nazwę hosta trzeba rozwiązać przed wysłaniem
+            ip = resolve_host(address)
+            start = time.perf_counter()
+            deadline = start + timeout
+            sock.sendto(packet, (ip, 0))
+            
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False, None
+                
+                readable, _, _ = select.select([sock], [], [], remaining)
+                if not readable:
+                    return False, None
+                
+                data, source = sock.recvfrom(1024)
+                if source[0] != ip:
+                    continue
+                
+                # Gniazdo surowe (a na macOS także datagramowe) zwraca także nagłówek IPv4
+                if raw or data[0] >> 4 == 4:
+                    data = data[(data[0] & 0x0F) * 4:]
+                if len(data) < 8:
+                    continue
+                
+                icmp_type, _, _, reply_id, reply_sequence = struct.unpack(">BBHHH", data[:8])
+                # Dla gniazd datagramowych identyfikator nadaje jądro, więc sprawdzany jest tylko numer sekwencyjny
+                if icmp_type == 0 and reply_sequence == sequence and (not raw or reply_id == identifier):
+                    return True, round((time.perf_counter() - start) * 1000, 2)
+        
+        except OSError:
+            return False, None
+        finally:
+            sock.close()
+    
+    def scan_ports(self, address, use_nmap=False, fast=True):
+        """
+        Scan common ports on the device.
+        By default all ports are probed concurrently with asyncio connections on the shared
+        event loop; use_nmap=True runs nmap instead, which also detects service names from banners.
+        fast=True runs nmap with aggressive timing (NMAP_FAST_ARGUMENTS).
+        """
+        if use_nmap:
+            return self._scan_ports_nmap(address, fast=fast)
+        
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.scan_ports_async(address), _event_loop)
+            return future.result(timeout=PORT_CHECK_TIMEOUT + 5)
+        
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    async def scan_ports_async(self, address):
+        """Probe all SCAN_PORTS concurrently with asyncio connections."""
+        address = await asyncio.to_thread(resolve_host, address)
+        
+        async def probe(port):
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(address, port),
+                                                        timeout=PORT_CHECK_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                return False
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+            return True
+        
+        try:
+            results = await asyncio.gather(*(probe(port) for port in SCAN_PORTS))
+            
+            open_ports = {port: self.get_service_name(port)
+                          for port, is_open in zip(SCAN_PORTS, results) if is_open}
+            
+            return {
+                "success": True,
+                "open_ports": open_ports
+            }
+        
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def _scan_ports_nmap(self, address, fast=True):
+        """Scan common ports on the device using nmap."""
+        if not NMAP_AVAILABLE:
+            return {"success": False, "error": "nmap module not available"}
+        
+        try:
+            nm = _lazy_module("nmap").PortScanner()
+            nm.scan(address, ','.join(str(port) for port in SCAN_PORTS),
+                    arguments=NMAP_FAST_ARGUMENTS if fast else "-sV")
+            
+            open_ports = {}
+            
+            if address in nm.all_hosts():
+                for proto in nm[address].all_protocols():
+                    for port in sorted(nm[address][proto].keys()):
+                        if nm[address][proto][port]['state'] == 'open':
+                            service = nm[address][proto][port]['name']
+                            open_ports[port] = service
+            
+            return {
                 "success": True,
                 "open_ports": open_ports
             }
@@ -601,67 +1770,246 @@ class DeviceCapabilityScanner:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def check_port_open(self, address, port, protocol="tcp"):
-        """Check if a specific port is open on the device."""
+    async def query_snmp_async(self, address):
+        """Try to query device using SNMP without blocking the event loop."""
+        if not SNMP_AVAILABLE:
+            return {"success": False, "error": "SNMP module not available"}
+        
+        # Starsze wydania pysnmp bez API asyncio - zapytanie blokujące w wątku
+        if not SNMP_ASYNC_AVAILABLE:
+            return await asyncio.to_thread(self.query_snmp, address)
+        
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex((address, port))
+            # Try with public community string (read-only)
+            error_indication, error_status, error_index, var_binds = await snmp_asyncio.getCmd(
+                snmp_asyncio.SnmpEngine(),
+                snmp_asyncio.CommunityData('public', mpModel=0),  # SNMPv1
+                snmp_asyncio.UdpTransportTarget((address, 161), timeout=2, retries=1),
+                snmp_asyncio.ContextData(),
+                snmp_asyncio.ObjectType(snmp_asyncio.ObjectIdentity('1.3.6.1.2.1.1.1.0'))  # sysDescr
+            )
+            
+            if error_indication:
+                return {"success": False, "error": str(error_indication)}
+            elif error_status:
+                return {"success": False, "error": f"SNMP error: {error_status}"}
+            else:
+                system_info = var_binds[0][1].prettyPrint()
+                return {"success": True, "system_info": system_info}
+        
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def check_port_open(self, address, port, protocol="tcp", timeout=1):
+        """Check if a specific port is open on the device (result cached for PORT_STATE_CACHE_TTL seconds)."""
+        key = (address, port, protocol)
+        with self._port_state_lock:
+            entry = self._port_state_cache.get(key)
+        if entry is not None and time.monotonic() - entry[1] < PORT_STATE_CACHE_TTL:
+            return entry[0]
+        
+        is_open = self._connect_port(address, port, timeout)
+        self._remember_port_state(address, port, is_open, protocol)
+        return is_open
+    
+    def _remember_port_state(self, address, port, is_open, protocol="tcp"):
+        now = time.monotonic()
+        with self._port_state_lock:
+            # Co PORT_STATE_CACHE_TTL usuń przeterminowane wpisy, aby słownik nie rósł z każdym skanowanym portem
+            if now - self._port_state_pruned >= PORT_STATE_CACHE_TTL:
+                for stale in [k for k, (_, ts) in self._port_state_cache.items() if now - ts >= PORT_STATE_CACHE_TTL]:
+                    del self._port_state_cache[stale]
+                self._port_state_pruned = now
+            self._port_state_cache[(address, port, protocol)] = (is_open, now)
+    
+    def _connect_port(self, address, port, timeout):
+        """Sprawdza port jednym nieblokującym połączeniem TCP."""
+        try:
+            # Połączenie nieblokujące - odrzucenie (RST) kończy sprawdzanie od razu,
+            # a na pełny limit czasu czekają tylko porty filtrowane
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.setblocking(False)
+                started = time.monotonic()
+                result = sock.connect_ex((resolve_host(address), port))
+                if result != 0:
+                    # Windows zgłasza nieudane połączenie w zbiorze wyjątków, nie zapisu
+                    _, writable, failed = select.select([], [sock], [sock], timeout)
+                    if not writable or failed or sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) != 0:
+                        return False
+                self._record_rtt(address, time.monotonic() - started)
+                return True
+        except OSError:
+            return False
+    
+    def _record_rtt(self, address, rtt):
+        """Aktualizuje wygładzone RTT hosta (średnia i wariancja ważone wykładniczo)."""
+        with self._rtt_lock:
+            entry = self._rtt.get(address)
+            if entry is None:
+                self._rtt[address] = (rtt, (rtt / 2) ** 2)
+                return
+            average, variance = entry
+            deviation = rtt - average
+            self._rtt[address] = (average + deviation / 8, 0.75 * variance + 0.25 * deviation * deviation)
+    
+    def _rtt_timeout(self, address, default=PROBE_TIMEOUT):
+        """Limit czasu połączenia z hostem: 3×RTT + 2σ, w granicach RTT_TIMEOUT_MIN..default."""
+        with self._rtt_lock:
+            entry = self._rtt.get(address)
+        if entry is None:
+            return default
+        average, variance = entry
+        return max(RTT_TIMEOUT_MIN, min(default, 3 * average + 2 * variance ** 0.5))
+    
+    def _connect_probe(self, address, port, timeout=PROBE_TIMEOUT):
+        """
+        Łączy się z usługą z limitem czasu dopasowanym do zmierzonego RTT hosta.
+        Odczyty z połączonego gniazda mają limit timeout - odpowiedź zależy od serwera, nie od sieci.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self._rtt_timeout(address, timeout))
+            started = time.monotonic()
+            sock.connect((resolve_host(address), port))
+            self._record_rtt(address, time.monotonic() - started)
+            sock.settimeout(timeout)
+            return sock
+        except OSError:
             sock.close()
-            return result == 0
-        except:
+            raise
+    
+    def _tcp_reachable(self, address, ports=REACHABILITY_PORTS, timeout=REACHABILITY_TIMEOUT):
+        """
+        Sprawdza osiągalność hosta nieblokującymi połączeniami TCP do kilku portów naraz.
+        Odrzucenie połączenia (RST) także oznacza, że host działa.
+        """
+        sockets = []
+        try:
+            address = resolve_host(address)
+            for port in ports:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sockets.append(sock)
+                sock.setblocking(False)
+                if sock.connect_ex((address, port)) in (0, errno.ECONNREFUSED):
+                    return True
+            
+            pending = list(sockets)
+            deadline = time.monotonic() + timeout
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # Windows zgłasza nieudane połączenie w zbiorze wyjątków, nie zapisu
+                _, writable, failed = select.select([], pending, pending, remaining)
+                for sock in set(writable) | set(failed):
+                    if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) in (0, errno.ECONNREFUSED):
+                        return True
+                    pending.remove(sock)
             return False
+        except OSError:
+            return False
+        finally:
+            for sock in sockets:
+                sock.close()
     
-    def get_service_name(self, port):
+    def find_open_ports(self, address, ports, timeout=PORT_CHECK_TIMEOUT):
+        """
+        Check the given ports with non-blocking connects multiplexed by a single selector
+        (no thread per port) and return the open ones, in the order given.
+        """
+        open_ports = set()
+        host = resolve_host(address)
+        with selectors.DefaultSelector() as selector:
+            try:
+                for port in ports:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    try:
+                        sock.setblocking(False)
+                        # Zamknięcie przez RST zamiast FIN - gniazdo nie zostaje w TIME_WAIT
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+                        result = sock.connect_ex((host, port))
+                    except OSError as e:
+                        # Gniazdo nie trafiło jeszcze do selektora - zamknij je i sprawdź kolejny port
+                        sock.close()
+                        _log_failure("Błąd podczas sprawdzania portu %s na %s: %s", port, address, e)
+                        continue
+                    if result in _CONNECT_PENDING:
+                        selector.register(sock, selectors.EVENT_WRITE, (port, time.monotonic()))
+                        continue
+                    if result == 0:
+                        open_ports.add(port)
+                    elif result == errno.ECONNREFUSED:
+                        self._remember_port_state(address, port, False)
+                    sock.close()
+                
+                # Windows zgłasza nieudane połączenie w zbiorze wyjątków - DefaultSelector
+                # (select) traktuje je jak gotowość do zapisu, decyduje SO_ERROR
+                deadline = time.monotonic() + timeout
+                while selector.get_map():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    for key, _ in selector.select(remaining):
+                        sock = key.fileobj
+                        port, started = key.data
+                        error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                        if error == 0:
+                            open_ports.add(port)
+                            self._record_rtt(address, time.monotonic() - started)
+                        elif error == errno.ECONNREFUSED:
+                            # Tylko odrzucenie jest pewne - port bez odpowiedzi mógł nie zdążyć
+                            self._remember_port_state(address, port, False)
+                        selector.unregister(sock)
+                        sock.close()
+            except OSError as e:
+                _log_failure("Błąd podczas sprawdzania portów %s: %s", address, e)
+            finally:
+                for key in list(selector.get_map().values()):
+                    key.fileobj.close()
+        
+        # Sondy usług sprawdzające te porty przez check_port_open nie łączą się ponownie
+        for port in open_ports:
+            self._remember_port_state(address, port, True)
+        return [port for port in ports if port in open_ports]
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_service_name(port):
         """Get service name for common ports."""
-        services = {
-            21: "FTP",
-            22: "SSH",
-            23: "Telnet",
-            25: "SMTP",
-            80: "HTTP",
-            110: "POP3",
-            143: "IMAP",
-            443: "HTTPS",
-            993: "IMAPS",
-            995: "POP3S",
-            1883: "MQTT",
-            3389: "RDP",
-            8080: "HTTP-Alt",
-            8443: "HTTPS-Alt"
-        }
-        return services.get(port, f"Port {port}")
+        return _SERVICES.get(port, f"Port {port}")
     
     def detect_bluetooth_profiles(self, address):
-        """Detect Bluetooth profiles supported by the device."""
-        # Generate a seed from the MAC address for consistent results
-        seed = sum(ord(c) for c in address)
-        random.seed(seed)
-        
-        # Return empty list for 30% of devices (no profiles found)
-        if random.random() < 0.3:
-            return []
-            
-        # Define common Bluetooth profiles
-        common_profiles = ["A2DP", "HFP", "HID", "PBAP", "MAP", "PAN", "OPP"]
-        
-        # Generate between 0-3 profiles
-        num_profiles = random.randint(0, 3)
-        if num_profiles == 0:
-            return []
-            
-        profiles = random.sample(common_profiles, num_profiles)
-        return profiles
+        """Detect Bluetooth profiles from the GATT services found by the last analysis of the device."""
+        services = self._bt_services_by_addr.get(address, [])
+        return self._detect_bluetooth_profiles([{"uuid": service_uuid} for service_uuid in services])
     
     def might_support_onvif(self, address):
-        """Check if an IP camera might support the ONVIF protocol."""
-        # Simple probability-based method
-        # Use address to seed the random generator for consistent results
-        seed = sum(ord(c) for c in address)
-        random.seed(seed)
+        """Check if an IP camera answers an ONVIF WS-Discovery probe (result cached per address for ONVIF_CACHE_TTL)."""
+        entry = self._onvif_cache.get(address)
+        if entry is not None and time.monotonic() - entry[1] < ONVIF_CACHE_TTL:
+            return entry[0]
+        
+        # Lokalne kamery (CAM:) nie obsługują ONVIF
+        supported = False
+        if is_ip_address(address):
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                    sock.settimeout(ONVIF_PROBE_TIMEOUT)
+                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+                    sock.sendto(_WS_DISCOVERY_PROBE.format(message_id=uuid.uuid4()).encode(),
+                                ("239.255.255.250", 3702))
+                    
+                    deadline = time.monotonic() + ONVIF_PROBE_TIMEOUT
+                    while time.monotonic() < deadline:
+                        data, (source, _) = sock.recvfrom(65535)
+                        if source == address and b"ProbeMatch" in data:
+                            supported = True
+                            break
+            except OSError:
+                pass  # Brak odpowiedzi w wyznaczonym czasie
         
-        # 30% chance of ONVIF support
-        return random.random() < 0.3
+        self._onvif_cache[address] = (supported, time.monotonic())
+        return supported
 
     def _analyze_bluetooth_device(self, address):
         """
@@ -684,7 +2032,6 @@ class DeviceCapabilityScanner:
             return capabilities, device_info
         
         try:
-            import asyncio
             from bleak import BleakScanner, BleakClient
             
             # Funkcja asynchroniczna do kompleksowej analizy
@@ -694,7 +2041,8 @@ class DeviceCapabilityScanner:
                 
                 # Najpierw zlokalizuj urządzenie
                 print(f"Skanowanie urządzenia Bluetooth {address}...")
-                found_device = await BleakScanner.find_device_by_address(address, timeout=5.0)
+                async with _bluetooth_scan_lock:
+                    found_device = await BleakScanner.find_device_by_address(address, timeout=5.0)
                 
                 if not found_device:
                     print(f"Nie znaleziono urządzenia Bluetooth {address}")
@@ -704,171 +2052,100 @@ class DeviceCapabilityScanner:
                 device_info["name"] = found_device.name or "Nieznana nazwa"
                 device_info["connection_status"] = "discoverable"
                 
-                # Spróbuj się połączyć i uzyskać szczegółowe informacje
-                try:
-                    print(f"Nawiązywanie połączenia z {address}...")
-                    client = BleakClient(address, timeout=5.0)
-                    await client.connect()
-                    
-                    if client.is_connected:
-                        print(f"Połączono z {address}")
-                        device_info["connection_status"] = "connected"
+                # Użyj zapamiętanej mapy usług GATT lub spróbuj się połączyć i uzyskać szczegółowe informacje
+                cached = self._get_gatt_cache(address)
+                if cached is not None:
+                    print(f"Używanie zapamiętanych usług GATT urządzenia {address}")
+                    device_info["connection_status"] = "cached"
+                    device_info["services"] = cached["services"]
+                    device_operations.extend(dict(operation) for operation in cached["operations"])
+                else:
+                    try:
+                        print(f"Nawiązywanie połączenia z {address}...")
+                        client = BleakClient(address, timeout=5.0)
+                        await client.connect()
                         
-                        # Zbadaj wszystkie usługi i charakterystyki
-                        for service in client.services:
-                            service_uuid = str(service.uuid)
-                            service_name = service.description or f"Usługa {service_uuid[:8]}"
+                        if client.is_connected:
+                            print(f"Połączono z {address}")
+                            device_info["connection_status"] = "connected"
                             
-                            service_info = {
-                                "uuid": service_uuid,
-                                "name": service_name,
-                                "characteristics": []
-                            }
+                            # Zbadaj wszystkie usługi i charakterystyki - charakterystyki są badane
+                            # równolegle, bleak kolejkuje żądania w ramach jednego połączenia
+                            pairs = []
+                            service_descriptions = set()
+                            for service in client.services:
+                                service_uuid = sys.intern(str(service.uuid))
+                                service_name = service.description or f"Usługa {service_uuid[:8]}"
+                                if service.description:
+                                    service_descriptions.add(service.description.lower())
+                                print(f"Analizowanie usługi: {service_name} ({service_uuid})")
+                                
+                                device_info["services"].append({
+                                    "uuid": service_uuid,
+                                    "name": service_name,
+                                    "characteristics": []
+                                })
+                                for char in service.characteristics:
+                                    pairs.append((device_info["services"][-1], char))
                             
-                            print(f"Analizowanie usługi: {service_name} ({service_uuid})")
+                            results = await asyncio.gather(
+                                *(self._inspect_characteristic(client, service_info, char) for service_info, char in pairs),
+                                return_exceptions=True
+                            )
                             
-                            # Znajdź operacje dla każdej charakterystyki
-                            for char in service.characteristics:
-                                char_uuid = str(char.uuid)
-                                char_name = char.description or f"Właściwość {char_uuid[:8]}"
-                                
-                                char_info = {
-                                    "uuid": char_uuid,
-                                    "name": char_name,
-                                    "properties": []
-                                }
-                                
-                                # Zbadaj właściwości charakterystyki
-                                if "read" in char.properties:
-                                    char_info["properties"].append("read")
-                                    try:
-                                        # Spróbuj odczytać wartość, jeśli możliwe
-                                        value = await client.read_gatt_char(char.uuid)
-                                        char_info["value"] = value.hex()
-                                        
-                                        # Utwórz operację na podstawie charakterystyki
-                                        device_operations.append({
-                                            "name": f"Odczyt {char_name}",
-                                            "description": f"Odczytaj dane z {service_name}",
-                                            "available": True,
-                                            "service": service_uuid,
-                                            "characteristic": char_uuid,
-                                            "operation": "read"
-                                        })
-                                        
-                                        # Sprawdź, czy to poziom baterii
-                                        if (char_uuid.startswith("00002a19") or "battery" in char_name.lower()) and len(value) == 1:
-                                            device_info["battery_level"] = value[0]
-                                    except Exception as e:
-                                        print(f"  Nie można odczytać {char_name}: {e}")
+                            operation_keys = set()
+                            for (service_info, char), result in zip(pairs, results):
+                                if isinstance(result, BaseException):
+                                    print(f"  Nie można zbadać charakterystyki {char.uuid}: {result}")
+                                    continue
                                 
-                                if "write" in char.properties:
-                                    char_info["properties"].append("write")
-                                    device_operations.append({
-                                        "name": f"Zapis {char_name}",
-                                        "description": f"Wyślij dane do {service_name}",
-                                        "available": True,
-                                        "service": service_uuid,
-                                        "characteristic": char_uuid,
-                                        "operation": "write"
-                                    })
+                                char_info, operations, battery_level = result
+                                service_info["characteristics"].append(char_info)
+                                if battery_level is not None:
+                                    device_info["battery_level"] = battery_level
                                 
-                                if "notify" in char.properties:
-                                    char_info["properties"].append("notify")
-                                    
-                                    # Przed dodaniem nowej operacji
-                                    operation_keys = set()
-                                    for operation in device_operations:
-                                        # Utwórz klucz w oparciu o nazwę i opis, aby uniknąć duplikatów
-                                        key = f"{operation['name']}:{operation['description']}"
+                                for operation in operations:
+                                    # Subskrypcje o tej samej nazwie i opisie dodawane są tylko raz
+                                    if operation.operation == "notify":
+                                        key = f"{operation.name}:{operation.description}"
+                                        if key in operation_keys:
+                                            continue
                                         operation_keys.add(key)
-                                    
-                                    # Sprawdź, czy operacja o tej samej nazwie i opisie już istnieje
-                                    new_op_key = f"Subskrypcja {char_name}:Odbieraj powiadomienia z {service_name}"
-                                    if new_op_key not in operation_keys:
-                                        device_operations.append({
-                                            "name": f"Subskrypcja {char_name}",
-                                            "description": f"Odbieraj powiadomienia z {service_name}",
-                                            "available": True,
-                                            "service": service_uuid,
-                                            "characteristic": char_uuid,
-                                            "operation": "notify"
-                                        })
-                                
-                                # Dodaj dodatkowe operacje dla znanych typów charakterystyk
-                                
-                                # Charakterystyki zasilania
-                                if "power" in char_name.lower() and "write" in char.properties:
-                                    device_operations.append({
-                                        "name": "Sterowanie zasilaniem",
-                                        "description": "Włącz/wyłącz urządzenie",
-                                        "available": True,
-                                        "service": service_uuid,
-                                        "characteristic": char_uuid,
-                                        "operation": "power_control"
-                                    })
-                                
-                                # Charakterystyki dźwięku
-                                if "audio" in char_name.lower() or "volume" in char_name.lower():
-                                    if "write" in char.properties:
-                                        device_operations.append({
-                                            "name": "Sterowanie głośnością",
-                                            "description": "Zmień poziom głośności",
-                                            "available": True,
-                                            "service": service_uuid,
-                                            "characteristic": char_uuid,
-                                            "operation": "volume_control"
-                                        })
-                                
-                                # Charakterystyki świateł/LED
-                                if "light" in char_name.lower() or "led" in char_name.lower():
-                                    if "write" in char.properties:
-                                        device_operations.append({
-                                            "name": "Sterowanie światłem",
-                                            "description": "Włącz/wyłącz/zmień kolor światła",
-                                            "available": True,
-                                            "service": service_uuid,
-                                            "characteristic": char_uuid,
-                                            "operation": "light_control"
-                                        })
-                                
-                                # Dodaj charakterystykę do usługi
-                                service_info["characteristics"].append(char_info)
+                                    device_operations.append(operation)
                             
-                            # Dodaj usługę do informacji o urządzeniu
-                            device_info["services"].append(service_info)
-                        
-                        # Dodaj operacje specyficzne dla urządzeń audio
-                        if any("audio" in service.description.lower() for service in client.services if service.description):
-                            device_operations.append({
-                                "name": "Sterowanie odtwarzaniem",
-                                "description": "Odtwórz/pauza/następny/poprzedni utwór",
-                                "available": True,
-                                "operation": "media_control"
-                            })
+                            # Dodaj operacje specyficzne dla urządzeń audio
+                            if any("audio" in description for description in service_descriptions):
+                                device_operations.append({
+                                    "name": "Sterowanie odtwarzaniem",
+                                    "description": "Odtwórz/pauza/następny/poprzedni utwór",
+                                    "available": True,
+                                    "operation": "media_control"
+                                })
+                            
+                            # Dodaj operacje synchronizacji danych dla urządzeń wearable
+                            if any("health" in description for description in service_descriptions):
+                                device_operations.append({
+                                    "name": "Synchronizacja danych",
+                                    "description": "Pobierz dane zdrowotne/fitness",
+                                    "available": True,
+                                    "operation": "data_sync"
+                                })
+                            
+                            self._store_gatt_cache(address, device_info, device_operations)
                         
-                        # Dodaj operacje synchronizacji danych dla urządzeń wearable
-                        if any("health" in service.description.lower() for service in client.services if service.description):
-                            device_operations.append({
-                                "name": "Synchronizacja danych",
-                                "description": "Pobierz dane zdrowotne/fitness",
-                                "available": True,
-                                "operation": "data_sync"
-                            })
+                        # Rozłącz się z urządzeniem
+                        await client.disconnect()
+                    
+                    except Exception as e:
+                        log.warning("Błąd podczas analizy urządzenia: %s", e)
+                        # Jeśli nie udało się połączyć, możemy wciąż wykonać kilka operacji
+                        device_operations.append({
+                            "name": "Parowanie",
+                            "description": "Sparuj z urządzeniem Bluetooth",
+                            "available": True,
+                            "operation": "pair"
+                        })
                     
-                    # Rozłącz się z urządzeniem
-                    await client.disconnect()
-                
-                except Exception as e:
-                    print(f"Błąd podczas analizy urządzenia: {e}")
-                    # Jeśli nie udało się połączyć, możemy wciąż wykonać kilka operacji
-                    device_operations.append({
-                        "name": "Parowanie",
-                        "description": "Sparuj z urządzeniem Bluetooth",
-                        "available": True,
-                        "operation": "pair"
-                    })
-                
                 # Dodaj podstawowe operacje dla wszystkich urządzeń Bluetooth
                 device_operations.append({
                     "name": "Połącz",
@@ -886,6 +2163,8 @@ class DeviceCapabilityScanner:
                 
                 # Wykryj profile Bluetooth na podstawie usług
                 device_info["profiles"] = self._detect_bluetooth_profiles(device_info["services"])
+                if device_info["services"]:
+                    self._bt_services_by_addr[address] = [service["uuid"] for service in device_info["services"]]
                 
                 # Dodaj operacje wyszukiwania urządzenia
                 device_operations.append({
@@ -897,51 +2176,180 @@ class DeviceCapabilityScanner:
                 
                 return device_operations, device_info
             
-            # Uruchom analizę asynchroniczną
-            if hasattr(asyncio, 'run'):  # Python 3.7+
-                capabilities, updated_info = asyncio.run(analyze_device())
-                device_info.update(updated_info)
-            else:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                capabilities, updated_info = loop.run_until_complete(analyze_device())
-                device_info.update(updated_info)
-                loop.close()
+            # Uruchom analizę na stałej pętli zdarzeń (tej samej co skanowanie Bluetooth)
+            future = asyncio.run_coroutine_threadsafe(analyze_device(), _event_loop)
+            capabilities, updated_info = future.result(timeout=BLUETOOTH_ANALYSIS_TIMEOUT)
+            device_info.update(updated_info)
         
         except Exception as e:
-            print(f"Błąd podczas analizy urządzenia Bluetooth: {e}")
+            log.warning("Błąd podczas analizy urządzenia Bluetooth: %s", e)
         
         return capabilities, device_info
 
+    def _get_analysis_cache(self, address, signature):
+        """Zwraca kopię zapamiętanej analizy urządzenia o tej samej sygnaturze usług lub None."""
+        with self._analysis_cache_lock:
+            entry = self._analysis_cache.get((address, signature))
+        if entry is None or time.time() - entry[0] >= ANALYSIS_CACHE_TTL:
+            return None
+        return copy.deepcopy(entry[1:])
+    
+    def _store_analysis_cache(self, address, signature, capabilities, device_info):
+        """Zapamiętuje wynik analizy urządzenia dla danej sygnatury usług."""
+        with self._analysis_cache_lock:
+            self._analysis_cache[(address, signature)] = (time.time(), copy.deepcopy(capabilities), copy.deepcopy(device_info))
+    
+    def _invalidate_analysis_cache(self, address):
+        """Usuwa zapamiętane analizy urządzenia, np. gdy przestało odpowiadać."""
+        with self._analysis_cache_lock:
+            for key in [key for key in self._analysis_cache if key[0] == address]:
+                del self._analysis_cache[key]
+    
+    def _get_gatt_cache(self, address):
+        """Zwraca zapamiętaną mapę usług GATT urządzenia, jeśli nie jest starsza niż GATT_CACHE_TTL."""
+        with self._gatt_cache_lock:
+            entry = self._gatt_cache.get(address)
+        if entry is None or time.time() - entry["ts"] >= GATT_CACHE_TTL:
+            return None
+        return entry
+    
+    def _store_gatt_cache(self, address, device_info, operations):
+        """
+        Zapamiętuje usługi GATT i operacje urządzenia (także na dysku, by przetrwały restart).
+        Poziom baterii nie jest zapamiętywany - zmienia się, a wpis żyje GATT_CACHE_TTL.
+        """
+        services = copy.deepcopy(device_info["services"])
+        for service in services:
+            for char_info in service["characteristics"]:
+                if _short_uuid(char_info["uuid"]) in BATTERY_SHORT_UUIDS:
+                    char_info.pop("value", None)
+        entry = {
+            "ts": time.time(),
+            "services": services,
+            "operations": [asdict(operation) if isinstance(operation, GattOp) else dict(operation) for operation in operations]
+        }
+        with self._gatt_cache_lock:
+            self._gatt_cache[address] = entry
+        # Zapis na dysk poza pętlą zdarzeń - wywołanie pochodzi z analizy Bluetooth
+        self._probe_executor.submit(self._write_gatt_cache)
+    
+    def _write_gatt_cache(self):
+        """Zapisuje aktualny stan pamięci podręcznej GATT na dysk (zapisy wykonywane są po kolei)."""
+        with self._gatt_cache_write_lock:
+            with self._gatt_cache_lock:
+                snapshot = dict(self._gatt_cache)
+            try:
+                with open(GATT_CACHE_FILE, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f)
+            except OSError as e:
+                log.warning("Nie można zapisać pamięci podręcznej GATT: %s", e)
+    
+    def _load_gatt_cache(self):
+        """Wczytuje zapisaną mapę usług GATT z dysku."""
+        try:
+            with open(GATT_CACHE_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    async def _inspect_characteristic(self, client, service_info, char, read_all=False):
+        """
+        Bada jedną charakterystykę GATT.
+        Wartość odczytywana jest tylko dla niezmiennych charakterystyk, chyba że read_all=True.
+        Zwraca (informacje o charakterystyce, lista operacji, poziom baterii lub None).
+        """
+        service_uuid = service_info["uuid"]
+        service_name = service_info["name"]
+        char_uuid = sys.intern(str(char.uuid))  # Ten sam obiekt w char_info i wszystkich operacjach
+        char_name = char.description or f"Właściwość {char_uuid[:8]}"
+        char_short_uuid = _short_uuid(char_uuid)
+        
+        char_info = {
+            "uuid": char_uuid,
+            "name": char_name,
+            "properties": []
+        }
+        operations = []
+        battery_level = None
+        props = set(char.properties)
+        
+        # Zbadaj właściwości charakterystyki
+        if "read" in props:
+            char_info["properties"].append("read")
+            read_operation = GattOp(
+                name=f"Odczyt {char_name}",
+                description=f"Odczytaj dane z {service_name}",
+                service=service_uuid,
+                characteristic=char_uuid,
+                operation="read"
+            )
+            # Odczytuj tylko niezmienne wartości - pozostałe (np. pomiary) zwykle
+            # nie obsługują bezpośredniego odczytu i kosztują dodatkowy round-trip ATT
+            if read_all or char_short_uuid in CACHEABLE_SHORT_UUIDS:
+                try:
+                    value = await client.read_gatt_char(char.uuid)
+                    char_info["value"] = value.hex()
+                    operations.append(read_operation)
+                    
+                    # Sprawdź, czy to poziom baterii
+                    if char_short_uuid in BATTERY_SHORT_UUIDS and len(value) == 1:
+                        battery_level = value[0]
+                except Exception as e:
+                    print(f"  Nie można odczytać {char_name}: {e}")
+            else:
+                operations.append(read_operation)
+        
+        if "write" in props:
+            char_info["properties"].append("write")
+            operations.append(GattOp(
+                name=f"Zapis {char_name}",
+                description=f"Wyślij dane do {service_name}",
+                service=service_uuid,
+                characteristic=char_uuid,
+                operation="write"
+            ))
+        
+        if "notify" in props:
+            char_info["properties"].append("notify")
+            operations.append(GattOp(
+                name=f"Subskrypcja {char_name}",
+                description=f"Odbieraj powiadomienia z {service_name}",
+                service=service_uuid,
+                characteristic=char_uuid,
+                operation="notify"
+            ))
+        
+        # Dodaj dodatkowe operacje dla znanych typów charakterystyk
+        if "write" in props:
+            name_lc = char_name.lower()
+            kinds = {_CHAR_KEYWORD_KINDS[token] for token in _CHAR_KEYWORD_RE.findall(name_lc)}
+            for kind, (op_name, op_description) in _CHAR_KIND_OPERATIONS.items():
+                if kind in kinds:
+                    operations.append(GattOp(
+                        name=op_name,
+                        description=op_description,
+                        service=service_uuid,
+                        characteristic=char_uuid,
+                        operation=kind
+                    ))
+        
+        return char_info, operations, battery_level
+
     def _detect_bluetooth_profiles(self, services):
         """Wykrywa profile Bluetooth na podstawie znalezionych usług."""
         profiles = []
         
-        # UUIDy dla typowych profili
-        profile_uuids = {
-            "A2DP": ["0000110A", "0000110B", "0000110C", "0000110D"],  # Audio
-            "HFP": ["0000111E", "0000111F"],  # Hands-Free
-            "GATT": ["00001801"],  # Generic Attribute
-            "HID": ["00001812"],  # Human Interface Device
-            "BAS": ["0000180F"],  # Battery Service
-            "HRS": ["0000180D"],  # Heart Rate Service
-            "HOGP": ["00001812"]   # HID over GATT
-        }
-        
-        service_uuids = [service["uuid"].upper() for service in services]
-        
-        # Sprawdź każdy profil
-        for profile, uuids in profile_uuids.items():
-            for uuid in uuids:
-                if any(uuid in service_uuid for service_uuid in service_uuids):
+        for service in services:
+            for profile in _GATT_PROFILE_MAP.get(_short_uuid(service["uuid"]), ()):
+                if profile not in profiles:
                     profiles.append(profile)
-                    break
         
         return profiles
 
-    def _analyze_network_device(self, address):
+    def _analyze_network_device(self, address, fast=False):
         """
         Kompleksowa analiza urządzenia sieciowego.
+        fast=True rozpoznaje usługi na jednoznacznych portach po samym numerze portu, bez sond.
         """
         capabilities = []
         device_info = {
@@ -956,12 +2364,13 @@ class DeviceCapabilityScanner:
         }
         
         try:
-            # Sprawdź czy urządzenie odpowiada na ping
-            ping_result = self.ping_device(address)
+            # Sprawdź czy urządzenie odpowiada - najpierw przez TCP, ping ICMP tylko w ostateczności
+            ping_result = {"success": True} if self._tcp_reachable(address) else self.ping_device(address)
             
             if not ping_result.get("success", False):
                 print(f"Urządzenie {address} nie odpowiada na ping")
                 device_info["status"] = "offline"
+                self._invalidate_analysis_cache(address)
                 
                 # Nawet jeśli urządzenie nie odpowiada, możemy dodać podstawowe operacje
                 capabilities.append({
@@ -997,11 +2406,20 @@ class DeviceCapabilityScanner:
             open_ports = self._scan_device_ports(address)
             device_info["open_ports"] = open_ports
             
+            # Urządzenie z tym samym zestawem otwartych portów było już analizowane
+            signature = ("network-fast" if fast else "network", frozenset(open_ports))
+            cached = self._get_analysis_cache(address, signature)
+            if cached is not None:
+                print(f"Używanie zapamiętanej analizy urządzenia {address}")
+                return cached
+            
             # Identyfikuj wszystkie usługi sieciowe
             print("Identyfikacja usług...")
             services = []
-            for port in open_ports:
-                service_info = self._identify_service_detailed(address, port)
+            # Każdy port badany jest niezależnie - wyniki zachowują kolejność portów
+            identified = self._probe_executor.map(lambda port: self._identify_service_detailed(address, port, fast),
+                                                  open_ports)
+            for service_info in identified:
                 if service_info:
                     services.append(service_info)
                     # Dodaj operacje specyficzne dla usługi
@@ -1014,22 +2432,40 @@ class DeviceCapabilityScanner:
             # Określ typ urządzenia na podstawie znalezionych usług
             device_info["device_type"] = self._determine_device_type(services)
             
+            # Pozostałe sprawdzenia są od siebie niezależne - wykonaj je równolegle,
+            # a wyniki scal w stałej kolejności
+            device_type = device_info["device_type"]
+            protocol_capabilities, protocol_info = [], {"open_ports": open_ports}
+            discovery_capabilities, discovery_info = [], {}
+            automation_capabilities, automation_info = [], {}
+            probes = [
+                self._probe_executor.submit(self._get_device_specific_operations, address, device_type),
+                self._probe_executor.submit(self._check_network_protocols, address, protocol_capabilities, protocol_info),
+                self._probe_executor.submit(self._check_power_management_operations, address, "wifi"),
+                self._probe_executor.submit(self._check_discovery_services, address, discovery_capabilities, discovery_info),
+                self._probe_executor.submit(self._check_wifi_signal, address),
+                self._probe_executor.submit(self._check_network_config_options, address, device_type),
+                self._probe_executor.submit(self._check_streaming_services, address),
+                self._probe_executor.submit(self._check_automation_options, address, automation_capabilities, automation_info),
+            ]
+            (device_specific_ops, _, power_ops, _, signal_info,
+             network_config_ops, streaming_ops, _) = [probe.result() for probe in probes]
+            
             # Dodaj operacje specyficzne dla typu urządzenia
-            device_specific_ops = self._get_device_specific_operations(address, device_info["device_type"])
             capabilities.extend(device_specific_ops)
             
-            # Sprawdź dostępne protokoły sieciowe
-            self._check_network_protocols(address, capabilities, device_info)
+            # Dostępne protokoły sieciowe
+            capabilities.extend(protocol_capabilities)
+            device_info.update(protocol_info)
             
-            # Sprawdź operacje zarządzania zasilaniem
-            power_ops = self._check_power_management_operations(address, "wifi")
+            # Operacje zarządzania zasilaniem
             capabilities.extend(power_ops)
             
-            # Sprawdź opcje UPNP i zeroconf
-            self._check_discovery_services(address, capabilities, device_info)
+            # Opcje UPNP i zeroconf
+            capabilities.extend(discovery_capabilities)
+            device_info.update(discovery_info)
             
-            # Sprawdź siłę sygnału (dla urządzeń bezprzewodowych)
-            signal_info = self._check_wifi_signal(address)
+            # Siła sygnału (dla urządzeń bezprzewodowych)
             if signal_info:
                 device_info["signal_strength"] = signal_info.get("signal_strength")
                 device_info["signal_quality"] = signal_info.get("signal_quality")
@@ -1041,19 +2477,20 @@ class DeviceCapabilityScanner:
                     "operation": "monitor_signal"
                 })
             
-            # Sprawdź opcje konfiguracji sieciowej
-            network_config_ops = self._check_network_config_options(address, device_info["device_type"])
+            # Opcje konfiguracji sieciowej
             capabilities.extend(network_config_ops)
             
-            # Sprawdź usługi streamingu
-            streaming_ops = self._check_streaming_services(address)
+            # Usługi streamingu
             capabilities.extend(streaming_ops)
             
-            # Sprawdź opcje automatyzacji
-            self._check_automation_options(address, capabilities, device_info)
+            # Opcje automatyzacji
+            capabilities.extend(automation_capabilities)
+            device_info.update(automation_info)
+            
+            self._store_analysis_cache(address, signature, capabilities, device_info)
         
         except Exception as e:
-            print(f"Błąd podczas analizy urządzenia sieciowego: {e}")
+            log.warning("Błąd podczas analizy urządzenia sieciowego: %s", e)
         
         return capabilities, device_info
 
@@ -1077,12 +2514,13 @@ class DeviceCapabilityScanner:
         try:
             # Dla kamer IP
             if address.count('.') == 3:
-                # Sprawdź czy kamera odpowiada
-                ping_result = self.ping_device(address)
+                # Sprawdź czy kamera odpowiada - najpierw przez TCP, ping ICMP tylko w ostateczności
+                ping_result = {"success": True} if self._tcp_reachable(address) else self.ping_device(address)
                 
                 if not ping_result.get("success", False):
                     print(f"Kamera {address} nie odpowiada na ping")
                     device_info["status"] = "offline"
+                    self._invalidate_analysis_cache(address)
                     
                     capabilities.append({
                         "name": "Monitor dostępności",
@@ -1097,11 +2535,32 @@ class DeviceCapabilityScanner:
                 device_info["status"] = "online"
                 print(f"Kamera {address} jest online")
                 
+                # Kamera z tym samym zestawem otwartych portów była już analizowana
+                signature = ("camera", frozenset(self.find_open_ports(address, CAMERA_SIGNATURE_PORTS)))
+                cached = self._get_analysis_cache(address, signature)
+                if cached is not None:
+                    print(f"Używanie zapamiętanej analizy kamery {address}")
+                    return cached
+                
                 # Sprawdź protokoły specyficzne dla kamer
                 print("Sprawdzanie protokołów kamery...")
                 
+                # Sondy protokołów są od siebie niezależne - wykonaj je równolegle,
+                # a wyniki scal w stałej kolejności
+                advanced_capabilities = []
+                advanced_info = {}
+                probes = [
+                    self._probe_executor.submit(self._check_onvif_support, address),
+                    self._probe_executor.submit(self._check_rtsp_support, address),
+                    self._probe_executor.submit(self._check_mjpeg_support, address),
+                    self._probe_executor.submit(self._check_camera_admin_interface, address),
+                    self._probe_executor.submit(self._check_recording_options, address),
+                    self._probe_executor.submit(self._check_advanced_camera_features,
+                                                address, advanced_capabilities, advanced_info),
+                ]
+                onvif_info, rtsp_info, mjpeg_info, admin_info, recording_info, _ = (probe.result() for probe in probes)
+                
                 # Sprawdź ONVIF
-                onvif_info = self._check_onvif_support(address)
                 if onvif_info.get("available", False):
                     device_info["protocols"].append("ONVIF")
                     
@@ -1119,7 +2578,6 @@ class DeviceCapabilityScanner:
                         device_info["resolution"] = onvif_info.get("resolution")
                 
                 # Sprawdź RTSP
-                rtsp_info = self._check_rtsp_support(address)
                 if rtsp_info.get("available", False):
                     device_info["protocols"].append("RTSP")
                     
@@ -1131,7 +2589,6 @@ class DeviceCapabilityScanner:
                         device_info["supports_audio"] = True
                 
                 # Sprawdź HTTP/MJPEG
-                mjpeg_info = self._check_mjpeg_support(address)
                 if mjpeg_info.get("available", False):
                     device_info["protocols"].append("MJPEG")
                     
@@ -1139,7 +2596,6 @@ class DeviceCapabilityScanner:
                     capabilities.extend(mjpeg_info.get("operations", []))
                 
                 # Sprawdź panel administracyjny
-                admin_info = self._check_camera_admin_interface(address)
                 if admin_info.get("available", False):
                     device_info["admin_interface"] = admin_info.get("url")
                     
@@ -1155,15 +2611,17 @@ class DeviceCapabilityScanner:
                 })
                 
                 # Sprawdź opcje nagrywania
-                recording_info = self._check_recording_options(address)
                 if recording_info.get("available", False):
                     device_info["supports_recording"] = True
                     
                     # Dodaj operacje nagrywania
                     capabilities.extend(recording_info.get("operations", []))
                 
-                # Sprawdź zaawansowane funkcje kamer
-                self._check_advanced_camera_features(address, capabilities, device_info)
+                # Zaawansowane funkcje kamer
+                capabilities.extend(advanced_capabilities)
+                device_info.update(advanced_info)
+                
+                self._store_analysis_cache(address, signature, capabilities, device_info)
             
             # Dla lokalnych kamer (webcam)
             elif address.startswith('CAM:'):
@@ -1174,18 +2632,30 @@ class DeviceCapabilityScanner:
                     
                     # Sprawdź lokalną kamerę
                     if CAMERA_MODULE_AVAILABLE:
-                        cap = cv2.VideoCapture(cam_index)
+                        cv2 = _lazy_module("cv2")
+                        # Otwarcie kamery trwa nawet kilka sekund - parametry zapamiętujemy
+                        probe = self._webcam_probe_cache.get(cam_index)
+                        if probe is None:
+                            try:
+                                with pooled_camera(cam_index, camera_backend()) as cap:
+                                    if cap.isOpened():
+                                        probe = {
+                                            # Pobierz rozdzielczość
+                                            "resolution": f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}",
+                                            # Sprawdź obsługiwane funkcje
+                                            "fps": cap.get(cv2.CAP_PROP_FPS),
+                                            # Sprawdź dostępne parametry kamery
+                                            "controls": self._get_webcam_controls(cap)
+                                        }
+                                        self._webcam_probe_cache[cam_index] = probe
+                            except cv2.error:
+                                self._webcam_probe_cache.pop(cam_index, None)
+                                raise
                         
-                        if cap.isOpened():
+                        if probe is not None:
                             device_info["status"] = "online"
-                            
-                            # Pobierz rozdzielczość
-                            width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-                            height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-                            device_info["resolution"] = f"{int(width)}x{int(height)}"
-                            
-                            # Sprawdź obsługiwane funkcje
-                            device_info["fps"] = cap.get(cv2.CAP_PROP_FPS)
+                            device_info["resolution"] = probe["resolution"]
+                            device_info["fps"] = probe["fps"]
                             
                             # Dodaj podstawowe operacje dla kamer lokalnych
                             capabilities.append({
@@ -1209,13 +2679,8 @@ class DeviceCapabilityScanner:
                                 "operation": "record_video"
                             })
                             
-                            # Sprawdź dostępne parametry kamery
-                            camera_controls = self._get_webcam_controls(cap)
-                            if camera_controls:
-                                for control in camera_controls:
-                                    capabilities.append(control)
-                            
-                            cap.release()
+                            capabilities.extend(dict(control) for control in probe["controls"])
+                        
                         else:
                             device_info["status"] = "error"
                             print(f"Nie można otworzyć kamery {cam_index}")
@@ -1224,7 +2689,7 @@ class DeviceCapabilityScanner:
                         device_info["status"] = "unknown"
         
         except Exception as e:
-            print(f"Błąd podczas analizy kamery: {e}")
+            log.warning("Błąd podczas analizy kamery: %s", e)
         
         return capabilities, device_info
 
@@ -1233,28 +2698,48 @@ class DeviceCapabilityScanner:
         open_ports = []
         
         try:
-            # Użyj nmap jeśli jest dostępny
-            if NMAP_AVAILABLE:
-                scan_result = self.scan_ports(address)
-                if scan_result.get("success", False):
-                    open_ports = list(scan_result.get("open_ports", {}).keys())
-            
-            # Jeśli nmap nie jest dostępny, sprawdź ręcznie popularne porty
+            # Szybkie, równoległe sprawdzenie najczęstszych portów (nmap, gdy włączono DEVICE_FINDER_NMAP_SCAN)
+            scan_result = self.scan_ports(address, use_nmap=USE_NMAP_SCAN and NMAP_AVAILABLE)
+            if scan_result.get("success", False):
+                open_ports = list(scan_result.get("open_ports", {}).keys())
+                # Sondy usług sprawdzające te porty przez check_port_open nie łączą się ponownie
+                for port in open_ports:
+                    self._remember_port_state(address, port, True)
+            
+            # Jeśli żaden z nich nie jest otwarty, sprawdź ręcznie szerszą listę portów
             if not open_ports:
-                common_ports = [21, 22, 23, 25, 53, 80, 110, 139, 143, 161, 443, 445, 
-                               515, 554, 631, 1880, 3389, 5000, 8080, 8443, 9100]
-                
-                for port in common_ports:
-                    if self.check_port_open(address, port):
-                        open_ports.append(port)
+                open_ports = self.find_open_ports(address, FALLBACK_SCAN_PORTS, timeout=1)
         
         except Exception as e:
-            print(f"Błąd podczas skanowania portów: {e}")
+            _log_failure("Błąd podczas skanowania portów: %s", e)
         
         return open_ports
 
-    def _identify_service_detailed(self, address, port):
-        """Identyfikuje szczegółowo usługę działającą na danym porcie."""
+    def _identify_service_detailed(self, address, port, fast=False):
+        """
+        Identyfikuje szczegółowo usługę działającą na danym porcie.
+        Wynik udanej sondy jest zapamiętywany na SERVICE_CACHE_TTL sekund, aby ponowne skanowanie nie powtarzało sond.
+        fast=True rozpoznaje jednoznaczne porty (_PORT_HINTS) bez łączenia się z nimi.
+        Metody _identify_*_service zwracają True, gdy sonda faktycznie odpowiedziała.
+        """
+        if fast:
+            hint = _PORT_HINTS.get(port)
+            if hint and hint[2] >= PORT_HINT_MIN_CONFIDENCE:
+                service, protocol, confidence = hint
+                return {
+                    "port": port,
+                    "service": service,
+                    "version": None,
+                    "details": {"port_hint": True, "confidence": confidence},
+                    "operations": [_service_operation(protocol, port)] if protocol else []
+                }
+        
+        key = (address, port)
+        with self._service_cache_lock:
+            entry = self._service_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < SERVICE_CACHE_TTL:
+            return copy.deepcopy(entry[1])
+        
         service_info = {
             "port": port,
             "service": None,
@@ -1265,640 +2750,469 @@ class DeviceCapabilityScanner:
         
         try:
             # Sprawdź popularne usługi na typowych portach
-            if port == 80 or port == 8080:
-                # HTTP
-                http_info = self._check_http_server_detailed(address, port)
-                if http_info:
-                    service_info["service"] = "HTTP"
-                    service_info["version"] = http_info.get("version")
-                    service_info["details"] = http_info.get("details", {})
-                    service_info["operations"] = http_info.get("operations", [])
-            
-            elif port == 443 or port == 8443:
-                # HTTPS
-                https_info = self._check_https_server_detailed(address, port)
-                if https_info:
-                    service_info["service"] = "HTTPS"
-                    service_info["version"] = https_info.get("version")
-                    service_info["details"] = https_info.get("details", {})
-                    service_info["operations"] = https_info.get("operations", [])
-            
-            elif port == 22:
-                # SSH
-                ssh_info = self._check_ssh_server_detailed(address)
-                if ssh_info:
-                    service_info["service"] = "SSH"
-                    service_info["version"] = ssh_info.get("version")
-                    service_info["details"] = ssh_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Połączenie SSH",
-                        "description": "Nawiąż sesję SSH z urządzeniem",
-                        "available": True,
-                        "protocol": "ssh",
-                        "port": 22
-                    }]
-                    
-                    # Dodaj specyficzne opcje SSH
-                    if ssh_info.get("sftp_enabled", False):
-                        service_info["operations"].append({
-                            "name": "Transfer plików SFTP",
-                            "description": "Prześlij pliki przez SFTP",
-                            "available": True,
-                            "protocol": "sftp",
-                            "port": 22
-                        })
-                    
-                    if ssh_info.get("exec_enabled", True):
-                        service_info["operations"].append({
-                            "name": "Zdalne polecenia",
-                            "description": "Wykonaj polecenia na urządzeniu",
-                            "available": True,
-                            "protocol": "ssh",
-                            "port": 22,
-                            "operation": "execute_command"
-                        })
+            identify = self._service_identifiers.get(port, self._identify_unknown_service)
+            probed = identify(address, port, service_info)
+        
+        except Exception as e:
+            _log_failure("Błąd podczas identyfikacji usługi na porcie %s: %s", port, e)
+            return None
+        
+        # Nieudanej sondy (np. przekroczony limit czasu) nie zapamiętujemy - następne skanowanie spróbuje ponownie
+        if probed:
+            now = time.monotonic()
+            with self._service_cache_lock:
+                # Usuń przeterminowane wpisy, aby słownik nie rósł z każdym skanowanym hostem
+                for stale in [k for k, (ts, _) in self._service_cache.items() if now - ts >= SERVICE_CACHE_TTL]:
+                    del self._service_cache[stale]
+                self._service_cache[key] = (now, copy.deepcopy(service_info))
+        return service_info
+
+    def _identify_http_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi HTTP."""
+        http_info = self._check_http_server_detailed(address, port)
+        if http_info:
+            service_info["service"] = "HTTP"
+            service_info["version"] = http_info.get("version")
+            service_info["details"] = http_info.get("details", {})
+            service_info["operations"] = http_info.get("operations", [])
+        return http_info.get("available", False)
+
+    def _identify_https_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi HTTPS."""
+        https_info = self._check_https_server_detailed(address, port)
+        if https_info:
+            service_info["service"] = "HTTPS"
+            service_info["version"] = https_info.get("version")
+            service_info["details"] = https_info.get("details", {})
+            service_info["operations"] = https_info.get("operations", [])
+        return https_info.get("available", False)
+
+    def _identify_ssh_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi SSH."""
+        ssh_info = self._check_ssh_server_detailed(address)
+        if ssh_info:
+            service_info["service"] = "SSH"
+            service_info["version"] = ssh_info.get("version")
+            service_info["details"] = ssh_info.get("details", {})
+            service_info["operations"] = [_service_operation("ssh", port)]
+            
+            # Dodaj specyficzne opcje SSH
+            if ssh_info.get("sftp_enabled", False):
+                service_info["operations"].append({
+                    "name": "Transfer plików SFTP",
+                    "description": "Prześlij pliki przez SFTP",
+                    "available": True,
+                    "protocol": "sftp",
+                    "port": 22
+                })
             
-            elif port == 21:
-                # FTP
-                ftp_info = self._check_ftp_server_detailed(address)
-                if ftp_info:
-                    service_info["service"] = "FTP"
-                    service_info["version"] = ftp_info.get("version")
-                    service_info["details"] = ftp_info.get("details", {})
-                    
-                    # Dodaj operacje FTP
-                    operations = [{
-                        "name": "Transfer plików",
-                        "description": "Prześlij pliki przez FTP",
-                        "available": True,
-                        "protocol": "ftp",
-                        "port": 21
-                    }]
-                    
-                    # Sprawdź dostęp anonimowy
-                    if ftp_info.get("anonymous_access", False):
-                        operations.append({
-                            "name": "Anonimowy FTP",
-                            "description": "Dostęp anonimowy do FTP",
-                            "available": True,
-                            "protocol": "ftp",
-                            "port": 21,
-                            "anonymous": True
-                        })
-                    
-                    service_info["operations"] = operations
-            
-            elif port == 445 or port == 139:
-                # SMB/CIFS
-                smb_info = self._check_smb_server_detailed(address)
-                if smb_info:
-                    service_info["service"] = "SMB/CIFS"
-                    service_info["version"] = smb_info.get("version")
-                    service_info["details"] = smb_info.get("details", {})
-                    
-                    # Dodaj operacje SMB
-                    operations = [{
-                        "name": "Udział plików",
-                        "description": "Dostęp do udziałów SMB",
-                        "available": True,
-                        "protocol": "smb",
-                        "port": port
-                    }]
-                    
-                    # Dodaj znalezione udziały
-                    if smb_info.get("shares"):
-                        for share in smb_info.get("shares"):
-                            operations.append({
-                                "name": f"Udział {share}",  "description": f"Dostęp do udziału {share}",
-                                "available": True,
-                                "protocol": "smb",
-                                "port": port,
-                                "share": share
-                            })
-                    
-                    service_info["operations"] = operations
-            
-            elif port == 23:
-                # Telnet
-                telnet_info = self._check_telnet_server(address)
-                if telnet_info:
-                    service_info["service"] = "Telnet"
-                    service_info["version"] = telnet_info.get("version")
-                    service_info["details"] = telnet_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Połączenie Telnet",
-                        "description": "Nawiąż sesję Telnet z urządzeniem",
-                        "available": True,
-                        "protocol": "telnet",
-                        "port": 23
-                    }]
-            
-            elif port == 25 or port == 587 or port == 465:
-                # SMTP
-                smtp_info = self._check_smtp_server(address, port)
-                if smtp_info:
-                    service_info["service"] = "SMTP"
-                    service_info["version"] = smtp_info.get("version")
-                    service_info["details"] = smtp_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Wyślij email",
-                        "description": "Wyślij wiadomość email przez serwer SMTP",
-                        "available": True,
-                        "protocol": "smtp",
-                        "port": port
-                    }]
-            
-            elif port == 110 or port == 995:
-                # POP3
-                pop3_info = self._check_pop3_server(address, port)
-                if pop3_info:
-                    service_info["service"] = "POP3"
-                    service_info["version"] = pop3_info.get("version")
-                    service_info["details"] = pop3_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Odbierz email",
-                        "description": "Pobierz wiadomości email przez POP3",
-                        "available": True,
-                        "protocol": "pop3",
-                        "port": port
-                    }]
-            
-            elif port == 143 or port == 993:
-                # IMAP
-                imap_info = self._check_imap_server(address, port)
-                if imap_info:
-                    service_info["service"] = "IMAP"
-                    service_info["version"] = imap_info.get("version")
-                    service_info["details"] = imap_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Zarządzaj emailami",
-                        "description": "Zarządzaj wiadomościami email przez IMAP",
-                        "available": True,
-                        "protocol": "imap",
-                        "port": port
-                    }]
-            
-            elif port == 53:
-                # DNS
-                dns_info = self._check_dns_server(address)
-                if dns_info:
-                    service_info["service"] = "DNS"
-                    service_info["version"] = dns_info.get("version")
-                    service_info["details"] = dns_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Zapytanie DNS",
-                        "description": "Wykonaj zapytanie DNS",
-                        "available": True,
-                        "protocol": "dns",
-                        "port": 53
-                    }]
-            
-            elif port == 554 or port == 8554:
-                # RTSP
-                rtsp_info = self._check_rtsp_server_detailed(address, port)
-                if rtsp_info:
-                    service_info["service"] = "RTSP"
-                    service_info["version"] = rtsp_info.get("version")
-                    service_info["details"] = rtsp_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Strumień wideo",
-                        "description": "Oglądaj transmisję wideo na żywo",
-                        "available": True,
-                        "protocol": "rtsp",
-                        "port": port,
-                        "url": rtsp_info.get("url", f"rtsp://{address}:{port}")
-                    }]
-                    
-                    # Dodaj opcje sterowania strumieniem
-                    if rtsp_info.get("can_record", False):
-                        service_info["operations"].append({
-                            "name": "Nagrywaj strumień",
-                            "description": "Zapisz strumień wideo",
-                            "available": True,
-                            "protocol": "rtsp",
-                            "port": port,
-                            "url": rtsp_info.get("url", f"rtsp://{address}:{port}")
-                        })
+            if ssh_info.get("exec_enabled", True):
+                service_info["operations"].append({
+                    "name": "Zdalne polecenia",
+                    "description": "Wykonaj polecenia na urządzeniu",
+                    "available": True,
+                    "protocol": "ssh",
+                    "port": 22,
+                    "operation": "execute_command"
+                })
+        return ssh_info.get("available", False)
+
+    def _identify_ftp_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi FTP."""
+        ftp_info = self._check_ftp_server_detailed(address)
+        if ftp_info:
+            service_info["service"] = "FTP"
+            service_info["version"] = ftp_info.get("version")
+            service_info["details"] = ftp_info.get("details", {})
+            
+            # Dodaj operacje FTP
+            operations = [{
+                "name": "Transfer plików",
+                "description": "Prześlij pliki przez FTP",
+                "available": True,
+                "protocol": "ftp",
+                "port": 21
+            }]
             
-            elif port == 3389:
-                # RDP
-                rdp_info = self._check_rdp_server(address)
-                if rdp_info:
-                    service_info["service"] = "RDP"
-                    service_info["version"] = rdp_info.get("version")
-                    service_info["details"] = rdp_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "Pulpit zdalny",
-                        "description": "Połącz się z pulpitem zdalnym",
-                        "available": True,
-                        "protocol": "rdp",
-                        "port": 3389
-                    }]
-            
-            elif port == 5900:
-                # VNC
-                vnc_info = self._check_vnc_server(address)
-                if vnc_info:
-                    service_info["service"] = "VNC"
-                    service_info["version"] = vnc_info.get("version")
-                    service_info["details"] = vnc_info.get("details", {})
-                    service_info["operations"] = [{
-                        "name": "VNC",
-                        "description": "Połącz się przez VNC",
-                        "available": True,
-                        "protocol": "vnc",
-                        "port": 5900
-                    }]
-            
-            elif port == 1883 or port == 8883:
-                # MQTT
-                mqtt_info = self._check_mqtt_server(address, port)
-                if mqtt_info:
-                    service_info["service"] = "MQTT"
-                    service_info["version"] = mqtt_info.get("version")
-                    service_info["details"] = mqtt_info.get("details", {})
-                    
-                    # Dodaj operacje MQTT
-                    operations = [{
-                        "name": "Połącz MQTT",
-                        "description": "Nawiąż połączenie MQTT",
-                        "available": True,
-                        "protocol": "mqtt",
-                        "port": port
-                    }]
-                    
-                    # Dodaj opcje publikowania/subskrypcji
-                    operations.append({
-                        "name": "Publikuj wiadomość",
-                        "description": "Wyślij dane przez MQTT",
-                        "available": True,
-                        "protocol": "mqtt",
-                        "port": port,
-                        "operation": "publish"
-                    })
-                    
+            # Sprawdź dostęp anonimowy
+            if ftp_info.get("anonymous_access", False):
+                operations.append({
+                    "name": "Anonimowy FTP",
+                    "description": "Dostęp anonimowy do FTP",
+                    "available": True,
+                    "protocol": "ftp",
+                    "port": 21,
+                    "anonymous": True
+                })
+            
+            service_info["operations"] = operations
+        return ftp_info.get("available", False)
+
+    def _identify_smb_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi SMB/CIFS."""
+        smb_info = self._check_smb_server_detailed(address)
+        if smb_info:
+            service_info["service"] = "SMB/CIFS"
+            service_info["version"] = smb_info.get("version")
+            service_info["details"] = smb_info.get("details", {})
+            
+            # Dodaj operacje SMB
+            operations = [{
+                "name": "Udział plików",
+                "description": "Dostęp do udziałów SMB",
+                "available": True,
+                "protocol": "smb",
+                "port": port
+            }]
+            
+            # Dodaj znalezione udziały
+            if smb_info.get("shares"):
+                for share in smb_info.get("shares"):
                     operations.append({
-                        "name": "Subskrybuj temat",
-                        "description": "Odbieraj dane przez MQTT",
+                        "name": f"Udział {share}",  "description": f"Dostęp do udziału {share}",
                         "available": True,
-                        "protocol": "mqtt",
+                        "protocol": "smb",
                         "port": port,
-                        "operation": "subscribe"
-                    })
-                    
-                    service_info["operations"] = operations
-            
-            elif port == 161:
-                # SNMP
-                snmp_info = self._check_snmp_server_detailed(address)
-                if snmp_info:
-                    service_info["service"] = "SNMP"
-                    service_info["version"] = snmp_info.get("version")
-                    service_info["details"] = snmp_info.get("details", {})
-                    
-                    # Dodaj operacje SNMP
-                    operations = [{
-                        "name": "Monitorowanie SNMP",
-                        "description": "Monitoruj urządzenie przez SNMP",
-                        "available": True,
-                        "protocol": "snmp",
-                        "port": 161
-                    }]
-                    
-                    # Dodaj specyficzne operacje SNMP
-                    if snmp_info.get("get_enabled", True):
-                        operations.append({
-                            "name": "Odczyt SNMP",
-                            "description": "Odczytaj wartości przez SNMP",
-                            "available": True,
-                            "protocol": "snmp",
-                            "port": 161,
-                            "operation": "get"
-                        })
-                    
-                    if snmp_info.get("set_enabled", False):
-                        operations.append({
-                            "name": "Zapis SNMP",
-                            "description": "Zapisz wartości przez SNMP",
-                            "available": True,
-                            "protocol": "snmp",
-                            "port": 161,
-                            "operation": "set"
-                        })
-                    
-                    service_info["operations"] = operations
-            
-            elif port == 631:
-                # IPP (drukarka)
-                ipp_info = self._check_ipp_server(address)
-                if ipp_info:
-                    service_info["service"] = "IPP"
-                    service_info["version"] = ipp_info.get("version")
-                    service_info["details"] = ipp_info.get("details", {})
-                    
-                    # Dodaj operacje drukarki
-                    operations = []
-                    
-                    operations.append({
-                        "name": "Drukuj dokument",
-                        "description": "Wyślij dokument do drukowania",
-                        "available": True,
-                        "protocol": "ipp",
-                        "port": 631
+                        "share": share
                     })
-                    
-                    if ipp_info.get("supports_status", True):
-                        operations.append({
-                            "name": "Status drukarki",
-                            "description": "Sprawdź status drukarki",
-                            "available": True,
-                            "protocol": "ipp",
-                            "port": 631,
-                            "operation": "get_status"
-                        })
-                    
-                    if ipp_info.get("supports_jobs", True):
-                        operations.append({
-                            "name": "Zarządzaj kolejką wydruku",
-                            "description": "Przeglądaj i zarządzaj kolejką wydruku",
-                            "available": True,
-                            "protocol": "ipp",
-                            "port": 631,
-                            "operation": "manage_jobs"
-                        })
-                    
-                    service_info["operations"] = operations
             
-            elif port == 9100:
-                # Raw printing
-                service_info["service"] = "Printer (Raw)"
-                service_info["operations"] = [{
-                    "name": "Drukowanie RAW",
-                    "description": "Bezpośrednie wysyłanie danych do drukarki",
-                    "available": True,
-                    "protocol": "raw",
-                    "port": 9100
-                }]
-            
-            elif port == 9000 or port == 9090:
-                # Web interface (często używane przez panel administracyjny)
-                service_info["service"] = "Web Admin"
-                service_info["operations"] = [{
-                    "name": "Panel administracyjny",
-                    "description": "Dostęp do panelu administracyjnego",
+            service_info["operations"] = operations
+        return smb_info.get("available", False)
+
+    def _identify_telnet_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi Telnet."""
+        telnet_info = self._check_telnet_server(address)
+        if telnet_info:
+            service_info["service"] = "Telnet"
+            service_info["version"] = telnet_info.get("version")
+            service_info["details"] = telnet_info.get("details", {})
+            service_info["operations"] = [_service_operation("telnet", port)]
+        return telnet_info.get("available", False)
+
+    def _identify_smtp_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi SMTP."""
+        smtp_info = self._check_smtp_server(address, port)
+        if smtp_info:
+            service_info["service"] = "SMTP"
+            service_info["version"] = smtp_info.get("version")
+            service_info["details"] = smtp_info.get("details", {})
+            service_info["operations"] = [_service_operation("smtp", port)]
+        return smtp_info.get("available", False)
+
+    def _identify_pop3_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi POP3."""
+        pop3_info = self._check_pop3_server(address, port)
+        if pop3_info:
+            service_info["service"] = "POP3"
+            service_info["version"] = pop3_info.get("version")
+            service_info["details"] = pop3_info.get("details", {})
+            service_info["operations"] = [_service_operation("pop3", port)]
+        return pop3_info.get("available", False)
+
+    def _identify_imap_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi IMAP."""
+        imap_info = self._check_imap_server(address, port)
+        if imap_info:
+            service_info["service"] = "IMAP"
+            service_info["version"] = imap_info.get("version")
+            service_info["details"] = imap_info.get("details", {})
+            service_info["operations"] = [_service_operation("imap", port)]
+        return imap_info.get("available", False)
+
+    def _identify_dns_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi DNS."""
+        dns_info = self._check_dns_server(address)
+        if dns_info:
+            service_info["service"] = "DNS"
+            service_info["version"] = dns_info.get("version")
+            service_info["details"] = dns_info.get("details", {})
+            service_info["operations"] = [_service_operation("dns", port)]
+        return dns_info.get("available", False)
+
+    def _identify_rtsp_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi RTSP."""
+        rtsp_info = self._check_rtsp_server_detailed(address, port)
+        if rtsp_info:
+            service_info["service"] = "RTSP"
+            service_info["version"] = rtsp_info.get("version")
+            service_info["details"] = rtsp_info.get("details", {})
+            service_info["operations"] = [{
+                "name": "Strumień wideo",
+                "description": "Oglądaj transmisję wideo na żywo",
+                "available": True,
+                "protocol": "rtsp",
+                "port": port,
+                "url": rtsp_info.get("url", f"rtsp://{address}:{port}")
+            }]
+            
+            # Dodaj opcje sterowania strumieniem
+            if rtsp_info.get("can_record", False):
+                service_info["operations"].append({
+                    "name": "Nagrywaj strumień",
+                    "description": "Zapisz strumień wideo",
                     "available": True,
-                    "protocol": "http",
+                    "protocol": "rtsp",
                     "port": port,
-                    "url": f"http://{address}:{port}"
-                }]
-            
-            else:
-                # Dla nierozpoznanych portów dodaj podstawową operację TCP
-                try:
-                    import socket
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(1)
-                    sock.connect((address, port))
-                    banner = sock.recv(1024).decode('utf-8', errors='ignore')
-                    sock.close()
-                    
-                    # Próba rozpoznania usługi z bannera
-                    service_name = self._identify_service_from_banner(banner, port)
-                    
-                    if service_name:
-                        service_info["service"] = service_name
-                    else:
-                        service_info["service"] = f"Unknown TCP:{port}"
-                    
-                    service_info["details"]["banner"] = banner
-                    service_info["operations"] = [{
-                        "name": f"Połącz TCP:{port}",
-                        "description": f"Połącz z usługą na porcie {port}",
-                        "available": True,
-                        "protocol": "tcp",
-                        "port": port
-                    }]
-                except:
-                    # Nie udało się uzyskać bannera
-                    service_info["service"] = f"Unknown TCP:{port}"
-                    service_info["operations"] = [{
-                        "name": f"Połącz TCP:{port}",
-                        "description": f"Połącz z usługą na porcie {port}",
-                        "available": True,
-                        "protocol": "tcp",
-                        "port": port
-                    }]
-        
-        except Exception as e:
-            print(f"Błąd podczas identyfikacji usługi na porcie {port}: {e}")
-            return None
-        
-        return service_info
+                    "url": rtsp_info.get("url", f"rtsp://{address}:{port}")
+                })
+        return rtsp_info.get("available", False)
 
-    def _check_http_server_detailed(self, address, port):
-        """Szczegółowo sprawdza serwer HTTP i zwraca informacje o nim."""
-        result = {
-            "available": False,
-            "version": None,
-            "details": {},
-            "operations": []
-        }
-        
-        try:
-            import urllib.request
-            import urllib.error
+    def _identify_rdp_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi RDP."""
+        rdp_info = self._check_rdp_server(address)
+        if rdp_info:
+            service_info["service"] = "RDP"
+            service_info["version"] = rdp_info.get("version")
+            service_info["details"] = rdp_info.get("details", {})
+            service_info["operations"] = [_service_operation("rdp", port)]
+        return rdp_info.get("available", False)
+
+    def _identify_vnc_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi VNC."""
+        vnc_info = self._check_vnc_server(address)
+        if vnc_info:
+            service_info["service"] = "VNC"
+            service_info["version"] = vnc_info.get("version")
+            service_info["details"] = vnc_info.get("details", {})
+            service_info["operations"] = [_service_operation("vnc", port)]
+        return vnc_info.get("available", False)
+
+    def _identify_mqtt_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi MQTT."""
+        mqtt_info = self._check_mqtt_server(address, port)
+        if mqtt_info:
+            service_info["service"] = "MQTT"
+            service_info["version"] = mqtt_info.get("version")
+            service_info["details"] = mqtt_info.get("details", {})
+            
+            # Dodaj operacje MQTT
+            operations = [{
+                "name": "Połącz MQTT",
+                "description": "Nawiąż połączenie MQTT",
+                "available": True,
+                "protocol": "mqtt",
+                "port": port
+            }]
             
-            url = f"http://{address}:{port}"
+            # Dodaj opcje publikowania/subskrypcji
+            operations.append({
+                "name": "Publikuj wiadomość",
+                "description": "Wyślij dane przez MQTT",
+                "available": True,
+                "protocol": "mqtt",
+                "port": port,
+                "operation": "publish"
+            })
             
-            # Najpierw sprawdź metadane serwera
-            req = urllib.request.Request(url, method="HEAD")
-            try:
-                response = urllib.request.urlopen(req, timeout=2)
-                result["available"] = True
-                
-                # Pobierz informacje o serwerze
-                server_header = response.getheader("Server", "")
-                result["version"] = server_header
-                result["details"]["headers"] = dict(response.getheaders())
-                
-                # Dodaj operację otwarcia interfejsu web
-                result["operations"].append({
-                    "name": "Interfejs WWW",
-                    "description": "Otwórz interfejs użytkownika",
-                    "available": True,
-                    "protocol": "http",
-                    "url": url,
-                    "operation": "open_web"
-                })
-                
-                # Sprawdź rodzaj interfejsu przez pobranie treści strony
-                try:
-                    content_req = urllib.request.Request(url)
-                    content_response = urllib.request.urlopen(content_req, timeout=2)
-                    content = content_response.read(8192).decode('utf-8', errors='ignore')
-                    
-                    # Sprawdź znaki rozpoznawcze popularnych paneli administracyjnych
-                    admin_keywords = [
-                        "login", "admin", "dashboard", "panel", "configuration",
-                        "setup", "settings", "system", "management"
-                    ]
-                    
-                    admin_score = sum(1 for keyword in admin_keywords if keyword in content.lower())
-                    
-                    if admin_score >= 2:
-                        result["operations"].append({
-                            "name": "Panel administracyjny",
-                            "description": "Uzyskaj dostęp do panelu administracyjnego",
-                            "available": True,
-                            "protocol": "http",
-                            "url": url,
-                            "operation": "admin_panel"
-                        })
-                    
-                    # Sprawdź dla routera
-                    router_keywords = ["router", "gateway", "wireless", "network", "wan", "lan", "dhcp"]
-                    router_score = sum(1 for keyword in router_keywords if keyword in content.lower())
-                    
-                    if router_score >= 2:
-                        result["details"]["device_type"] = "router"
-                        
-                        # Dodaj operacje specyficzne dla routera
-                        result["operations"].append({
-                            "name": "Konfiguracja sieci",
-                            "description": "Konfiguruj ustawienia sieci",
-                            "available": True,
-                            "protocol": "http",
-                            "url": url,
-                            "operation": "network_config"
-                        })
-                    
-                    # Sprawdź dla drukarki
-                    printer_keywords = ["printer", "ink", "toner", "cartridge", "print", "scan", "copy"]
-                    printer_score = sum(1 for keyword in printer_keywords if keyword in content.lower())
-                    
-                    if printer_score >= 2:
-                        result["details"]["device_type"] = "printer"
-                        
-                        # Dodaj operacje specyficzne dla drukarki
-                        result["operations"].append({
-                            "name": "Status drukarki",
-                            "description": "Sprawdź stan drukarki i poziom tuszu",
-                            "available": True,
-                            "protocol": "http",
-                            "url": url,
-                            "operation": "printer_status"
-                        })
-                    
-                    # Sprawdź dla kamery
-                    camera_keywords = ["camera", "video", "stream", "surveillance", "motion", "capture"]
-                    camera_score = sum(1 for keyword in camera_keywords if keyword in content.lower())
-                    
-                    if camera_score >= 2:
-                        result["details"]["device_type"] = "camera"
-                        
-                        # Dodaj operacje specyficzne dla kamery
-                        result["operations"].append({
-                            "name": "Podgląd kamery",
-                            "description": "Oglądaj obraz z kamery",
-                            "available": True,
-                            "protocol": "http",
-                            "url": url,
-                            "operation": "view_camera"
-                        })
-                    
-                    # Sprawdź dla NAS
-                    nas_keywords = ["nas", "storage", "disk", "share", "backup", "raid"]
-                    nas_score = sum(1 for keyword in nas_keywords if keyword in content.lower())
-                    
-                    if nas_score >= 2:
-                        result["details"]["device_type"] = "nas"
-                        
-                        # Dodaj operacje specyficzne dla NAS
-                        result["operations"].append({
-                            "name": "Zarządzanie plikami",
-                            "description": "Zarządzaj plikami na serwerze NAS",
-                            "available": True,
-                            "protocol": "http",
-                            "url": url,
-                            "operation": "file_management"
-                        })
-                    
-                    # Sprawdź API
-                    api_endpoints = [
-                        "/api/", "/rest/", "/v1/", "/v2/", "/api/v1/", 
-                        "/api/v2/", "/rest/v1/", "/json/", "/xml/"
-                    ]
-                    
-                    for endpoint in api_endpoints:
-                        try:
-                            api_url = f"{url}{endpoint}"
-                            api_req = urllib.request.Request(api_url, method="HEAD")
-                            api_response = urllib.request.urlopen(api_req, timeout=1)
-                            
-                            # API wydaje się istnieć
-                            result["operations"].append({
-                                "name": "API",
-                                "description": f"Dostęp do API urządzenia",
-                                "available": True,
-                                "protocol": "http",
-                                "url": api_url,
-                                "operation": "api_access"
-                            })
-                            
-                            break
-                        except:
-                            continue
-                
-                except Exception as e:
-                    print(f"Błąd podczas analizy treści HTTP: {e}")
+            operations.append({
+                "name": "Subskrybuj temat",
+                "description": "Odbieraj dane przez MQTT",
+                "available": True,
+                "protocol": "mqtt",
+                "port": port,
+                "operation": "subscribe"
+            })
+            
+            service_info["operations"] = operations
+        return mqtt_info.get("available", False)
+
+    def _identify_snmp_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi SNMP."""
+        snmp_info = self._check_snmp_server_detailed(address)
+        if snmp_info:
+            service_info["service"] = "SNMP"
+            service_info["version"] = snmp_info.get("version")
+            service_info["details"] = snmp_info.get("details", {})
+            
+            # Dodaj operacje SNMP
+            operations = [{
+                "name": "Monitorowanie SNMP",
+                "description": "Monitoruj urządzenie przez SNMP",
+                "available": True,
+                "protocol": "snmp",
+                "port": 161
+            }]
             
-            except (urllib.error.URLError, urllib.error.HTTPError, socket.timeout) as e:
-                # Serwer HTTP może nie być dostępny lub wymaga uwierzytelnienia
-                if hasattr(e, 'code') and (e.code == 401 or e.code == 403):
-                    # Serwer wymaga uwierzytelnienia
-                    result["available"] = True
-                    result["details"]["auth_required"] = True
-                    
-                    # Pobierz informacje o uwierzytelnianiu
-                    if hasattr(e, 'headers'):
-                        auth_header = e.headers.get("WWW-Authenticate", "")
-                        result["details"]["auth_type"] = auth_header
-                    
-                    # Dodaj operację logowania
-                    result["operations"].append({
-                        "name": "Logowanie",
-                        "description": "Zaloguj się do interfejsu urządzenia",
-                        "available": True,
-                        "protocol": "http",
-                        "url": url,
-                        "operation": "login",
-                        "auth_required": True
-                    })
+            # Dodaj specyficzne operacje SNMP
+            if snmp_info.get("get_enabled", True):
+                operations.append({
+                    "name": "Odczyt SNMP",
+                    "description": "Odczytaj wartości przez SNMP",
+                    "available": True,
+                    "protocol": "snmp",
+                    "port": 161,
+                    "operation": "get"
+                })
+            
+            if snmp_info.get("set_enabled", False):
+                operations.append({
+                    "name": "Zapis SNMP",
+                    "description": "Zapisz wartości przez SNMP",
+                    "available": True,
+                    "protocol": "snmp",
+                    "port": 161,
+                    "operation": "set"
+                })
+            
+            service_info["operations"] = operations
+        return snmp_info.get("available", False)
+
+    def _identify_ipp_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi IPP (drukarka)."""
+        ipp_info = self._check_ipp_server(address)
+        if ipp_info:
+            service_info["service"] = "IPP"
+            service_info["version"] = ipp_info.get("version")
+            service_info["details"] = ipp_info.get("details", {})
+            
+            # Dodaj operacje drukarki
+            operations = []
+            
+            operations.append({
+                "name": "Drukuj dokument",
+                "description": "Wyślij dokument do drukowania",
+                "available": True,
+                "protocol": "ipp",
+                "port": 631
+            })
+            
+            if ipp_info.get("supports_status", True):
+                operations.append({
+                    "name": "Status drukarki",
+                    "description": "Sprawdź status drukarki",
+                    "available": True,
+                    "protocol": "ipp",
+                    "port": 631,
+                    "operation": "get_status"
+                })
+            
+            if ipp_info.get("supports_jobs", True):
+                operations.append({
+                    "name": "Zarządzaj kolejką wydruku",
+                    "description": "Przeglądaj i zarządzaj kolejką wydruku",
+                    "available": True,
+                    "protocol": "ipp",
+                    "port": 631,
+                    "operation": "manage_jobs"
+                })
+            
+            service_info["operations"] = operations
+        return ipp_info.get("available", False)
+
+    def _identify_raw_printer_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi drukowania RAW."""
+        service_info["service"] = "Printer (Raw)"
+        service_info["operations"] = [_service_operation("raw", port)]
+        return True
+
+    def _identify_web_admin_service(self, address, port, service_info):
+        """Uzupełnia service_info o szczegóły usługi panelu administracyjnego WWW."""
+        service_info["service"] = "Web Admin"
+        service_info["operations"] = [{
+            "name": "Panel administracyjny",
+            "description": "Dostęp do panelu administracyjnego",
+            "available": True,
+            "protocol": "http",
+            "port": port,
+            "url": f"http://{address}:{port}"
+        }]
+        return True
+
+    def _identify_unknown_service(self, address, port, service_info):
+        """Próbuje rozpoznać nieznaną usługę TCP po bannerze."""
+        try:
+            banner = grab_banner_sync(address, port, terminator=None, timeout=1).decode('utf-8', errors='ignore')
+            
+            # Próba rozpoznania usługi z bannera
+            service_name = self._identify_service_from_banner(banner, port)
+            
+            if service_name:
+                service_info["service"] = service_name
+            else:
+                service_info["service"] = f"Unknown TCP:{port}"
+            
+            service_info["details"]["banner"] = banner
+            service_info["operations"] = [{
+                "name": f"Połącz TCP:{port}",
+                "description": f"Połącz z usługą na porcie {port}",
+                "available": True,
+                "protocol": "tcp",
+                "port": port
+            }]
+            return True
+        except:
+            # Nie udało się uzyskać bannera
+            service_info["service"] = f"Unknown TCP:{port}"
+            service_info["operations"] = [{
+                "name": f"Połącz TCP:{port}",
+                "description": f"Połącz z usługą na porcie {port}",
+                "available": True,
+                "protocol": "tcp",
+                "port": port
+            }]
+            return False
+
+    def _probe_api_endpoints(self, base_url, context=None):
+        """Sprawdza równolegle typowe ścieżki API i zwraca adres pierwszej, która odpowiedziała, lub None."""
+        import urllib.request
         
-        except Exception as e:
-            print(f"Błąd podczas szczegółowego sprawdzania serwera HTTP: {e}")
+        def probe(endpoint):
+            api_url = f"{base_url}{endpoint}"
+            urllib.request.urlopen(urllib.request.Request(api_url, method="HEAD"), timeout=1, context=context).close()
+            return api_url
         
-        return result
+        futures = [self._port_executor.submit(probe, endpoint) for endpoint in _API_ENDPOINTS]
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=API_PROBE_TIMEOUT):
+                if future.exception() is None:
+                    return future.result()
+        except concurrent.futures.TimeoutError:
+            pass
+        finally:
+            # Sondy jeszcze czekające w kolejce nie są już potrzebne
+            for future in futures:
+                future.cancel()
+        return None
+    
+    def _check_http_server_detailed(self, address, port):
+        """Szczegółowo sprawdza serwer HTTP i zwraca informacje o nim."""
+        return self._check_web_server(address, port, scheme="http")
+
     def _check_https_server_detailed(self, address, port):
         """Szczegółowo sprawdza serwer HTTPS i zwraca informacje o nim."""
+        return self._check_web_server(address, port, scheme="https")
+
+    def _check_web_server(self, address, port, *, scheme):
+        """Wspólna ścieżka sprawdzania serwera WWW dla HTTP i HTTPS."""
         result = {
             "available": False,
             "version": None,
             "details": {},
             "operations": []
         }
+        labels = _WEB_SCHEME_OPERATIONS[scheme]
+        
+        def operation(name, description, operation_id, url, **extra):
+            return {
+                "name": name,
+                "description": description,
+                "available": True,
+                "protocol": scheme,
+                "url": url,
+                "operation": operation_id,
+                **extra
+            }
         
         try:
             import urllib.request
             import urllib.error
-            import ssl
             
-            url = f"https://{address}:{port}"
+            url = f"{scheme}://{address}:{port}"
             
-            # Utwórz kontekst SSL ignorujący weryfikację certyfikatu
-            context = ssl._create_unverified_context()
+            # Kontekst SSL ignorujący weryfikację certyfikatu (tylko HTTPS)
+            context = _UNVERIFIED_SSL_CONTEXT if scheme == "https" else None
             
-            # Pobierz metadane serwera
+            # Najpierw sprawdź metadane serwera
             req = urllib.request.Request(url, method="HEAD")
             try:
                 response = urllib.request.urlopen(req, timeout=2, context=context)
@@ -1907,85 +3221,56 @@ class DeviceCapabilityScanner:
                 # Pobierz informacje o serwerze
                 server_header = response.getheader("Server", "")
                 result["version"] = server_header
-                result["details"]["headers"] = dict(response.getheaders())
+                result["details"]["headers"] = {name: value for name, value in response.getheaders()
+                                                if name.lower() in _WANTED_HEADERS}
                 
                 # Pobierz informacje o certyfikacie
-                try:
+                if context is not None:
                     cert_info = response.info().get_all('peer-certificate')
                     if cert_info:
                         result["details"]["certificate"] = cert_info
-                except:
-                    pass
                 
-                # Dodaj operację otwarcia bezpiecznego interfejsu web
-                result["operations"].append({
-                    "name": "Bezpieczny interfejs WWW",
-                    "description": "Otwórz zabezpieczony interfejs użytkownika",
-                    "available": True,
-                    "protocol": "https",
-                    "url": url,
-                    "operation": "open_secure_web"
-                })
+                # Dodaj operację otwarcia interfejsu web
+                result["operations"].append(operation(*labels["open"], url))
                 
                 # Sprawdź rodzaj interfejsu przez pobranie treści strony
-                # Podobnie jak w _check_http_server_detailed, ale dla HTTPS
                 try:
                     content_req = urllib.request.Request(url)
-                    content_response = urllib.request.urlopen(content_req, timeout=2, context=context)
-                    content = content_response.read(8192).decode('utf-8', errors='ignore')
-                    
-                    # Ta sama logika co w _check_http_server_detailed dla wykrywania typu urządzenia
-                    # Dodano operacje specyficzne dla HTTPS
+                    with urllib.request.urlopen(content_req, timeout=2, context=context) as content_response:
+                        scores = _score_device_keywords(content_response)
                     
-                    # Sprawdź API preko HTTPS
-                    api_endpoints = [
-                        "/api/", "/rest/", "/v1/", "/v2/", "/api/v1/", 
-                        "/api/v2/", "/rest/v1/", "/json/", "/xml/"
-                    ]
+                    # Panel administracyjny i operacje specyficzne dla typu urządzenia
+                    for category, (device_type, name, description, operation_id) in _WEB_CATEGORY_OPERATIONS.items():
+                        if scores[category] >= 2:
+                            if device_type:
+                                result["details"]["device_type"] = device_type
+                            result["operations"].append(operation(name, description, operation_id, url))
                     
-                    for endpoint in api_endpoints:
-                        try:
-                            api_url = f"{url}{endpoint}"
-                            api_req = urllib.request.Request(api_url, method="HEAD")
-                            api_response = urllib.request.urlopen(api_req, timeout=1, context=context)
-                            
-                            # API wydaje się istnieć
-                            result["operations"].append({
-                                "name": "Bezpieczne API",
-                                "description": f"Dostęp do bezpiecznego API urządzenia",
-                                "available": True,
-                                "protocol": "https",
-                                "url": api_url,
-                                "operation": "api_access_secure"
-                            })
-                            
-                            break
-                        except:
-                            continue
+                    # Sprawdź API - wszystkie typowe ścieżki naraz
+                    api_url = self._probe_api_endpoints(url, context=context)
+                    if api_url:
+                        result["operations"].append(operation(*labels["api"], api_url))
                 
                 except Exception as e:
-                    print(f"Błąd podczas analizy treści HTTPS: {e}")
+                    _log_failure("Błąd podczas analizy treści %s: %s", scheme.upper(), e)
             
             except (urllib.error.URLError, urllib.error.HTTPError, socket.timeout) as e:
-                # Serwer HTTPS może nie być dostępny lub wymaga uwierzytelnienia
+                # Serwer może nie być dostępny lub wymaga uwierzytelnienia
                 if hasattr(e, 'code') and (e.code == 401 or e.code == 403):
                     # Serwer wymaga uwierzytelnienia
                     result["available"] = True
                     result["details"]["auth_required"] = True
                     
+                    # Pobierz informacje o uwierzytelnianiu
+                    if hasattr(e, 'headers'):
+                        auth_header = e.headers.get("WWW-Authenticate", "")
+                        result["details"]["auth_type"] = auth_header
+                    
                     # Dodaj operację logowania
-                    result["operations"].append({
-                        "name": "Bezpieczne logowanie",
-                        "description": "Zaloguj się do zabezpieczonego interfejsu",
-                        "available": True,
-                        "protocol": "https",
-                        "url": url,
-                        "operation": "secure_login",
-                        "auth_required": True
-                    })
+                    result["operations"].append(operation(*labels["login"], url, auth_required=True))
         
         except Exception as e:
-            print(f"Błąd podczas szczegółowego sprawdzania serwera HTTPS: {e}")
+            _log_failure("Błąd podczas szczegółowego sprawdzania serwera %s: %s", scheme.upper(), e)
         
         return result
 
@@ -2000,51 +3285,36 @@ class DeviceCapabilityScanner:
         }
         
         try:
-            # Nawiąż połączenie z serwerem SSH
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            conn_result = sock.connect_ex((address, 22))
+            # Nawiąż połączenie z serwerem SSH i odczytaj linię identyfikacyjną (RFC 4253 kończy ją CR LF)
+            try:
+                banner = grab_banner_sync(address, 22, terminator=b"\r\n").decode('latin-1', errors='ignore')
+            except (OSError, asyncio.TimeoutError, concurrent.futures.TimeoutError):
+                return result
             
-            if conn_result == 0:
-                # Port jest otwarty, spróbuj odczytać banner
-                try:
-                    banner = sock.recv(1024).decode('utf-8', errors='ignore')
-                    sock.close()
-                    
-                    result["available"] = True
-                    result["details"]["banner"] = banner
-                    
-                    # Spróbuj wyodrębnić wersję z bannera
-                    if "SSH" in banner:
-                        version_match = re.search(r'SSH-\d+\.\d+-([^\s]+)', banner)
-                        if version_match:
-                            result["version"] = version_match.group(1)
-                    
-                    # Sprawdź rozpowszechnione implementacje SSH
-                    ssh_implementations = [
-                        "OpenSSH", "Dropbear", "PuTTY", "WinSCP", "TTSSH", 
-                        "libssh", "paramiko", "crypto", "RomSShell"
-                    ]
-                    
-                    for impl in ssh_implementations:
-                        if impl.lower() in banner.lower():
-                            result["details"]["implementation"] = impl
-                            break
-                    
-                    # Większość serwerów SSH obsługuje SFTP
-                    result["sftp_enabled"] = True
-                    
-                    # Zakładamy, że wykonywanie poleceń jest domyślnie możliwe
-                    result["exec_enabled"] = True
-                    
-                except:
-                    sock.close()
-                    result["available"] = True
-            else:
-                sock.close()
+            # Port jest otwarty
+            result["available"] = True
+            if banner:
+                result["details"]["banner"] = banner
+                
+                # Spróbuj wyodrębnić wersję z bannera
+                if "SSH" in banner:
+                    version_match = _SSH_VERSION_RE.search(banner)
+                    if version_match:
+                        result["version"] = version_match.group(1)
+                
+                # Sprawdź rozpowszechnione implementacje SSH
+                implementation = _match_implementation(banner.lower(), _SSH_IMPLEMENTATIONS)
+                if implementation:
+                    result["details"]["implementation"] = implementation
+                
+                # Większość serwerów SSH obsługuje SFTP
+                result["sftp_enabled"] = True
+                
+                # Zakładamy, że wykonywanie poleceń jest domyślnie możliwe
+                result["exec_enabled"] = True
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera SSH: {e}")
+            _log_failure("Błąd podczas analizy serwera SSH: %s", e)
         
         return result
 
@@ -2060,10 +3330,11 @@ class DeviceCapabilityScanner:
         try:
             # Nawiąż połączenie z serwerem FTP
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            conn_result = sock.connect_ex((address, 21))
+            sock.settimeout(self._rtt_timeout(address))
+            conn_result = sock.connect_ex((resolve_host(address), 21))
             
             if conn_result == 0:
+                sock.settimeout(PROBE_TIMEOUT)
                 # Port jest otwarty, spróbuj odczytać banner
                 try:
                     banner = sock.recv(1024).decode('utf-8', errors='ignore')
@@ -2073,20 +3344,14 @@ class DeviceCapabilityScanner:
                     result["details"]["banner"] = banner
                     
                     # Spróbuj wyodrębnić wersję z bannera
-                    version_match = re.search(r'FTP server \(([^)]+)\)', banner)
+                    version_match = _FTP_VERSION_RE.search(banner)
                     if version_match:
                         result["version"] = version_match.group(1)
                     
                     # Sprawdź implementację FTP
-                    ftp_implementations = [
-                        "FileZilla", "vsftpd", "ProFTPD", "Pure-FTPd", "IIS FTP", 
-                        "WU-FTPD", "NcFTPd", "CerberusFTP"
-                    ]
-                    
-                    for impl in ftp_implementations:
-                        if impl.lower() in banner.lower():
-                            result["details"]["implementation"] = impl
-                            break
+                    implementation = _match_implementation(banner.lower(), _FTP_IMPLEMENTATIONS)
+                    if implementation:
+                        result["details"]["implementation"] = implementation
                     
                     # Sprawdź dostęp anonimowy
                     try:
@@ -2107,7 +3372,7 @@ class DeviceCapabilityScanner:
                 sock.close()
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera FTP: {e}")
+            _log_failure("Błąd podczas analizy serwera FTP: %s", e)
         
         return result
 
@@ -2164,9 +3429,7 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem RTSP
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, port))
+            sock = self._connect_probe(address, port)
             
             # Wyślij zapytanie OPTIONS RTSP
             request = f"OPTIONS rtsp://{address}:{port} RTSP/1.0\r\nCSeq: 1\r\n\r\n"
@@ -2190,14 +3453,11 @@ class DeviceCapabilityScanner:
                         # Sprawdź obsługiwane funkcje
                         result["can_record"] = "RECORD" in methods
                 
-                # Sprawdź popularne ścieżki kamer
-                common_paths = ["live", "stream", "ch1", "cam1", "media", "video"]
-                
-                for path in common_paths:
-                    result["details"]["stream_paths"] = common_paths
+                # Popularne ścieżki strumieni kamer
+                result["details"]["stream_paths"] = list(_RTSP_STREAM_PATHS)
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera RTSP: {e}")
+            _log_failure("Błąd podczas analizy serwera RTSP: %s", e)
         
         return result
 
@@ -2215,9 +3475,7 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem Telnet
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, 23))
+            sock = self._connect_probe(address, 23)
             
             # Odczytaj banner
             banner = sock.recv(1024).decode('utf-8', errors='ignore')
@@ -2227,19 +3485,12 @@ class DeviceCapabilityScanner:
             result["details"]["banner"] = banner
             
             # Spróbuj określić system z bannera
-            if "linux" in banner.lower():
-                result["details"]["os"] = "Linux"
-            elif "windows" in banner.lower():
-                result["details"]["os"] = "Windows"
-            elif "cisco" in banner.lower():
-                result["details"]["os"] = "Cisco IOS"
-            elif "dd-wrt" in banner.lower():
-                result["details"]["os"] = "DD-WRT"
-            elif "openwrt" in banner.lower():
-                result["details"]["os"] = "OpenWRT"
+            system = _match_implementation(banner.lower(), _TELNET_SYSTEMS)
+            if system:
+                result["details"]["os"] = system
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera Telnet: {e}")
+            _log_failure("Błąd podczas analizy serwera Telnet: %s", e)
         
         return result
 
@@ -2257,19 +3508,17 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem SMTP
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, port))
+            sock = self._connect_probe(address, port)
             
-            # Odczytaj banner
+            # Odczytaj banner - serwery SMTP odrzucają klientów wysyłających polecenia przed nim
             banner = sock.recv(1024).decode('utf-8', errors='ignore')
             
-            # Wyślij EHLO dla sprawdzenia dostępnych opcji
-            sock.send(b"EHLO test.com\r\n")
-            response = sock.recv(1024).decode('utf-8', errors='ignore')
-            
-            sock.send(b"QUIT\r\n")
-            sock.close()
+            # Wyślij EHLO dla sprawdzenia dostępnych opcji. EHLO musi kończyć grupę poleceń
+            # (RFC 2920), więc QUIT idzie dopiero po odpowiedzi - bez czekania na jego potwierdzenie
+            with sock:
+                sock.sendall(b"EHLO test.com\r\n")
+                response = _read_reply(sock, lambda line: line[3:4] != "-")
+                sock.sendall(b"QUIT\r\n")
             
             result["available"] = True
             result["details"]["banner"] = banner
@@ -2280,13 +3529,12 @@ class DeviceCapabilityScanner:
                 result["version"] = "ESMTP"
             
             # Wyodrębnij typ serwera
-            for smtp_type in ["Postfix", "Sendmail", "Exchange", "Exim", "qmail"]:
-                if smtp_type.lower() in banner.lower() or smtp_type.lower() in response.lower():
-                    result["details"]["server_type"] = smtp_type
-                    break
+            smtp_type = _match_implementation(f"{banner}\n{response}".lower(), _SMTP_IMPLEMENTATIONS)
+            if smtp_type:
+                result["details"]["server_type"] = smtp_type
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera SMTP: {e}")
+            _log_failure("Błąd podczas analizy serwera SMTP: %s", e)
         
         return result
 
@@ -2304,26 +3552,19 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem POP3
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, port))
-            
-            # Odczytaj banner
-            banner = sock.recv(1024).decode('utf-8', errors='ignore')
-            
-            # Wyślij CAPA dla sprawdzenia możliwości
-            sock.send(b"CAPA\r\n")
-            response = sock.recv(1024).decode('utf-8', errors='ignore')
+            sock = self._connect_probe(address, port)
             
-            sock.send(b"QUIT\r\n")
-            sock.close()
+            # Wyślij CAPA dla sprawdzenia możliwości razem z QUIT, banner to pierwsza linia odpowiedzi
+            with sock:
+                banner, _, reply = _pipelined_exchange(sock, b"CAPA\r\nQUIT\r\n").partition("\r\n")
+            response = _take_reply(reply, lambda line: line == "." or line.startswith("-ERR"))
             
             result["available"] = True
             result["details"]["banner"] = banner
             result["details"]["capabilities"] = response
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera POP3: {e}")
+            _log_failure("Błąd podczas analizy serwera POP3: %s", e)
         
         return result
     def _check_imap_server(self, address, port=143):
@@ -2340,26 +3581,19 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem IMAP
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, port))
-            
-            # Odczytaj banner
-            banner = sock.recv(1024).decode('utf-8', errors='ignore')
-            
-            # Wyślij CAPABILITY dla sprawdzenia możliwości
-            sock.send(b"A001 CAPABILITY\r\n")
-            response = sock.recv(1024).decode('utf-8', errors='ignore')
+            sock = self._connect_probe(address, port)
             
-            sock.send(b"A002 LOGOUT\r\n")
-            sock.close()
+            # Wyślij CAPABILITY dla sprawdzenia możliwości razem z LOGOUT, banner to pierwsza linia odpowiedzi
+            with sock:
+                banner, _, reply = _pipelined_exchange(sock, b"A001 CAPABILITY\r\nA002 LOGOUT\r\n").partition("\r\n")
+            response = _take_reply(reply, lambda line: line.startswith("A001 "))
             
             result["available"] = True
             result["details"]["banner"] = banner
             result["details"]["capabilities"] = response
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera IMAP: {e}")
+            _log_failure("Błąd podczas analizy serwera IMAP: %s", e)
         
         return result
 
@@ -2377,15 +3611,7 @@ class DeviceCapabilityScanner:
                 return result
             
             # Spróbuj wykonać zapytanie DNS
-            import socket
-            request = b"\x00\x01\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x03www\x06google\x03com\x00\x00\x01\x00\x01"
-            
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(2)
-            sock.sendto(request, (address, 53))
-            
-            response = sock.recv(1024)
-            sock.close()
+            response = _udp_batch_probe([address], _dns_query, _dns_reply_id, 53).get(address)
             
             if response:
                 result["available"] = True
@@ -2396,7 +3622,7 @@ class DeviceCapabilityScanner:
                     result["details"]["valid_response"] = True
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera DNS: {e}")
+            _log_failure("Błąd podczas analizy serwera DNS: %s", e)
         
         return result
 
@@ -2414,9 +3640,7 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem RDP
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, 3389))
+            sock = self._connect_probe(address, 3389)
             
             # Wysyłamy minimalne dane negocjacyjne RDP
             # To jest prosty pakiet negocjacyjny protokołu RDP
@@ -2430,7 +3654,7 @@ class DeviceCapabilityScanner:
             result["details"]["server_type"] = "RDP"
             
         except Exception as e:
-            print(f"Błąd podczas analizy serwera RDP: {e}")
+            _log_failure("Błąd podczas analizy serwera RDP: %s", e)
         
         return result
 
@@ -2448,9 +3672,7 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem VNC
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, 5900))
+            sock = self._connect_probe(address, 5900)
             
             # Odczytaj banner VNC (protokół RFC 6143)
             banner = sock.recv(1024).decode('utf-8', errors='ignore')
@@ -2461,12 +3683,12 @@ class DeviceCapabilityScanner:
                 result["details"]["banner"] = banner
                 
                 # Wyodrębnij wersję protokołu
-                version_match = re.search(r'RFB (\d+\.\d+)', banner)
+                version_match = _VNC_VERSION_RE.search(banner)
                 if version_match:
                     result["version"] = version_match.group(1)
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera VNC: {e}")
+            _log_failure("Błąd podczas analizy serwera VNC: %s", e)
         
         return result
 
@@ -2484,37 +3706,10 @@ class DeviceCapabilityScanner:
                 return result
             
             # Próba nawiązania połączenia z serwerem MQTT
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            sock.connect((address, port))
+            sock = self._connect_probe(address, port)
             
             # Wyślij pakiet CONNECT zgodny z MQTT v3.1.1
-            # Format pakietu MQTT jest binarny, więc musimy go ręcznie sformułować
-            
-            # Nagłówek CONNECT (typ pakietu = 1, flagi = 0)
-            packet = bytearray([0x10])
-            
-            # Długość pozostałej części pakietu
-            remaining_length = 12  # Minimalna długość
-            packet.append(remaining_length)
-            
-            # Protokół: MQTT
-            packet.extend(b"\x00\x04MQTT")
-            
-            # Wersja protokołu: 4 (dla MQTT v3.1.1)
-            packet.append(0x04)
-            
-            # Flagi połączenia (Clean Session)
-            packet.append(0x02)
-            
-            # Keep Alive (60 sekund)
-            packet.extend(b"\x00\x3C")
-            
-            # Pusty Client ID
-            packet.extend(b"\x00\x00")
-            
-            # Wysyłamy pakiet
-            sock.send(packet)
+            sock.sendall(_MQTT_CONNECT)
             
             # Odbieramy odpowiedź (pakiet CONNACK)
             response = sock.recv(1024)
@@ -2523,7 +3718,7 @@ class DeviceCapabilityScanner:
             # Sprawdzamy typ pakietu (powinien być 0x20 dla CONNACK)
             if len(response) >= 2 and response[0] == 0x20:
                 result["available"] = True
-                result["details"]["response"] = [hex(b) for b in response]
+                result["details"]["response"] = [_HEX_BYTES[b] for b in response]
                 
                 # Sprawdzamy kod powrotu
                 if len(response) >= 4:
@@ -2535,7 +3730,7 @@ class DeviceCapabilityScanner:
                         result["details"]["return_code"] = return_code
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera MQTT: {e}")
+            _log_failure("Błąd podczas analizy serwera MQTT: %s", e)
         
         return result
 
@@ -2570,32 +3765,20 @@ class DeviceCapabilityScanner:
                 # Ta część została pominięta dla uproszczenia
             
             except Exception as e:
-                print(f"Błąd podczas analizy SNMP z pysnmp: {e}")
+                _log_failure("Błąd podczas analizy SNMP z pysnmp: %s", e)
         
         # Jeśli nie ma pysnmp, spróbuj prostego testu UDP
         else:
             try:
-                # Przygotuj proste zapytanie SNMP GET
-                # To jest uproszczona wersja zapytania SNMP v1 o sysDescr.0
-                get_request = bytes.fromhex('302602010004067075626c6963a01904170403')
-                
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.settimeout(2)
-                sock.sendto(get_request, (address, 161))
-                
-                try:
-                    response, _ = sock.recvfrom(1024)
-                    if response:
-                        result["available"] = True
-                        result["get_enabled"] = True
-                        result["version"] = "v1/v2c"
-                except socket.timeout:
-                    pass
-                
-                sock.close()
+                # Proste zapytanie SNMP v1 GET o sysDescr.0
+                response = _udp_batch_probe([address], _snmp_get_request, _snmp_reply_id, 161).get(address)
+                if response:
+                    result["available"] = True
+                    result["get_enabled"] = True
+                    result["version"] = "v1/v2c"
             
             except Exception as e:
-                print(f"Błąd podczas prostego testu SNMP: {e}")
+                _log_failure("Błąd podczas prostego testu SNMP: %s", e)
         
         return result
 
@@ -2614,16 +3797,17 @@ class DeviceCapabilityScanner:
             if not self.check_port_open(address, 631):
                 return result
             
-            # Sprawdź dostępność HTTP na porcie IPP
-            import urllib.request
-            import urllib.error
-            
-            # Najpierw spróbuj uzyskać stronę statusu drukarki
-            url = f"http://{address}:631/printers"
+            # Sprawdź dostępność HTTP na porcie IPP - obie strony przez jedno połączenie keep-alive,
+            # zapytaniami HEAD (bez przesyłania treści)
+            import http.client
             
+            connection = http.client.HTTPConnection(address, 631, timeout=2)
             try:
-                response = urllib.request.urlopen(url, timeout=2)
-                if response.getcode() == 200:
+                # Najpierw spróbuj uzyskać stronę statusu drukarki
+                connection.request("HEAD", "/printers")
+                response = connection.getresponse()
+                response.read()
+                if response.status == 200:
                     result["available"] = True
                     result["supports_status"] = True
                     
@@ -2634,136 +3818,59 @@ class DeviceCapabilityScanner:
                     
                     # Sprawdź stronę z zadaniami
                     try:
-                        jobs_url = f"http://{address}:631/jobs"
-                        jobs_response = urllib.request.urlopen(jobs_url, timeout=1)
-                        if jobs_response.getcode() == 200:
+                        if connection.sock is not None:
+                            connection.sock.settimeout(1)
+                        connection.request("HEAD", "/jobs")
+                        jobs_response = connection.getresponse()
+                        jobs_response.read()
+                        if jobs_response.status == 200:
                             result["supports_jobs"] = True
-                    except:
+                    except (OSError, http.client.HTTPException):
                         pass
             
-            except (urllib.error.URLError, urllib.error.HTTPError):
+            except (OSError, http.client.HTTPException):
                 # Brak interfejsu WWW nie oznacza braku IPP
                 pass
+            finally:
+                connection.close()
             
-            # Sprawdź bezpośrednio IPP
-            try:
-                # To byłoby prawdziwe zapytanie IPP, ale jest skomplikowane do implementacji
-                # bez dedykowanej biblioteki, więc tu tylko zaznaczamy, że port jest otwarty
-                if not result["available"] and self.check_port_open(address, 631):
-                    result["available"] = True
-            except:
-                pass
+            # Prawdziwe zapytanie IPP byłoby skomplikowane do implementacji bez dedykowanej
+            # biblioteki, więc tu tylko zaznaczamy, że port (sprawdzony wyżej) jest otwarty
+            if not result["available"]:
+                result["available"] = True
         
         except Exception as e:
-            print(f"Błąd podczas analizy serwera IPP: {e}")
+            _log_failure("Błąd podczas analizy serwera IPP: %s", e)
         
         return result
 
     def _determine_device_type(self, services):
         """Określa typ urządzenia na podstawie wykrytych usług."""
-        # Liczniki różnych typów urządzeń
-        device_scores = {
-            "router": 0,
-            "printer": 0,
-            "camera": 0,
-            "nas": 0,
-            "computer": 0,
-            "server": 0,
-            "iot": 0,
-            "media": 0
-        }
+        # Liczniki różnych typów urządzeń (indeksy jak w _DEVICE_TYPES)
+        device_scores = [0] * len(_DEVICE_TYPES)
         
-        # Sprawdź usługi wskazujące na konkretne typy urządzeń
         for service in services:
+            # Punkty za rodzaj usługi i słowa kluczowe w jej szczegółach
             service_name = service.get("service")
-            
-            if not service_name:
-                continue
-            
-            # Routery często mają HTTP i usługi zarządzania
-            if service_name in ["HTTP", "HTTPS"]:
-                if "router" in str(service.get("details", {})).lower() or "gateway" in str(service.get("details", {})).lower():
-                    device_scores["router"] += 3
-                
-                if "device_type" in service.get("details", {}) and service["details"]["device_type"] == "router":
-                    device_scores["router"] += 5
-            
-            # Drukarki często mają IPP, LPD lub Raw Printing
-            if service_name in ["IPP", "Printer (Raw)"]:
-                device_scores["printer"] += 5
-            
-            if service_name == "LPD":
-                device_scores["printer"] += 4
-            
-            # Kamery często mają RTSP i HTTP
-            if service_name == "RTSP":
-                device_scores["camera"] += 5
-            
-            if service_name in ["HTTP", "HTTPS"] and "camera" in str(service.get("details", {})).lower():
-                device_scores["camera"] += 3
-            
-            # NAS często mają SMB, FTP, HTTP
-            if service_name in ["SMB/CIFS", "NFS"]:
-                device_scores["nas"] += 3
-            
-            if service_name == "FTP" and ("storage" in str(service.get("details", {})).lower() or "nas" in str(service.get("details", {})).lower()):
-                device_scores["nas"] += 3
-            
-            # Komputery często mają SSH, RDP, SMB, HTTP
-            if service_name in ["SSH", "RDP", "VNC"]:
-                device_scores["computer"] += 3
+            rules = _SERVICE_RULES.get(service_name)
+            if rules:
+                details = service.get("details", {})
+                details_lower = str(details).lower()
+                for index, score, keywords in rules:
+                    if keywords is None or any(keyword in details_lower for keyword in keywords):
+                        device_scores[index] += score
                 
-            # Serwery często mają wiele usług
-            if service_name in ["HTTP", "HTTPS", "FTP", "SSH", "SMTP", "IMAP", "POP3", "DNS"]:
-                device_scores["server"] += 1
-            
-            # IoT często mają HTTP, MQTT
-            if service_name == "MQTT":
-                device_scores["iot"] += 5
-            
-            # Media devices often have DLNA, HTTP
-            if service_name == "DLNA":
-                device_scores["media"] += 5
-            
-            if service_name in ["HTTP", "HTTPS"] and "media" in str(service.get("details", {})).lower():
-                device_scores["media"] += 3
-        
-        # Dodaj punkty na podstawie portów
-        for service in services:
-            port = service.get("port")
+                rule = _DEVICE_TYPE_RULES.get((service_name, details.get("device_type")))
+                if rule:
+                    device_scores[rule[0]] += rule[1]
             
-            if not port:
-                continue
-            
-            # Porty specyficzne dla drukarek
-            if port in [515, 631, 9100]:
-                device_scores["printer"] += 2
-            
-            # Porty specyficzne dla kamer
-            if port in [554, 8554, 10554]:
-                device_scores["camera"] += 2
-            
-            # Porty specyficzne dla komputerów
-            if port in [3389, 5900]:
-                device_scores["computer"] += 2
-            
-            # Porty specyficzne dla routerów
-            if port in [80, 443, 8080, 8443]:
-                device_scores["router"] += 1
-            
-            # Porty specyficzne dla serwerów
-            if port in [21, 22, 25, 53, 110, 143, 993, 995]:
-                device_scores["server"] += 1
-            
-            # Porty specyficzne dla IoT
-            if port in [1883, 8883]:
-                device_scores["iot"] += 2
+            # Punkty za numer portu
+            rule = _PORT_RULES.get(service.get("port"))
+            if rule:
+                device_scores[rule[0]] += rule[1]
         
         # Wybierz typ z najwyższym wynikiem
-        if not device_scores:
-            return "unknown"
-        
-        return max(device_scores.items(), key=lambda x: x[1])[0]
+        return _DEVICE_TYPES[device_scores.index(max(device_scores))]
 
     def _get_device_specific_operations(self, address, device_type):
         """Zwraca operacje specyficzne dla typu urządzenia."""
@@ -2863,7 +3970,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania operacji routera: {e}")
+            _log_failure("Błąd podczas sprawdzania operacji routera: %s", e)
         
         return operations
 
@@ -2913,7 +4020,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania operacji drukarki: {e}")
+            _log_failure("Błąd podczas sprawdzania operacji drukarki: %s", e)
         
         return operations
 
@@ -2976,7 +4083,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania operacji kamery: {e}")
+            _log_failure("Błąd podczas sprawdzania operacji kamery: %s", e)
         
         return operations
 
@@ -3048,7 +4155,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania operacji NAS: {e}")
+            _log_failure("Błąd podczas sprawdzania operacji NAS: %s", e)
         
         return operations
 
@@ -3119,7 +4226,7 @@ class DeviceCapabilityScanner:
             })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania operacji komputera: {e}")
+            _log_failure("Błąd podczas sprawdzania operacji komputera: %s", e)
         
         return operations
     def _check_iot_operations(self, address):
@@ -3190,7 +4297,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania operacji IoT: {e}")
+            _log_failure("Błąd podczas sprawdzania operacji IoT: %s", e)
         
         return operations
 
@@ -3260,7 +4367,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania operacji urządzenia medialnego: {e}")
+            _log_failure("Błąd podczas sprawdzania operacji urządzenia medialnego: %s", e)
         
         return operations
 
@@ -3328,7 +4435,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania protokołów sieciowych: {e}")
+            _log_failure("Błąd podczas sprawdzania protokołów sieciowych: %s", e)
 
     def _check_power_management_operations(self, address, connection_type):
         """Sprawdza dostępne operacje zarządzania zasilaniem."""
@@ -3518,7 +4625,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania opcji automatyzacji: {e}")
+            _log_failure("Błąd podczas sprawdzania opcji automatyzacji: %s", e)
 
     def _check_onvif_support(self, address):
         """Sprawdza obsługę ONVIF w kamerze."""
@@ -3603,7 +4710,7 @@ class DeviceCapabilityScanner:
                     break
             
             except Exception as e:
-                print(f"Błąd podczas sprawdzania ONVIF na porcie {port}: {e}")
+                _log_failure("Błąd podczas sprawdzania ONVIF na porcie %s: %s", port, e)
         
         return result
 
@@ -3623,9 +4730,7 @@ class DeviceCapabilityScanner:
                 continue
             
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(2)
-                sock.connect((address, port))
+                sock = self._connect_probe(address, port)
                 
                 # Wyślij zapytanie OPTIONS RTSP
                 request = f"OPTIONS rtsp://{address}:{port} RTSP/1.0\r\nCSeq: 1\r\n\r\n"
@@ -3647,7 +4752,7 @@ class DeviceCapabilityScanner:
                     
                     break
             except Exception as e:
-                print(f"Błąd podczas sprawdzania RTSP na porcie {port}: {e}")
+                _log_failure("Błąd podczas sprawdzania RTSP na porcie %s: %s", port, e)
         
         return result
 
@@ -3696,7 +4801,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania MJPEG na ścieżce {path}: {e}")
+                    _log_failure("Błąd podczas sprawdzania MJPEG na ścieżce %s: %s", path, e)
         
         return result
 
@@ -3776,7 +4881,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania interfejsu kamery na ścieżce {path}: {e}")
+                    _log_failure("Błąd podczas sprawdzania interfejsu kamery na ścieżce %s: %s", path, e)
         
         return result
     def _check_advanced_camera_features(self, address, capabilities, device_info):
@@ -3828,7 +4933,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania zaawansowanych funkcji kamery: {e}")
+            _log_failure("Błąd podczas sprawdzania zaawansowanych funkcji kamery: %s", e)
 
     def _check_recording_options(self, address):
         """Sprawdza opcje nagrywania dla kamery."""
@@ -3900,7 +5005,7 @@ class DeviceCapabilityScanner:
                             continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania opcji nagrywania na porcie {port}: {e}")
+                    _log_failure("Błąd podczas sprawdzania opcji nagrywania na porcie %s: %s", port, e)
             
             # Sprawdź możliwość nagrywania przez ONVIF
             if self._check_onvif_support(address).get("available", False):
@@ -3915,7 +5020,7 @@ class DeviceCapabilityScanner:
                 })
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania opcji nagrywania: {e}")
+            _log_failure("Błąd podczas sprawdzania opcji nagrywania: %s", e)
         
         return result
 
@@ -3962,7 +5067,7 @@ class DeviceCapabilityScanner:
                             continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania detekcji ruchu na porcie {port}: {e}")
+                    _log_failure("Błąd podczas sprawdzania detekcji ruchu na porcie %s: %s", port, e)
             
             # Sprawdź przez ONVIF
             if self._check_onvif_support(address).get("available", False):
@@ -3971,7 +5076,7 @@ class DeviceCapabilityScanner:
                 result["protocol"] = "onvif"
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania detekcji ruchu: {e}")
+            _log_failure("Błąd podczas sprawdzania detekcji ruchu: %s", e)
         
         return result
 
@@ -4014,7 +5119,7 @@ class DeviceCapabilityScanner:
                             continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania widzenia nocnego na porcie {port}: {e}")
+                    _log_failure("Błąd podczas sprawdzania widzenia nocnego na porcie %s: %s", port, e)
             
             # Sprawdź przez ONVIF
             if self._check_onvif_support(address).get("available", False):
@@ -4022,7 +5127,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania widzenia nocnego: {e}")
+            _log_failure("Błąd podczas sprawdzania widzenia nocnego: %s", e)
         
         return False
 
@@ -4062,7 +5167,7 @@ class DeviceCapabilityScanner:
                             continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania dwukierunkowego audio na porcie {port}: {e}")
+                    _log_failure("Błąd podczas sprawdzania dwukierunkowego audio na porcie %s: %s", port, e)
             
             # Sprawdź przez ONVIF
             onvif_info = self._check_onvif_support(address)
@@ -4070,7 +5175,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania dwukierunkowego audio: {e}")
+            _log_failure("Błąd podczas sprawdzania dwukierunkowego audio: %s", e)
         
         return False
 
@@ -4092,13 +5197,12 @@ class DeviceCapabilityScanner:
                 try:
                     import urllib.request
                     import urllib.error
-                    import ssl
                     
                     url = f"{protocol}://{address}:{port}{path}"
                     
                     try:
                         if protocol == "https":
-                            context = ssl._create_unverified_context()
+                            context = _UNVERIFIED_SSL_CONTEXT
                             response = urllib.request.urlopen(url, timeout=1, context=context)
                         else:
                             response = urllib.request.urlopen(url, timeout=1)
@@ -4115,7 +5219,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania panelu administracyjnego routera: {e}")
+                    _log_failure("Błąd podczas sprawdzania panelu administracyjnego routera: %s", e)
         
         return None
 
@@ -4137,13 +5241,12 @@ class DeviceCapabilityScanner:
                 try:
                     import urllib.request
                     import urllib.error
-                    import ssl
                     
                     url = f"{protocol}://{address}:{port}{path}"
                     
                     try:
                         if protocol == "https":
-                            context = ssl._create_unverified_context()
+                            context = _UNVERIFIED_SSL_CONTEXT
                             response = urllib.request.urlopen(url, timeout=1, context=context)
                         else:
                             response = urllib.request.urlopen(url, timeout=1)
@@ -4159,7 +5262,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania interfejsu WWW drukarki: {e}")
+                    _log_failure("Błąd podczas sprawdzania interfejsu WWW drukarki: %s", e)
         
         return None
 
@@ -4181,13 +5284,12 @@ class DeviceCapabilityScanner:
                 try:
                     import urllib.request
                     import urllib.error
-                    import ssl
                     
                     url = f"{protocol}://{address}:{port}{path}"
                     
                     try:
                         if protocol == "https":
-                            context = ssl._create_unverified_context()
+                            context = _UNVERIFIED_SSL_CONTEXT
                             response = urllib.request.urlopen(url, timeout=1, context=context)
                         else:
                             response = urllib.request.urlopen(url, timeout=1)
@@ -4203,7 +5305,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania interfejsu WWW kamery: {e}")
+                    _log_failure("Błąd podczas sprawdzania interfejsu WWW kamery: %s", e)
         
         return None
 
@@ -4225,13 +5327,12 @@ class DeviceCapabilityScanner:
                 try:
                     import urllib.request
                     import urllib.error
-                    import ssl
                     
                     url = f"{protocol}://{address}:{port}{path}"
                     
                     try:
                         if protocol == "https":
-                            context = ssl._create_unverified_context()
+                            context = _UNVERIFIED_SSL_CONTEXT
                             response = urllib.request.urlopen(url, timeout=1, context=context)
                         else:
                             response = urllib.request.urlopen(url, timeout=1)
@@ -4247,7 +5348,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania interfejsu WWW serwera NAS: {e}")
+                    _log_failure("Błąd podczas sprawdzania interfejsu WWW serwera NAS: %s", e)
         
         return None
 
@@ -4269,13 +5370,12 @@ class DeviceCapabilityScanner:
                 try:
                     import urllib.request
                     import urllib.error
-                    import ssl
                     
                     url = f"{protocol}://{address}:{port}{path}"
                     
                     try:
                         if protocol == "https":
-                            context = ssl._create_unverified_context()
+                            context = _UNVERIFIED_SSL_CONTEXT
                             response = urllib.request.urlopen(url, timeout=1, context=context)
                         else:
                             response = urllib.request.urlopen(url, timeout=1)
@@ -4291,7 +5391,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania interfejsu WWW urządzenia IoT: {e}")
+                    _log_failure("Błąd podczas sprawdzania interfejsu WWW urządzenia IoT: %s", e)
         
         return None
 
@@ -4313,13 +5413,12 @@ class DeviceCapabilityScanner:
                 try:
                     import urllib.request
                     import urllib.error
-                    import ssl
                     
                     url = f"{protocol}://{address}:{port}{path}"
                     
                     try:
                         if protocol == "https":
-                            context = ssl._create_unverified_context()
+                            context = _UNVERIFIED_SSL_CONTEXT
                             response = urllib.request.urlopen(url, timeout=1, context=context)
                         else:
                             response = urllib.request.urlopen(url, timeout=1)
@@ -4335,7 +5434,7 @@ class DeviceCapabilityScanner:
                         continue
                 
                 except Exception as e:
-                    print(f"Błąd podczas sprawdzania interfejsu WWW urządzenia medialnego: {e}")
+                    _log_failure("Błąd podczas sprawdzania interfejsu WWW urządzenia medialnego: %s", e)
         
         return None
 
@@ -4352,7 +5451,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi UPnP: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi UPnP: %s", e)
         
         return False
 
@@ -4365,7 +5464,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi mDNS: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi mDNS: %s", e)
         
         return False
 
@@ -4378,7 +5477,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi WS-Discovery: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi WS-Discovery: %s", e)
         
         return False
 
@@ -4404,7 +5503,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi UPnP: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi UPnP: %s", e)
         
         return False
 
@@ -4421,7 +5520,7 @@ class DeviceCapabilityScanner:
                         return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi DLNA: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi DLNA: %s", e)
         
         return False
 
@@ -4437,7 +5536,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi AirPlay: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi AirPlay: %s", e)
         
         return False
 
@@ -4449,7 +5548,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi Chromecast: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi Chromecast: %s", e)
         
         return False
 
@@ -4465,7 +5564,7 @@ class DeviceCapabilityScanner:
                 return True
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi Spotify Connect: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi Spotify Connect: %s", e)
         
         return False
 
@@ -4492,13 +5591,12 @@ class DeviceCapabilityScanner:
                     try:
                         import urllib.request
                         import urllib.error
-                        import ssl
                         
                         url = f"{protocol}://{address}:{port}{path}"
                         
                         try:
                             if protocol == "https":
-                                context = ssl._create_unverified_context()
+                                context = _UNVERIFIED_SSL_CONTEXT
                                 req = urllib.request.Request(url, method="HEAD")
                                 response = urllib.request.urlopen(req, timeout=1, context=context)
                             else:
@@ -4513,10 +5611,10 @@ class DeviceCapabilityScanner:
                             continue
                     
                     except Exception as e:
-                        print(f"Błąd podczas sprawdzania obsługi HLS na ścieżce {path}: {e}")
+                        _log_failure("Błąd podczas sprawdzania obsługi HLS na ścieżce %s: %s", path, e)
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi HLS: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi HLS: %s", e)
         
         return None
 
@@ -4543,13 +5641,12 @@ class DeviceCapabilityScanner:
                     try:
                         import urllib.request
                         import urllib.error
-                        import ssl
                         
                         url = f"{protocol}://{address}:{port}{path}"
                         
                         try:
                             if protocol == "https":
-                                context = ssl._create_unverified_context()
+                                context = _UNVERIFIED_SSL_CONTEXT
                                 req = urllib.request.Request(url, method="HEAD")
                                 response = urllib.request.urlopen(req, timeout=1, context=context)
                             else:
@@ -4564,10 +5661,10 @@ class DeviceCapabilityScanner:
                             continue
                     
                     except Exception as e:
-                        print(f"Błąd podczas sprawdzania obsługi DASH na ścieżce {path}: {e}")
+                        _log_failure("Błąd podczas sprawdzania obsługi DASH na ścieżce %s: %s", path, e)
         
         except Exception as e:
-            print(f"Błąd podczas sprawdzania obsługi DASH: {e}")
+            _log_failure("Błąd podczas sprawdzania obsługi DASH: %s", e)
         
         return None
     def _identify_service_from_banner(self, banner, port):
@@ -4575,77 +5672,13 @@ class DeviceCapabilityScanner:
         if not banner:
             return None
         
-        # Typowe identyfikatory usług w bannerach
-        service_identifiers = {
-            "ssh": ["ssh", "openssh", "sshd"],
-            "ftp": ["ftp", "fileserver", "vsftpd", "proftpd"],
-            "telnet": ["telnet", "login"],
-            "smtp": ["smtp", "mail server", "postfix", "sendmail", "mail service"],
-            "pop3": ["pop", "pop3", "mail"],
-            "imap": ["imap", "mail", "dovecot"],
-            "http": ["http", "web", "apache", "nginx", "iis", "webserver"],
-            "https": ["https", "secure", "ssl", "tls"],
-            "dns": ["dns", "domain", "named", "bind"],
-            "dhcp": ["dhcp", "bootpc", "bootps"],
-            "rdp": ["rdp", "terminal services", "remote desktop"],
-            "vnc": ["vnc", "remote desktop", "rfb"],
-            "printer": ["printer", "ipp", "cups", "jetdirect"],
-            "upnp": ["upnp", "universal plug and play"],
-            "snmp": ["snmp", "network management"],
-            "ntp": ["ntp", "time server", "time service"],
-            "ldap": ["ldap", "directory", "openldap", "active directory"],
-            "database": ["sql", "mysql", "postgresql", "oracle", "database", "db server"],
-            "mqtt": ["mqtt", "mosquitto"],
-            "rtsp": ["rtsp", "streaming", "video server"],
-            "sip": ["sip", "voip", "voice", "telephony"],
-            "irc": ["irc", "chat server", "internet relay chat"]
-        }
-        
-        # Typowe usługi na portach
-        port_services = {
-            21: "ftp",
-            22: "ssh",
-            23: "telnet",
-            25: "smtp",
-            53: "dns",
-            67: "dhcp",
-            68: "dhcp",
-            80: "http",
-            110: "pop3",
-            123: "ntp",
-            143: "imap",
-            161: "snmp",
-            389: "ldap",
-            443: "https",
-            465: "smtp-ssl",
-            514: "syslog",
-            554: "rtsp",
-            587: "smtp-submission",
-            631: "ipp",
-            993: "imaps",
-            995: "pop3s",
-            1883: "mqtt",
-            3306: "mysql",
-            3389: "rdp",
-            5432: "postgresql",
-            5060: "sip",
-            5900: "vnc",
-            8080: "http-alt",
-            8443: "https-alt",
-            9100: "printer"
-        }
-        
-        # Sprawdź identyfikatory w bannerze
-        banner_lower = banner.lower()
-        for service, identifiers in service_identifiers.items():
-            if any(identifier in banner_lower for identifier in identifiers):
-                return service
+        # Sprawdź identyfikatory w bannerze - wygrywa usługa najwcześniejsza w _BANNER_SERVICE_IDENTIFIERS
+        service = _match_implementation(banner.lower(), _BANNER_SERVICE_TABLE)
+        if service:
+            return service
         
         # Jeśli nie znaleziono w bannerze, sprawdź port
-        if port in port_services:
-            return port_services[port]
-        
-        return None
+        return _BANNER_PORT_SERVICES.get(port)
 
     def _get_webcam_controls(self, cap):
         """Zwraca dostępne operacje sterowania kamerą internetową."""
@@ -4654,6 +5687,8 @@ class DeviceCapabilityScanner:
         if not CAMERA_MODULE_AVAILABLE:
             return operations
         
+        cv2 = _lazy_module("cv2")
+        
         try:
             # Sprawdź dostępne parametry kamery
             properties = {
@@ -4682,30 +5717,19 @@ class DeviceCapabilityScanner:
                     })
         
         except Exception as e:
-            print(f"Błąd podczas pobierania kontrolek kamery: {e}")
+            _log_failure("Błąd podczas pobierania kontrolek kamery: %s", e)
         
         return operations
 
     def _get_webcam_resolutions(self, cap):
         """Pobiera obsługiwane rozdzielczości kamery."""
-        standard_resolutions = [
-            (640, 480),    # VGA
-            (800, 600),    # SVGA
-            (1024, 768),   # XGA
-            (1280, 720),   # HD
-            (1280, 800),   # WXGA
-            (1280, 1024),  # SXGA
-            (1600, 1200),  # UXGA
-            (1920, 1080),  # FHD
-            (2560, 1440),  # QHD
-            (3840, 2160)   # 4K UHD
-        ]
-        
         supported_resolutions = []
         
         if not CAMERA_MODULE_AVAILABLE:
             return supported_resolutions
         
+        cv2 = _lazy_module("cv2")
+        
         try:
             # Pobierz aktualną rozdzielczość
             current_width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
@@ -4717,13 +5741,13 @@ class DeviceCapabilityScanner:
             # W rzeczywistości, aby sprawdzić wszystkie obsługiwane rozdzielczości,
             # należałoby spróbować ustawić każdą i sprawdzić, czy była faktycznie ustawiona.
             # Tutaj dla uproszczenia dodajemy tylko kilka standardowych.
-            for width, height in standard_resolutions:
+            for width, height in _STANDARD_RESOLUTIONS:
                 if (width, height) not in supported_resolutions:
                     if width <= current_width and height <= current_height:
                         supported_resolutions.append((width, height))
         
         except Exception as e:
-            print(f"Błąd podczas pobierania rozdzielczości kamery: {e}")
+            _log_failure("Błąd podczas pobierania rozdzielczości kamery: %s", e)
         
         return supported_resolutions
 
@@ -4732,6 +5756,9 @@ class DeviceCapabilityScanner:
 scanner = DeviceScanner()
 capability_scanner = DeviceCapabilityScanner()
 
+# Wspólna pula wątków dla równoległych skanowań (unika tworzenia wątków przy każdym żądaniu)
+scan_executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+
 # API Routes
 @app.route('/api/devices/wifi', methods=['GET'])
 def get_wifi_devices():
@@ -4742,7 +5769,10 @@ def get_wifi_devices():
 @app.route('/api/devices/bluetooth', methods=['GET'])
 def get_bluetooth_devices():
     """Endpoint to get available Bluetooth devices"""
-    result = scanner.scan_bluetooth_devices()
+    timeout = request.args.get('timeout', BLUETOOTH_SCAN_TIMEOUT, type=float)
+    num = request.args.get('num', type=int)
+    since = request.args.get('since', type=int)
+    result = scanner.scan_bluetooth_changes(since, timeout, num)
     return jsonify(result)
 
 @app.route('/api/devices/camera', methods=['GET'])
@@ -4755,40 +5785,72 @@ def get_camera_devices():
 def scan_all_devices():
     """Endpoint to scan all types of devices"""
     method = request.args.get('method', 'all')
+    bt_timeout = request.args.get('timeout', BLUETOOTH_SCAN_TIMEOUT, type=float)
     
     if method == 'wifi':
         return jsonify(scanner.scan_wifi_networks())
     elif method == 'bluetooth':
-        return jsonify(scanner.scan_bluetooth_devices())
+        return jsonify(scanner.scan_bluetooth_devices(bt_timeout, request.args.get('num', type=int)))
     elif method == 'camera':
         return jsonify(scanner.list_available_cameras())
     else:
-        # Scan all device types
+        # Scan all device types in parallel - each scan waits mostly on I/O
         devices = []
+        futures = [
+            scan_executor.submit(scanner.scan_wifi_networks),      # Wi-Fi
+            scan_executor.submit(scanner.scan_bluetooth_devices, bt_timeout),  # Bluetooth
+            scan_executor.submit(scanner.list_available_cameras)   # Cameras
+        ]
         
-        # Wi-Fi
-        wifi_result = scanner.scan_wifi_networks()
-        if 'devices' in wifi_result:
-            devices.extend(wifi_result['devices'])
-            
-        # Bluetooth
-        bt_result = scanner.scan_bluetooth_devices()
-        if 'devices' in bt_result:
-            devices.extend(bt_result['devices'])
-            
-        # Cameras
-        camera_result = scanner.list_available_cameras()
-        if 'devices' in camera_result:
-            devices.extend(camera_result['devices'])
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            if 'devices' in result:
+                devices.extend(result['devices'])
             
         return jsonify({"status": "success", "devices": devices})
 
+@app.route('/api/devices/stream', methods=['GET'])
+def stream_devices():
+    """Endpoint streaming scan results as Server-Sent Events while the scans are running"""
+    bt_timeout = request.args.get('timeout', BLUETOOTH_SCAN_TIMEOUT, type=float)
+    events = queue.Queue()
+    
+    def run_scan(source, scan):
+        try:
+            result = scan()
+            if 'error' in result:
+                events.put({"event": "error", "source": source, "error": result['error']})
+            else:
+                events.put({"event": "devices", "source": source, "devices": result.get('devices', [])})
+        finally:
+            # None marks the end of a single scanner
+            events.put(None)
+    
+    def on_bluetooth_device(device):
+        events.put({"event": "device", "source": "bluetooth", "device": device})
+    
+    scan_executor.submit(run_scan, "wifi", scanner.scan_wifi_networks)
+    scan_executor.submit(run_scan, "bluetooth",
+                         lambda: scanner.stream_bluetooth_devices(on_bluetooth_device, bt_timeout))
+    scan_executor.submit(run_scan, "camera", scanner.list_available_cameras)
+    
+    def generate():
+        pending = 3
+        while pending:
+            event = events.get()
+            if event is None:
+                pending -= 1
+                continue
+            yield f"data: {app.json.dumps(event)}\n\n"
+        yield f"data: {app.json.dumps({'event': 'done'})}\n\n"
+    
+    return Response(generate(), mimetype='text/event-stream')
+
 @app.route('/api/devices/bluetooth/paired', methods=['GET'])
 def get_paired_bluetooth_devices():
     """Endpoint to get paired Bluetooth devices"""
-    # This is a simplified implementation that returns an empty list
-    # In a real implementation, you would query the OS for paired devices
-    return jsonify({"status": "success", "devices": []})
+    result = scanner.get_paired_bluetooth_devices()
+    return jsonify(result)
 
 @app.route('/api/devices/capabilities', methods=['GET'])
 def get_device_capabilities():
@@ -4797,11 +5859,14 @@ def get_device_capabilities():
     device_type = request.args.get('type', '')
     connection_method = request.args.get('method', 'auto')
     device_id = request.args.get('id', '')
+    force = request.args.get('force', '0') in ('1', 'true')
+    fast = request.args.get('fast', '0') in ('1', 'true')
     
     try:
-        # Query device capabilities
+        # Query device capabilities (cached per address and method unless force=1;
+        # fast=1 identifies unambiguous ports without probing them)
         result = capability_scanner.query_device_capabilities(
-            device_address, device_type, connection_method, device_id
+            device_address, device_type, connection_method, device_id, force=force, fast=fast
         )
         return jsonify(result)
     
@@ -4812,20 +5877,83 @@ def get_device_capabilities():
         })
 
 # Web Routes
+# Rozszerzenia wstępnie skompresowanych wariantów w kolejności preferencji
+_PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def setup_static_files():
+    """Tworzy skompresowane warianty (.gz, .br) plików CSS i JS, jeśli są nieaktualne."""
+    for subdir in ('css', 'js'):
+        directory = os.path.join(app.static_folder, subdir)
+        if not os.path.isdir(directory):
+            continue
+        
+        for filename in os.listdir(directory):
+            if not filename.endswith(('.css', '.js')):
+                continue
+            
+            path = os.path.join(directory, filename)
+            try:
+                mtime = os.path.getmtime(path)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                
+                variants = [(path + '.gz', lambda: gzip.compress(data, 9))]
+                if BROTLI_AVAILABLE:
+                    variants.append((path + '.br', lambda: brotli.compress(data, quality=11)))
+                
+                for variant_path, compress in variants:
+                    if os.path.exists(variant_path) and os.path.getmtime(variant_path) >= mtime:
+                        continue
+                    with open(variant_path, 'wb') as f:
+                        f.write(compress())
+            except OSError as e:
+                print(f"Could not precompress static file {path}: {str(e)}")
+
+
+def _variant_is_fresh(directory, filename, extension):
+    """Czy skompresowany wariant istnieje i nie jest starszy od oryginału (edycja w trakcie działania serwera)."""
+    path = os.path.join(directory, filename)
+    try:
+        return os.path.getmtime(path + extension) >= os.path.getmtime(path)
+    except (OSError, ValueError):
+        return False
+
+
+def send_precompressed(directory, filename):
+    """
+    Wysyła plik statyczny, preferując wstępnie skompresowany wariant akceptowany przez klienta.
+    Nieaktualny wariant jest pomijany - wysyłany jest wtedy oryginał.
+    """
+    mimetype = mimetypes.guess_type(filename)[0]
+    
+    for encoding, extension in _PRECOMPRESSED_ENCODINGS:
+        if encoding in request.accept_encodings and _variant_is_fresh(directory, filename, extension):
+            response = send_from_directory(directory, filename + extension, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+    
+    response = send_from_directory(directory, filename, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+
 @app.route('/', methods=['GET'])
 def index():
     """Endpoint to serve the main HTML page"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_from_directory(APP_DIR, 'index.html')
 
 @app.route('/static/css/<path:filename>', methods=['GET'])
 def serve_css(filename):
     """Endpoint to serve CSS files"""
-    return send_from_directory(os.path.join(app.static_folder, 'css'), filename)
+    return send_precompressed(os.path.join(app.static_folder, 'css'), filename)
 
 @app.route('/static/js/<path:filename>', methods=['GET'])
 def serve_js(filename):
     """Endpoint to serve JavaScript files"""
-    return send_from_directory(os.path.join(app.static_folder, 'js'), filename)
+    return send_precompressed(os.path.join(app.static_folder, 'js'), filename)
 
 # HTTP Error handlers
 @app.errorhandler(404)
@@ -4839,7 +5967,24 @@ def server_error(e):
     return jsonify({"error": "Internal server error"}), 500
 
 
+def _setup_logging():
+    """
+    Log through a queue so the stderr writes happen on the listener thread, not on probe threads.
+    Only the module logger is configured; third-party loggers keep their own levels.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stderr))
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(LOG_LEVEL)
+    log.propagate = False
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
 if __name__ == '__main__':
+    _setup_logging()
+    setup_static_files()
     
     # Show information about available modules
     print("\n=== Available Modules Information ===")
@@ -4857,5 +6002,14 @@ if __name__ == '__main__':
     print(f"\nStarting API server on http://localhost:{PORT}")
     print("Press CTRL+C to stop the server")
     
-    # Run Flask server
-    app.run(host=HOST, port=PORT, debug=DEBUG)
\ No newline at end of file
+    # Run the server: Flask's development server only in debug mode, otherwise
+    # waitress so a long scan does not block other requests (static files, other scans)
+    if DEBUG:
+        app.run(host=HOST, port=PORT, debug=True)
+    else:
+        try:
+            from waitress import serve
+            serve(app, host=HOST, port=PORT, threads=SERVER_THREADS, connection_limit=100)
+        except ImportError:
+            print("Module 'waitress' is not installed. Using the threaded Flask server.")
+            app.run(host=HOST, port=PORT, debug=False, threaded=True)
\ No newline at end of file
@@ -103,6 +103,12 @@ function scanForDevices(method) {
     // Show device list
     document.getElementById('deviceList').style.display = 'block';
     
+    // Scanning all device types streams results as each scanner finishes
+    if (method === 'all' && window.EventSource) {
+        streamScanResults(deviceListContainer, loadingIndicator, method);
+        return;
+    }
+    
     // Make API request
     fetch(`${API_BASE_URL}/devices/scan?method=${method}`)
         .then(response => response.json())
@@ -110,202 +116,7 @@ function scanForDevices(method) {
             // Remove loading indicator
             deviceListContainer.removeChild(loadingIndicator);
             
-            if (data.error) {
-                // Display error
-                const errorDiv = document.createElement('div');
-                errorDiv.className = 'error-message';
-                errorDiv.textContent = data.error;
-                deviceListContainer.appendChild(errorDiv);
-                return;
-            }
-            
-            if (data.devices && data.devices.length > 0) {
-                // Get existing devices from sidebar to check for duplicates
-                const existingDevices = document.querySelectorAll('.sidebar-link');
-                
-                // Create sets for address, id, and unique_id comparison
-                const existingAddresses = new Set();
-                const existingIds = new Set();
-                const existingUniqueIds = new Set();
-                const existingNames = new Set(); // only for logging/debugging
-                
-                // Collect all existing device identifiers
-                existingDevices.forEach(device => {
-                    // Collect address
-                    const deviceAddress = device.getAttribute('data-ip') || '';
-                    if (deviceAddress) {
-                        existingAddresses.add(deviceAddress.toLowerCase());
-                    }
-                    
-                    // Collect device ID 
-                    const deviceId = device.getAttribute('data-device-id') || '';
-                    if (deviceId) {
-                        existingIds.add(deviceId);
-                    }
-                    
-                    // Collect unique ID
-                    const uniqueId = device.getAttribute('data-unique-id') || '';
-                    if (uniqueId) {
-                        existingUniqueIds.add(uniqueId);
-                    }
-                    
-                    // Collect device name for debugging purposes
-                    const deviceNameElem = device.querySelector('.device-name');
-                    if (deviceNameElem) {
-                        // Extract just the text without HTML
-                        let deviceName = deviceNameElem.textContent.trim();
-                        // Remove status icon, favorite star, device type icon
-                        deviceName = deviceName.replace(/[★☆🔌📱💻🖨️🖥️📹🌡️]/g, '').trim();
-                        if (deviceName) {
-                            existingNames.add(deviceName.toLowerCase());
-                        }
-                    }
-                });
-                
-                // Filter out devices that are already in the sidebar
-                const uniqueDevices = data.devices.filter(device => {
-                    const deviceAddress = (device.address || '').toLowerCase();
-                    const deviceId = device.id || '';
-                    const deviceName = (device.name || '').toLowerCase();
-                    const uniqueId = device.unique_id || '';
-                    
-                    // First check by address (most reliable)
-                    if (deviceAddress && existingAddresses.has(deviceAddress)) {
-                        console.log(`Filtering out device with existing address: ${deviceAddress}`);
-                        return false;
-                    }
-                    
-                    // Then check by unique_id (if available)
-                    if (uniqueId && existingUniqueIds.has(uniqueId)) {
-                        console.log(`Filtering out device with existing unique ID: ${uniqueId}`);
-                        return false;
-                    }
-                    
-                    // Then check by ID
-                    if (deviceId && existingIds.has(deviceId)) {
-                        console.log(`Filtering out device with existing ID: ${deviceId}`);
-                        return false;
-                    }
-                    
-                    // Check if the device has a similar name + type combination that could indicate a duplicate
-                    const deviceTypeIcon = device.type || getDeviceIconByName(device.name);
-                    const nameTypePair = `${deviceName}:${deviceTypeIcon}`.toLowerCase();
-                    
-                    // Create nameTypePair set for more thorough comparison
-                    const existingNameTypePairs = new Set();
-                    existingDevices.forEach(existingDevice => {
-                        const existingName = existingDevice.querySelector('.device-name')?.textContent.trim() || '';
-                        // Remove status icon, favorite star, type icon, and other symbols
-                        const cleanName = existingName.replace(/[★☆🔌📱💻🖨️🖥️📹🌡️🔒]/g, '').trim().toLowerCase();
-                        const existingType = existingDevice.getAttribute('data-device-type') || '';
-                        existingNameTypePairs.add(`${cleanName}:${existingType}`.toLowerCase());
-                    });
-                    
-                    if (existingNameTypePairs.has(nameTypePair)) {
-                        console.log(`Filtering out device with existing name+type: ${nameTypePair}`);
-                        return false;
-                    }
-                    
-                    // If none of the above matches, it's a new device
-                    return true;
-                });
-                
-                if (uniqueDevices.length === 0) {
-                    // All found devices are already in the sidebar
-                    const noNewDevicesDiv = document.createElement('div');
-                    noNewDevicesDiv.className = 'no-devices-message';
-                    noNewDevicesDiv.textContent = 'All detected devices are already added to your sidebar.';
-                    deviceListContainer.appendChild(noNewDevicesDiv);
-                    return;
-                }
-                
-                // Show found unique devices
-                uniqueDevices.forEach((device, index) => {
-                    const deviceItem = document.createElement('div');
-                    deviceItem.className = 'device-list-item';
-                    deviceItem.setAttribute('data-id', device.id);
-                    
-                    // Also store unique_id if available
-                    if (device.unique_id) {
-                        deviceItem.setAttribute('data-unique-id', device.unique_id);
-                    }
-                    
-                    const deviceIcon = device.type || getDeviceIconByName(device.name);
-                    const deviceName = device.name || 'Nieznane urządzenie';
-                    
-                    // Add MAC address display
-                    const addressDisplay = device.address ? 
-                        `<div class="device-address">${device.address}</div>` : 
-                        '<div class="device-address">Brak adresu MAC</div>';
-                    
-                    deviceItem.innerHTML = `
-                        <div class="device-list-icon">${deviceIcon}</div>
-                        <div class="device-list-info">
-                            <div class="device-list-name">${deviceName}</div>
-                            ${addressDisplay}
-                        </div>
-                    `;
-                    
-                    // Add click handler
-                    deviceItem.addEventListener('click', function() {
-                        // Remove previous selection
-                        document.querySelectorAll('.device-list-item').forEach(item => {
-                            item.classList.remove('selected');
-                        });
-                        
-                        // Select this device
-                        this.classList.add('selected');
-                        
-                        // Fill the form with device name
-                        document.getElementById('deviceName').value = deviceName;
-                        
-                        // Set appropriate device type
-                        const deviceTypeSelect = document.getElementById('deviceType');
-                        const iconType = deviceIcon.trim();
-                        
-                        // Find option with matching icon
-                        for (let i = 0; i < deviceTypeSelect.options.length; i++) {
-                            if (deviceTypeSelect.options[i].value === iconType) {
-                                deviceTypeSelect.selectedIndex = i;
-                                break;
-                            }
-                        }
-                        
-                        // If device has IP address or is Bluetooth, fill IP/address field
-                        if (device.address) {
-                            document.getElementById('deviceIP').value = device.address;
-                        } else if (method === 'wifi') {
-                            // For WiFi networks we can simulate IP
-                            document.getElementById('deviceIP').value = generateRandomIP();
-                        }
-
-                        // Save unique_id to a hidden field or attribute for later use
-                        if (device.unique_id) {
-                            if (!document.getElementById('deviceUniqueId')) {
-                                // Create hidden field if it doesn't exist
-                                const hiddenField = document.createElement('input');
-                                hiddenField.type = 'hidden';
-                                hiddenField.id = 'deviceUniqueId';
-                                hiddenField.value = device.unique_id;
-                                document.getElementById('addDeviceForm').appendChild(hiddenField);
-                            } else {
-                                document.getElementById('deviceUniqueId').value = device.unique_id;
-                            }
-                        }
-
-                        // Query device capabilities
-                        queryDeviceCapabilities(device.id, device.address, iconType, method);
-                    });
-                    
-                    deviceListContainer.appendChild(deviceItem);
-                });
-            } else {
-                // No devices found
-                const noDevicesDiv = document.createElement('div');
-                noDevicesDiv.className = 'no-devices-message';
-                noDevicesDiv.textContent = 'Nie znaleziono żadnych urządzeń.';
-                deviceListContainer.appendChild(noDevicesDiv);
-            }
+            renderScannedDevices(deviceListContainer, data, method);
         })
         .catch(error => {
             console.error('Błąd podczas skanowania urządzeń:', error);
@@ -323,6 +134,270 @@ function scanForDevices(method) {
         });
 }
 
+/**
+ * Renders scanned devices in the device list, skipping devices already in the sidebar
+ * @param {HTMLElement} deviceListContainer - Container for the device list
+ * @param {Object} data - Scan result with `devices` array or `error` message
+ * @param {string} method - Scan method (wifi, bluetooth, camera, all)
+ */
+function renderScannedDevices(deviceListContainer, data, method) {
+    if (data.error) {
+        // Display error
+        const errorDiv = document.createElement('div');
+        errorDiv.className = 'error-message';
+        errorDiv.textContent = data.error;
+        deviceListContainer.appendChild(errorDiv);
+        return;
+    }
+    
+    if (data.devices && data.devices.length > 0) {
+        // Get existing devices from sidebar to check for duplicates
+        const existingDevices = document.querySelectorAll('.sidebar-link');
+        
+        // Create sets for address, id, and unique_id comparison
+        const existingAddresses = new Set();
+        const existingIds = new Set();
+        const existingUniqueIds = new Set();
+        const existingNames = new Set(); // only for logging/debugging
+        
+        // Collect all existing device identifiers
+        existingDevices.forEach(device => {
+            // Collect address
+            const deviceAddress = device.getAttribute('data-ip') || '';
+            if (deviceAddress) {
+                existingAddresses.add(deviceAddress.toLowerCase());
+            }
+            
+            // Collect device ID 
+            const deviceId = device.getAttribute('data-device-id') || '';
+            if (deviceId) {
+                existingIds.add(deviceId);
+            }
+            
+            // Collect unique ID
+            const uniqueId = device.getAttribute('data-unique-id') || '';
+            if (uniqueId) {
+                existingUniqueIds.add(uniqueId);
+            }
+            
+            // Collect device name for debugging purposes
+            const deviceNameElem = device.querySelector('.device-name');
+            if (deviceNameElem) {
+                // Extract just the text without HTML
+                let deviceName = deviceNameElem.textContent.trim();
+                // Remove status icon, favorite star, device type icon
+                deviceName = deviceName.replace(/[★☆🔌📱💻🖨️🖥️📹🌡️]/g, '').trim();
+                if (deviceName) {
+                    existingNames.add(deviceName.toLowerCase());
+                }
+            }
+        });
+        
+        // Filter out devices that are already in the sidebar
+        const uniqueDevices = data.devices.filter(device => {
+            const deviceAddress = (device.address || '').toLowerCase();
+            const deviceId = device.id || '';
+            const deviceName = (device.name || '').toLowerCase();
+            const uniqueId = device.unique_id || '';
+            
+            // First check by address (most reliable)
+            if (deviceAddress && existingAddresses.has(deviceAddress)) {
+                console.log(`Filtering out device with existing address: ${deviceAddress}`);
+                return false;
+            }
+            
+            // Then check by unique_id (if available)
+            if (uniqueId && existingUniqueIds.has(uniqueId)) {
+                console.log(`Filtering out device with existing unique ID: ${uniqueId}`);
+                return false;
+            }
+            
+            // Then check by ID
+            if (deviceId && existingIds.has(deviceId)) {
+                console.log(`Filtering out device with existing ID: ${deviceId}`);
+                return false;
+            }
+            
+            // Check if the device has a similar name + type combination that could indicate a duplicate
+            const deviceTypeIcon = device.type || getDeviceIconByName(device.name);
+            const nameTypePair = `${deviceName}:${deviceTypeIcon}`.toLowerCase();
+            
+            // Create nameTypePair set for more thorough comparison
+            const existingNameTypePairs = new Set();
+            existingDevices.forEach(existingDevice => {
+                const existingName = existingDevice.querySelector('.device-name')?.textContent.trim() || '';
+                // Remove status icon, favorite star, type icon, and other symbols
+                const cleanName = existingName.replace(/[★☆🔌📱💻🖨️🖥️📹🌡️🔒]/g, '').trim().toLowerCase();
+                const existingType = existingDevice.getAttribute('data-device-type') || '';
+                existingNameTypePairs.add(`${cleanName}:${existingType}`.toLowerCase());
+            });
+            
+            if (existingNameTypePairs.has(nameTypePair)) {
+                console.log(`Filtering out device with existing name+type: ${nameTypePair}`);
+                return false;
+            }
+            
+            // If none of the above matches, it's a new device
+            return true;
+        });
+        
+        if (uniqueDevices.length === 0) {
+            // All found devices are already in the sidebar
+            const noNewDevicesDiv = document.createElement('div');
+            noNewDevicesDiv.className = 'no-devices-message';
+            noNewDevicesDiv.textContent = 'All detected devices are already added to your sidebar.';
+            deviceListContainer.appendChild(noNewDevicesDiv);
+            return;
+        }
+        
+        // Show found unique devices
+        uniqueDevices.forEach((device, index) => {
+            const deviceItem = document.createElement('div');
+            deviceItem.className = 'device-list-item';
+            deviceItem.setAttribute('data-id', device.id);
+            
+            // Also store unique_id if available
+            if (device.unique_id) {
+                deviceItem.setAttribute('data-unique-id', device.unique_id);
+            }
+            
+            const deviceIcon = device.type || getDeviceIconByName(device.name);
+            const deviceName = device.name || 'Nieznane urządzenie';
+            
+            // Add MAC address display
+            const addressDisplay = device.address ? 
+                `<div class="device-address">${device.address}</div>` : 
+                '<div class="device-address">Brak adresu MAC</div>';
+            
+            deviceItem.innerHTML = `
+                <div class="device-list-icon">${deviceIcon}</div>
+                <div class="device-list-info">
+                    <div class="device-list-name">${deviceName}</div>
+                    ${addressDisplay}
+                </div>
+            `;
+            
+            // Add click handler
+            deviceItem.addEventListener('click', function() {
+                // Remove previous selection
+                document.querySelectorAll('.device-list-item').forEach(item => {
+                    item.classList.remove('selected');
+                });
+                
+                // Select this device
+                this.classList.add('selected');
+                
+                // Fill the form with device name
+                document.getElementById('deviceName').value = deviceName;
+                
+                // Set appropriate device type
+                const deviceTypeSelect = document.getElementById('deviceType');
+                const iconType = deviceIcon.trim();
+                
+                // Find option with matching icon
+                for (let i = 0; i < deviceTypeSelect.options.length; i++) {
+                    if (deviceTypeSelect.options[i].value === iconType) {
+                        deviceTypeSelect.selectedIndex = i;
+                        break;
+                    }
+                }
+                
+                // If device has IP address or is Bluetooth, fill IP/address field
+                if (device.address) {
+                    document.getElementById('deviceIP').value = device.address;
+                } else if (method === 'wifi') {
+                    // For WiFi networks we can simulate IP
+                    document.getElementById('deviceIP').value = generateRandomIP();
+                }
+
+                // Save unique_id to a hidden field or attribute for later use
+                if (device.unique_id) {
+                    if (!document.getElementById('deviceUniqueId')) {
+                        // Create hidden field if it doesn't exist
+                        const hiddenField = document.createElement('input');
+                        hiddenField.type = 'hidden';
+                        hiddenField.id = 'deviceUniqueId';
+                        hiddenField.value = device.unique_id;
+                        document.getElementById('addDeviceForm').appendChild(hiddenField);
+                    } else {
+                        document.getElementById('deviceUniqueId').value = device.unique_id;
+                    }
+                }
+
+                // Query device capabilities
+                queryDeviceCapabilities(device.id, device.address, iconType, method);
+            });
+            
+            deviceListContainer.appendChild(deviceItem);
+        });
+    } else {
+        // No devices found
+        const noDevicesDiv = document.createElement('div');
+        noDevicesDiv.className = 'no-devices-message';
+        noDevicesDiv.textContent = 'Nie znaleziono żadnych urządzeń.';
+        deviceListContainer.appendChild(noDevicesDiv);
+    }
+}
+
+/**
+ * Streams scan results (Server-Sent Events) and re-renders the device list
+ * as soon as each scanner reports its devices
+ * @param {HTMLElement} deviceListContainer - Container for the device list
+ * @param {HTMLElement} loadingIndicator - Loading indicator shown until the scan is done
+ * @param {string} method - Scan method passed on to the capability query
+ */
+function streamScanResults(deviceListContainer, loadingIndicator, method) {
+    const devices = new Map();
+    const eventSource = new EventSource(`${API_BASE_URL}/devices/stream`);
+    
+    const addDevice = device => {
+        devices.set(device.address || device.id, device);
+    };
+    
+    eventSource.onmessage = event => {
+        const message = JSON.parse(event.data);
+        
+        if (message.event === 'device') {
+            addDevice(message.device);
+        } else if (message.event === 'devices') {
+            message.devices.forEach(addDevice);
+        } else if (message.event === 'error') {
+            console.error(`Błąd podczas skanowania (${message.source}): ${message.error}`);
+        }
+        
+        const done = message.event === 'done';
+        if (done) {
+            eventSource.close();
+        } else if (devices.size === 0) {
+            // Nothing to show yet - keep the loading indicator
+            return;
+        }
+        
+        deviceListContainer.innerHTML = '';
+        renderScannedDevices(deviceListContainer, { devices: Array.from(devices.values()) }, method);
+        
+        if (!done) {
+            deviceListContainer.appendChild(loadingIndicator);
+        }
+    };
+    
+    eventSource.onerror = () => {
+        eventSource.close();
+        
+        // Remove loading indicator
+        if (loadingIndicator.parentNode === deviceListContainer) {
+            deviceListContainer.removeChild(loadingIndicator);
+        }
+        
+        if (devices.size === 0) {
+            const errorDiv = document.createElement('div');
+            errorDiv.className = 'error-message';
+            errorDiv.textContent = 'Wystąpił błąd podczas łączenia z API. Sprawdź, czy serwer API jest uruchomiony.';
+            deviceListContainer.appendChild(errorDiv);
+        }
+    };
+}
+
 /**
  * Bluetooth device scanning with separate sections for paired and available devices
  */
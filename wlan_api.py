@@ -0,0 +1,253 @@
+"""
+Native Wifi (wlanapi.dll) bindings used by Device Finder on Windows.
+Reads the BSS list of every wireless interface directly through ctypes, so
+scanning does not depend on spawning netsh or parsing its localized output.
+"""
+
+import ctypes
+import sys
+from ctypes import wintypes
+
+WLAN_API_AVAILABLE = sys.platform == "win32"
+
+ERROR_SUCCESS = 0
+WLAN_CLIENT_VERSION = 2  # Windows Vista i nowsze
+DOT11_BSS_TYPE_ANY = 3
+
+# DOT11_AUTH_ALGORITHM -> nazwa zgodna z tą wyświetlaną przez netsh
+AUTH_ALGORITHMS = {
+    1: "Open",
+    2: "Shared",
+    3: "WPA-Enterprise",
+    4: "WPA-Personal",
+    5: "WPA-None",
+    6: "WPA2-Enterprise",
+    7: "WPA2-Personal",
+    8: "WPA3-Enterprise 192 Bits",
+    9: "WPA3-Personal",
+    10: "OWE",
+    11: "WPA3-Enterprise",
+}
+
+
+class GUID(ctypes.Structure):
+    _fields_ = [
+        ("Data1", wintypes.DWORD),
+        ("Data2", wintypes.WORD),
+        ("Data3", wintypes.WORD),
+        ("Data4", ctypes.c_ubyte * 8),
+    ]
+
+
+class WLAN_INTERFACE_INFO(ctypes.Structure):
+    _fields_ = [
+        ("InterfaceGuid", GUID),
+        ("strInterfaceDescription", ctypes.c_wchar * 256),
+        ("isState", wintypes.DWORD),
+    ]
+
+
+class WLAN_INTERFACE_INFO_LIST(ctypes.Structure):
+    _fields_ = [
+        ("dwNumberOfItems", wintypes.DWORD),
+        ("dwIndex", wintypes.DWORD),
+        ("InterfaceInfo", WLAN_INTERFACE_INFO * 1),
+    ]
+
+
+class DOT11_SSID(ctypes.Structure):
+    _fields_ = [
+        ("uSSIDLength", wintypes.ULONG),
+        ("ucSSID", ctypes.c_ubyte * 32),
+    ]
+
+
+class WLAN_RATE_SET(ctypes.Structure):
+    _fields_ = [
+        ("uRateSetLength", wintypes.ULONG),
+        ("usRateSet", wintypes.USHORT * 126),
+    ]
+
+
+class WLAN_BSS_ENTRY(ctypes.Structure):
+    _fields_ = [
+        ("dot11Ssid", DOT11_SSID),
+        ("uPhyId", wintypes.ULONG),
+        ("dot11Bssid", ctypes.c_ubyte * 6),
+        ("dot11BssType", wintypes.DWORD),
+        ("dot11BssPhyType", wintypes.DWORD),
+        ("lRssi", wintypes.LONG),
+        ("uLinkQuality", wintypes.ULONG),
+        ("bInRegDomain", wintypes.BOOLEAN),
+        ("usBeaconPeriod", wintypes.USHORT),
+        ("ullTimestamp", ctypes.c_ulonglong),
+        ("ullHostTimestamp", ctypes.c_ulonglong),
+        ("usCapabilityInformation", wintypes.USHORT),
+        ("ulChCenterFrequency", wintypes.ULONG),
+        ("wlanRateSet", WLAN_RATE_SET),
+        ("ulIeOffset", wintypes.ULONG),
+        ("ulIeSize", wintypes.ULONG),
+    ]
+
+
+class WLAN_BSS_LIST(ctypes.Structure):
+    _fields_ = [
+        ("dwTotalSize", wintypes.DWORD),
+        ("dwNumberOfItems", wintypes.DWORD),
+        ("wlanBssEntries", WLAN_BSS_ENTRY * 1),
+    ]
+
+
+class WLAN_AVAILABLE_NETWORK(ctypes.Structure):
+    _fields_ = [
+        ("strProfileName", ctypes.c_wchar * 256),
+        ("dot11Ssid", DOT11_SSID),
+        ("dot11BssType", wintypes.DWORD),
+        ("uNumberOfBssids", wintypes.ULONG),
+        ("bNetworkConnectable", wintypes.BOOL),
+        ("wlanNotConnectableReason", wintypes.DWORD),
+        ("uNumberOfPhyTypes", wintypes.ULONG),
+        ("dot11PhyTypes", wintypes.DWORD * 8),
+        ("bMorePhyTypes", wintypes.BOOL),
+        ("wlanSignalQuality", wintypes.ULONG),
+        ("bSecurityEnabled", wintypes.BOOL),
+        ("dot11DefaultAuthAlgorithm", wintypes.DWORD),
+        ("dot11DefaultCipherAlgorithm", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("dwReserved", wintypes.DWORD),
+    ]
+
+
+class WLAN_AVAILABLE_NETWORK_LIST(ctypes.Structure):
+    _fields_ = [
+        ("dwNumberOfItems", wintypes.DWORD),
+        ("dwIndex", wintypes.DWORD),
+        ("Network", WLAN_AVAILABLE_NETWORK * 1),
+    ]
+
+
+_wlanapi = None
+
+
+def _load_library():
+    """Load wlanapi.dll and declare the prototypes of the functions used."""
+    global _wlanapi
+    if _wlanapi is not None:
+        return _wlanapi
+
+    lib = ctypes.WinDLL("wlanapi")
+
+    lib.WlanOpenHandle.argtypes = [wintypes.DWORD, ctypes.c_void_p,
+                                   ctypes.POINTER(wintypes.DWORD), ctypes.POINTER(wintypes.HANDLE)]
+    lib.WlanOpenHandle.restype = wintypes.DWORD
+
+    lib.WlanCloseHandle.argtypes = [wintypes.HANDLE, ctypes.c_void_p]
+    lib.WlanCloseHandle.restype = wintypes.DWORD
+
+    lib.WlanEnumInterfaces.argtypes = [wintypes.HANDLE, ctypes.c_void_p,
+                                       ctypes.POINTER(ctypes.POINTER(WLAN_INTERFACE_INFO_LIST))]
+    lib.WlanEnumInterfaces.restype = wintypes.DWORD
+
+    lib.WlanGetNetworkBssList.argtypes = [wintypes.HANDLE, ctypes.POINTER(GUID), ctypes.POINTER(DOT11_SSID),
+                                          wintypes.DWORD, wintypes.BOOL, ctypes.c_void_p,
+                                          ctypes.POINTER(ctypes.POINTER(WLAN_BSS_LIST))]
+    lib.WlanGetNetworkBssList.restype = wintypes.DWORD
+
+    lib.WlanGetAvailableNetworkList.argtypes = [wintypes.HANDLE, ctypes.POINTER(GUID), wintypes.DWORD,
+                                                ctypes.c_void_p,
+                                                ctypes.POINTER(ctypes.POINTER(WLAN_AVAILABLE_NETWORK_LIST))]
+    lib.WlanGetAvailableNetworkList.restype = wintypes.DWORD
+
+    lib.WlanFreeMemory.argtypes = [ctypes.c_void_p]
+    lib.WlanFreeMemory.restype = None
+
+    _wlanapi = lib
+    return lib
+
+
+def _check(result, function_name):
+    if result != ERROR_SUCCESS:
+        raise OSError(result, f"{function_name} failed with error code {result}")
+
+
+def _items(first_item, count):
+    """View a variable-length array that starts at first_item as a ctypes array of count items."""
+    array_type = type(first_item) * count
+    return ctypes.cast(ctypes.addressof(first_item), ctypes.POINTER(array_type)).contents
+
+
+def _decode_ssid(dot11_ssid):
+    return bytes(dot11_ssid.ucSSID[:dot11_ssid.uSSIDLength]).decode("utf-8", errors="replace")
+
+
+def _security_by_ssid(lib, handle, interface_guid):
+    """Map SSID -> authentication name using the available network list of an interface."""
+    network_list = ctypes.POINTER(WLAN_AVAILABLE_NETWORK_LIST)()
+    _check(lib.WlanGetAvailableNetworkList(handle, ctypes.byref(interface_guid), 0, None,
+                                           ctypes.byref(network_list)),
+           "WlanGetAvailableNetworkList")
+    try:
+        security = {}
+        count = network_list.contents.dwNumberOfItems
+        if count:
+            for network in _items(network_list.contents.Network[0], count):
+                algorithm = network.dot11DefaultAuthAlgorithm
+                security.setdefault(_decode_ssid(network.dot11Ssid),
+                                    AUTH_ALGORITHMS.get(algorithm, f"Unknown ({algorithm})"))
+        return security
+    finally:
+        lib.WlanFreeMemory(network_list)
+
+
+def scan_networks():
+    """
+    Return the access points visible to all wireless interfaces.
+    Each entry is a dict with 'ssid', 'bssid', 'signal' (link quality, 0-100),
+    'rssi' (dBm) and 'security'. Raises OSError if the WLAN service is unavailable.
+    """
+    if not WLAN_API_AVAILABLE:
+        raise OSError("Native Wifi API is only available on Windows")
+
+    lib = _load_library()
+    handle = wintypes.HANDLE()
+    negotiated_version = wintypes.DWORD()
+    _check(lib.WlanOpenHandle(WLAN_CLIENT_VERSION, None, ctypes.byref(negotiated_version),
+                              ctypes.byref(handle)),
+           "WlanOpenHandle")
+
+    access_points = []
+    interface_list = ctypes.POINTER(WLAN_INTERFACE_INFO_LIST)()
+    try:
+        _check(lib.WlanEnumInterfaces(handle, None, ctypes.byref(interface_list)), "WlanEnumInterfaces")
+
+        count = interface_list.contents.dwNumberOfItems
+        interfaces = _items(interface_list.contents.InterfaceInfo[0], count) if count else []
+
+        for interface in interfaces:
+            security = _security_by_ssid(lib, handle, interface.InterfaceGuid)
+
+            bss_list = ctypes.POINTER(WLAN_BSS_LIST)()
+            _check(lib.WlanGetNetworkBssList(handle, ctypes.byref(interface.InterfaceGuid), None,
+                                             DOT11_BSS_TYPE_ANY, False, None, ctypes.byref(bss_list)),
+                   "WlanGetNetworkBssList")
+            try:
+                bss_count = bss_list.contents.dwNumberOfItems
+                if not bss_count:
+                    continue
+                for entry in _items(bss_list.contents.wlanBssEntries[0], bss_count):
+                    ssid = _decode_ssid(entry.dot11Ssid)
+                    access_points.append({
+                        "ssid": ssid,
+                        "bssid": ":".join(f"{b:02x}" for b in entry.dot11Bssid),
+                        "signal": entry.uLinkQuality,
+                        "rssi": entry.lRssi,
+                        "security": security.get(ssid, "N/A"),
+                    })
+            finally:
+                lib.WlanFreeMemory(bss_list)
+    finally:
+        if interface_list:
+            lib.WlanFreeMemory(interface_list)
+        lib.WlanCloseHandle(handle, None)
+
+    return access_points